@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Per-operation timeouts derived from the observed latencies of the operation.
+"""
+import asyncio
+import time
+
+from aiobravado.exception import BravadoTimeoutError
+from aiobravado.exception import DeadlineExceeded
+from aiobravado.latency import LatencyWindow
+
+
+class AdaptiveTimeout(object):
+    """Request policy giving each request a timeout computed from the
+    latencies of the last ``window_size`` requests of its operation: the
+    ``percentile`` of the latencies times ``factor``, clamped between
+    ``min_timeout`` and ``max_timeout``. Fast operations get a tight timeout
+    and slow but healthy ones a loose one. Use it through the
+    ``adaptive_timeout`` config key or request option.
+
+    Until ``min_samples`` latencies were observed, ``max_timeout`` is used.
+    Requests which time out count with the time they waited as latency, so
+    that the timeout grows when an operation slows down. The timeout passed
+    to ``result()``, if any, remains an upper bound.
+
+    :param percentile: percentile of the latencies the timeout is based on
+    :param factor: multiplier applied to the percentile
+    :param min_timeout: minimum timeout in seconds
+    :param max_timeout: maximum timeout in seconds
+    :param min_samples: number of latencies to observe before adapting the
+        timeout of an operation
+    :param window_size: number of latencies kept per operation
+    """
+
+    def __init__(self, percentile=99, factor=2.0, min_timeout=0.1, max_timeout=30.0, min_samples=20,
+                 window_size=200):
+        self.percentile = percentile
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self.window_size = window_size
+        # (key, value) = (operation id, LatencyWindow)
+        self._latencies = {}
+
+    def _get_window(self, operation_id):
+        window = self._latencies.get(operation_id)
+        if window is None:
+            window = self._latencies[operation_id] = LatencyWindow(self.window_size)
+        return window
+
+    def get_timeout(self, operation_id):
+        """
+        :returns: timeout in seconds for the next request of the operation
+        """
+        window = self._get_window(operation_id)
+        if len(window) < self.min_samples:
+            return self.max_timeout
+        timeout = window.percentile(self.percentile) * self.factor
+        return min(max(timeout, self.min_timeout), self.max_timeout)
+
+    def timeouts(self):
+        """
+        :returns: dict where (key, value) = (operation id, current timeout)
+        """
+        return {operation_id: self.get_timeout(operation_id) for operation_id in self._latencies}
+
+    async def __call__(self, service_call, timeout, send):
+        operation_id = service_call.operation.operation_id
+        adaptive_timeout = self.get_timeout(operation_id)
+        if timeout is not None:
+            adaptive_timeout = min(timeout, adaptive_timeout)
+
+        start = time.monotonic()
+        try:
+            result = await send(service_call, adaptive_timeout)
+        except DeadlineExceeded:
+            raise
+        except (BravadoTimeoutError, asyncio.TimeoutError):
+            # the operation is at least this slow. Http clients may let
+            # asyncio.TimeoutError through instead of BravadoTimeoutError
+            self._get_window(operation_id).add(time.monotonic() - start)
+            raise
+        self._get_window(operation_id).add(time.monotonic() - start)
+        return result
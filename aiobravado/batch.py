@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Invoke an operation many times with a bounded number of requests in flight,
+see :meth:`aiobravado.client.CallableOperation.batch`.
+"""
+import asyncio
+
+# Number of requests of a batch in flight at the same time
+DEFAULT_BATCH_CONCURRENCY = 10
+
+
+class BatchIterator(object):
+    """Async iterator over the results of invoking an operation once per
+    item of ``list_of_kwargs``, in the order the requests complete. Yields
+    tuples ``(index, result)`` where index is the position of the kwargs in
+    ``list_of_kwargs`` and result is either the result of the call or the
+    exception it raised. A failing call does not affect the others.
+
+    Only ``concurrency`` calls are in flight at the same time, and no more
+    than ``concurrency`` completed results are kept waiting for the consumer.
+    If iterating over ``list_of_kwargs`` raises, the iteration raises the
+    exception. Iterating further yields the results of the calls which were
+    in flight.
+
+    :param callable_operation: operation to invoke
+    :type callable_operation: :class:`aiobravado.client.CallableOperation`
+    :param list_of_kwargs: iterable of dicts of kwargs to invoke the operation
+        with, e.g. ``[{'petId': 1}, {'petId': 2}]``
+    :param concurrency: maximum number of calls in flight
+    :param timeout: passed to :meth:`aiobravado.http_future.HttpFuture.result`
+    """
+
+    def __init__(self, callable_operation, list_of_kwargs, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1')
+        self.callable_operation = callable_operation
+        self.timeout = timeout
+        self._pending = enumerate(list_of_kwargs)
+        self._results = asyncio.Queue(maxsize=concurrency)
+        self._concurrency = concurrency
+        self._workers = None
+        self._running_workers = 0
+
+    async def _call(self, op_kwargs):
+        try:
+            return await self.callable_operation(**op_kwargs).result(timeout=self.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return e
+
+    async def _work(self):
+        try:
+            # All the workers share the same iterator, each item is only
+            # picked up once.
+            for index, op_kwargs in self._pending:
+                result = await self._call(op_kwargs)
+                await self._results.put((index, result))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # list_of_kwargs raised, the consumer raises it in turn
+            await self._results.put(e)
+        finally:
+            self._running_workers -= 1
+
+        if not self._running_workers:
+            # Tell the consumer that there are no more results
+            await self._results.put(None)
+
+    def _start(self):
+        self._running_workers = self._concurrency
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self._concurrency)]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._workers is None:
+            self._start()
+        item = await self._results.get()
+        if item is None:
+            raise StopAsyncIteration
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def cancel(self):
+        """Stop invoking the operation, cancelling the calls in flight."""
+        for worker in self._workers or ():
+            worker.cancel()
+
+
+async def batch(callable_operation, list_of_kwargs, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+    """Invoke an operation once per item of ``list_of_kwargs`` with at most
+    ``concurrency`` calls in flight.
+
+    :returns: list with the result of each call, or the exception it raised,
+        in the order of ``list_of_kwargs``
+    """
+    list_of_kwargs = list(list_of_kwargs)
+    results = [None] * len(list_of_kwargs)
+    batch_iterator = BatchIterator(callable_operation, list_of_kwargs, concurrency, timeout)
+    try:
+        async for index, result in batch_iterator:
+            results[index] = result
+    finally:
+        batch_iterator.cancel()
+    return results
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Fail fast instead of sending requests to an operation that keeps failing.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+
+from six import iteritems
+
+from aiobravado.exception import CircuitOpenError
+from aiobravado.exception import DeadlineExceeded
+from aiobravado.exception import HTTPServerError
+from aiobravado.request_plan import get_request_plan
+from aiobravado.retry import RETRIABLE_EXCEPTIONS
+
+log = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class Circuit(object):
+    """State of the circuit of one operation.
+
+    :param window_size: number of outcomes kept to compute the error rate
+    """
+
+    def __init__(self, window_size):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        # True for each failed request, False for each successful one
+        self.outcomes = deque(maxlen=window_size)
+        # time.monotonic() value after which the circuit half-opens
+        self.opened_until = 0
+        self.probes = 0
+
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return sum(self.outcomes) / float(len(self.outcomes))
+
+    def open(self, reset_timeout):
+        self.state = OPEN
+        self.opened_until = time.monotonic() + reset_timeout
+        self.probes = 0
+
+    def close(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.outcomes.clear()
+        self.probes = 0
+
+
+class CircuitBreaker(object):
+    """Request policy failing requests right away with
+    :class:`aiobravado.exception.CircuitOpenError` while their operation is
+    failing, instead of tying up connections with requests that are going to
+    fail or time out anyway. Use it through the ``circuit_breaker`` config
+    key or request option.
+
+    Each operation, or each operation and host with ``per_host``, has its own
+    circuit. A request fails if it gets a 5XX response, or raises one of
+    ``exceptions``. Other errors, e.g. 4XX responses, count as successes.
+
+    The circuit opens after ``failure_threshold`` consecutive failures, or
+    when the rate of failures over the last ``window_size`` requests reaches
+    ``error_rate_threshold``. After ``reset_timeout`` seconds, the circuit is
+    half-open: up to ``half_open_probes`` requests are let through at the
+    same time. It closes if one of them succeeds and opens again if one of
+    them fails.
+
+    :param failure_threshold: number of consecutive failures opening the
+        circuit, None to disable
+    :param error_rate_threshold: rate of failures, between 0 and 1, opening
+        the circuit, None to disable
+    :param window_size: number of requests the error rate is computed over
+    :param min_requests: number of requests in the window before the error
+        rate is taken into account
+    :param reset_timeout: seconds the circuit stays open for
+    :param half_open_probes: number of requests in flight while half-open
+    :param exceptions: exception types counted as failures
+    :param per_host: have a circuit per operation and host
+    """
+
+    def __init__(self, failure_threshold=5, error_rate_threshold=None, window_size=20, min_requests=10,
+                 reset_timeout=30.0, half_open_probes=1, exceptions=RETRIABLE_EXCEPTIONS, per_host=False):
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.window_size = window_size
+        self.min_requests = min_requests
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.exceptions = (HTTPServerError,) + tuple(exceptions)
+        self.per_host = per_host
+        # (key, value) = (operation id or (host, operation id), Circuit)
+        self._circuits = {}
+        # Number of requests failed because their circuit was open
+        self.rejected = 0
+
+    def get_key(self, operation):
+        plan = get_request_plan(operation)
+        if self.per_host:
+            return plan.host, plan.operation_id
+        return plan.operation_id
+
+    def get_circuit(self, key):
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = self._circuits[key] = Circuit(self.window_size)
+        return circuit
+
+    def states(self):
+        """
+        :returns: dict where (key, value) = (operation id or (host, operation
+            id), 'closed', 'open' or 'half_open')
+        """
+        now = time.monotonic()
+        return {
+            key: HALF_OPEN if circuit.state == OPEN and now >= circuit.opened_until else circuit.state
+            for key, circuit in iteritems(self._circuits)
+        }
+
+    def _should_open(self, circuit):
+        if self.failure_threshold is not None and circuit.consecutive_failures >= self.failure_threshold:
+            return True
+        return (
+            self.error_rate_threshold is not None and
+            len(circuit.outcomes) >= self.min_requests and
+            circuit.error_rate() >= self.error_rate_threshold
+        )
+
+    def _before_request(self, key, circuit):
+        """
+        :returns: True if the request is a half-open probe
+        :raises: CircuitOpenError
+        """
+        if circuit.state == CLOSED:
+            return False
+        now = time.monotonic()
+        if now < circuit.opened_until or circuit.probes >= self.half_open_probes:
+            self.rejected += 1
+            raise CircuitOpenError(key, max(circuit.opened_until - now, 0))
+        circuit.state = HALF_OPEN
+        circuit.probes += 1
+        return True
+
+    def _record(self, key, circuit, failed):
+        if circuit.state == OPEN:
+            # outcome of a request sent before the circuit opened
+            return
+        if circuit.state == HALF_OPEN:
+            if failed:
+                log.warning(u'Circuit of %s opened again', key)
+                circuit.open(self.reset_timeout)
+            else:
+                log.info(u'Circuit of %s closed', key)
+                circuit.close()
+            return
+
+        circuit.consecutive_failures = circuit.consecutive_failures + 1 if failed else 0
+        circuit.outcomes.append(failed)
+        if self._should_open(circuit):
+            log.warning(u'Circuit of %s opened', key)
+            circuit.open(self.reset_timeout)
+
+    async def __call__(self, service_call, timeout, send):
+        key = self.get_key(service_call.operation)
+        circuit = self.get_circuit(key)
+        probe = self._before_request(key, circuit)
+        try:
+            result = await send(service_call, timeout)
+        except (asyncio.CancelledError, DeadlineExceeded):
+            # not the fault of the operation
+            if probe and circuit.state == HALF_OPEN:
+                # let another probe through
+                circuit.probes -= 1
+            raise
+        except self.exceptions:
+            self._record(key, circuit, True)
+            raise
+        except Exception:
+            self._record(key, circuit, False)
+            raise
+        self._record(key, circuit, False)
+        return result
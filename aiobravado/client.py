@@ -43,26 +43,63 @@ To get a client
 
     client = aiobravado.client.SwaggerClient.from_url(swagger_spec_url)
 """
+import functools
 import logging
 
 from bravado_asyncio.definitions import RunMode
 from bravado_asyncio.http_client import AsyncioClient
+from bravado_core.content_type import APP_JSON
+from bravado_core.content_type import APP_MSGPACK
 from bravado_core.docstring import create_operation_docstring
 from bravado_core.exception import SwaggerMappingError
 from bravado_core.formatter import SwaggerFormat  # noqa
+from bravado_core.marshal import marshal_schema_object
+from bravado_core.param import get_param_type_spec
 from bravado_core.param import marshal_param
-from bravado_core.spec import Spec
+from bravado_core.validate import validate_schema_object
 from six import iteritems
-from six import itervalues
+from six.moves.urllib import parse as urlparse
 
+from aiobravado.batch import batch
+from aiobravado.batch import BatchIterator
+from aiobravado.batch import DEFAULT_BATCH_CONCURRENCY
 from aiobravado.config_defaults import CONFIG_DEFAULTS
 from aiobravado.config_defaults import REQUEST_OPTIONS_DEFAULTS
+from aiobravado.deadline import get_deadline
 from aiobravado.docstring_property import docstring_property
+from aiobravado.http_future import DeferredHttpFuture
+from aiobravado.http_future import SERVICE_CALL_PARAM
+from aiobravado.http_future import ServiceCall
+from aiobravado.json_codec import get_json_codec
+from aiobravado.lazy_spec import LazySpec
+from aiobravado.request_plan import get_request_plan
+from aiobravado.spec_cache import build_spec
+from aiobravado.spec_cache import SpecResponseCache
+from aiobravado.spec_pruning import prune_spec_dict
+from aiobravado.spec_pruning import select_operations
+from aiobravado.spec_reload import hash_spec_dict
+from aiobravado.spec_reload import SpecReloader
+from aiobravado.streaming import StreamingServiceCall
 from aiobravado.swagger_model import Loader
+from aiobravado.swagger_model import PrefetchedFuture
+from aiobravado.unmarshal import get_result_mode
+from aiobravado.unmarshal import MODELS
 from aiobravado.warning import warn_for_deprecated_op
 
 log = logging.getLogger(__name__)
 
+# Config keys and request options of request policies, in the order service
+# calls go through them (outermost first)
+REQUEST_POLICY_KEYS = (
+    'response_cache',
+    'request_coalescer',
+    'retry_policy',
+    'circuit_breaker',
+    'hedging_policy',
+    'concurrency_limiter',
+    'adaptive_timeout',
+)
+
 
 class SwaggerClient(object):
     """A client for accessing a Swagger-documented RESTful service.
@@ -70,9 +107,25 @@ class SwaggerClient(object):
     :type swagger_spec: :class:`bravado_core.spec.Spec`
     """
 
-    def __init__(self, swagger_spec, also_return_response=False):
+    def __init__(self, swagger_spec, also_return_response=False, config=None):
         self.__also_return_response = also_return_response
+        # aiobravado config, see CONFIG_DEFAULTS
+        self.config = dict(CONFIG_DEFAULTS, **(config or {}))
         self.swagger_spec = swagger_spec
+        # Set by from_url if spec_reload_interval is configured
+        self.spec_reloader = None
+
+    @property
+    def swagger_spec(self):
+        return self._swagger_spec
+
+    @swagger_spec.setter
+    def swagger_spec(self, swagger_spec):
+        self._swagger_spec = swagger_spec
+        # (key, value) = (resource name, ResourceDecorator)
+        # Decorators wrap the resources of a specific spec, so they need to
+        # be thrown away whenever the spec is swapped.
+        self._resource_decorators = {}
 
     @classmethod
     async def from_url(cls, spec_url, http_client=None, request_headers=None, config=None):
@@ -93,7 +146,21 @@ class SwaggerClient(object):
         """
         log.debug(u"Loading from %s", spec_url)
         http_client = http_client or AsyncioClient(run_mode=RunMode.FULL_ASYNCIO)
-        loader = Loader(http_client, request_headers=request_headers)
+        config = config or {}
+        spec_cache_dir = config.get('spec_cache_dir')
+        spec_reload_interval = config.get('spec_reload_interval')
+        loader = Loader(
+            http_client,
+            request_headers=request_headers,
+            # Reloading revalidates the spec with conditional requests, even
+            # if it is not cached on disk.
+            response_cache=(
+                SpecResponseCache(spec_cache_dir)
+                if spec_cache_dir or spec_reload_interval else None
+            ),
+            use_libyaml=config.get('use_libyaml'),
+            json_codec=get_json_codec(config.get('json_codec')),
+        )
         spec_dict = await loader.load_spec(spec_url)
 
         # RefResolver may have to download additional json files (remote refs)
@@ -105,11 +172,41 @@ class SwaggerClient(object):
             http_client.request = inject_headers_for_remote_refs(
                 http_client.request, request_headers)
 
-        return cls.from_spec(spec_dict, spec_url, http_client, config)
+        # RefResolver downloads remote refs one by one and synchronously.
+        # Download them concurrently up front instead and let RefResolver
+        # pick them up from memory.
+        remote_ref_documents = await loader.load_remote_refs(spec_dict, spec_url)
+        if remote_ref_documents or spec_reload_interval:
+            http_client.request = serve_prefetched_remote_refs(
+                http_client.request, remote_ref_documents)
+
+        if not spec_reload_interval:
+            return cls.from_spec(spec_dict, spec_url, http_client, config, remote_ref_documents=remote_ref_documents)
+
+        # Building the spec modifies spec_dict, hash it beforehand
+        spec_hash = hash_spec_dict(spec_dict, remote_ref_documents)
+        client = cls.from_spec(spec_dict, spec_url, http_client, config, remote_ref_documents=remote_ref_documents)
+        client.spec_reloader = SpecReloader(
+            client,
+            spec_url,
+            loader,
+            functools.partial(
+                build_swagger_spec,
+                origin_url=spec_url,
+                http_client=http_client,
+                config=config,
+                remote_ref_documents=remote_ref_documents,
+            ),
+            remote_ref_documents,
+            spec_reload_interval,
+            spec_hash=spec_hash,
+        )
+        client.spec_reloader.start()
+        return client
 
     @classmethod
     def from_spec(cls, spec_dict, origin_url=None, http_client=None,
-                  config=None):
+                  config=None, remote_ref_documents=None):
         """
         Build a :class:`SwaggerClient` from a Swagger spec in dict form.
 
@@ -117,19 +214,19 @@ class SwaggerClient(object):
         :param origin_url: the url used to retrieve the spec_dict
         :type  origin_url: str
         :param config: Configuration dict - see spec.CONFIG_DEFAULTS
+        :param remote_ref_documents: documents referenced by the spec, already
+            downloaded. See :func:`aiobravado.spec_cache.build_spec`.
 
         :rtype: :class:`bravado_core.spec.Spec`
         """
         http_client = http_client or AsyncioClient(run_mode=RunMode.FULL_ASYNCIO)
-
-        # Apply aiobravado config defaults
         config = dict(CONFIG_DEFAULTS, **(config or {}))
-
-        also_return_response = config.pop('also_return_response', False)
-        swagger_spec = Spec.from_dict(
-            spec_dict, origin_url, http_client, config,
+        swagger_spec = build_swagger_spec(spec_dict, origin_url, http_client, config, remote_ref_documents)
+        return cls(
+            swagger_spec,
+            also_return_response=config['also_return_response'],
+            config={key: config[key] for key in CONFIG_DEFAULTS},
         )
-        return cls(swagger_spec, also_return_response=also_return_response)
 
     def get_model(self, model_name):
         return self.swagger_spec.definitions[model_name]
@@ -139,6 +236,11 @@ class SwaggerClient(object):
         :param item: name of the resource to return
         :return: :class:`Resource`
         """
+        try:
+            return self._resource_decorators[item]
+        except KeyError:
+            pass
+
         resource = self.swagger_spec.resources.get(item)
         if not resource:
             raise AttributeError(
@@ -147,18 +249,91 @@ class SwaggerClient(object):
 
         # Wrap bravado-core's Resource and Operation objects in order to
         # execute a service call via the http_client.
-        return ResourceDecorator(resource, self.__also_return_response)
+        decorator = ResourceDecorator(resource, self.__also_return_response, self.config)
+        self._resource_decorators[item] = decorator
+        return decorator
+
+    def operation(self, resource_name, operation_id):
+        """Look up an operation explicitly. The returned callable stays valid
+        for as long as the client uses the same spec, so it can be kept
+        around and reused, e.g. in hot loops.
+
+        :param resource_name: name of the resource the operation belongs to
+        :param operation_id: id of the operation
+        :rtype: :class:`CallableOperation`
+        :raises: AttributeError if the resource or the operation does not exist
+        """
+        return getattr(self._get_resource(resource_name), operation_id)
 
     def __repr__(self):
         return u"%s(%s)" % (self.__class__.__name__, self.swagger_spec.api_url)
 
     def __getattr__(self, item):
+        if item.startswith('__'):
+            # Special attribute lookups (copy, pickle, ...) never refer to
+            # resources, don't bother looking them up.
+            raise AttributeError(item)
         return self._get_resource(item)
 
     def __dir__(self):
         return self.swagger_spec.resources.keys()
 
 
+def build_swagger_spec(spec_dict, origin_url=None, http_client=None, config=None, remote_ref_documents=None):
+    """Build the :class:`bravado_core.spec.Spec` for a client, applying the
+    aiobravado specific config.
+
+    :param spec_dict: a dict with a Swagger spec in json-like form
+    :param origin_url: the url used to retrieve the spec_dict
+    :param http_client: http client used to download remote $refs
+    :param config: Configuration dict - see CONFIG_DEFAULTS
+    :param remote_ref_documents: documents referenced by the spec, already
+        downloaded. See :func:`aiobravado.spec_cache.build_spec`.
+    :rtype: :class:`bravado_core.spec.Spec`
+    """
+    # Apply aiobravado config defaults, and separate the aiobravado specific
+    # keys from the bravado-core config
+    config = dict(CONFIG_DEFAULTS, **(config or {}))
+    aiobravado_config = {key: config.pop(key) for key in CONFIG_DEFAULTS}
+
+    spec_cache_dir = aiobravado_config['spec_cache_dir']
+    lazy_resources = aiobravado_config['lazy_resources']
+    include_operations = aiobravado_config['include_operations']
+    include_tags = aiobravado_config['include_tags']
+    if include_operations or include_tags:
+        spec_dict = prune_spec_dict(
+            spec_dict,
+            operations=select_operations(spec_dict, include_operations, include_tags),
+        )
+
+    if lazy_resources:
+        swagger_spec = LazySpec.from_dict(
+            spec_dict, origin_url, http_client, config,
+            cache_dir=spec_cache_dir, remote_ref_documents=remote_ref_documents,
+        )
+    else:
+        swagger_spec = build_spec(
+            spec_dict, origin_url, http_client, config,
+            cache_dir=spec_cache_dir, remote_ref_documents=remote_ref_documents,
+        )
+    # Used by construct_params and unmarshal_response_inner, which only get
+    # to see the spec
+    swagger_spec.json_codec = get_json_codec(aiobravado_config['json_codec'])
+    return swagger_spec
+
+
+def is_remote_ref_request(request_params, request_kwargs):
+    """Whether a request made through the http client is to retrieve a
+    remote ref in the swagger spec, rather than for a service call.
+
+    :param request_params: request in dict form
+    :param request_kwargs: keyword arguments of the request
+    """
+    # operation is only present for service calls, except for the ones sent
+    # without it, which are marked instead
+    return request_kwargs.get('operation') is None and not request_params.get(SERVICE_CALL_PARAM)
+
+
 def inject_headers_for_remote_refs(request_callable, request_headers):
     """Inject request_headers only when the request is to retrieve the
     remote refs in the swagger spec (vs being a request for a service call).
@@ -167,13 +342,27 @@ def inject_headers_for_remote_refs(request_callable, request_headers):
     :param request_headers: headers to inject when retrieving remote refs
     """
     def request_wrapper(request_params, *args, **kwargs):
+        if is_remote_ref_request(request_params, kwargs):
+            request_params['headers'] = request_headers
 
-        def is_remote_ref_request(request_kwargs):
-            # operation is only present for service calls
-            return request_kwargs.get('operation') is None
+        return request_callable(request_params, *args, **kwargs)
 
-        if is_remote_ref_request(kwargs):
-            request_params['headers'] = request_headers
+    return request_wrapper
+
+
+def serve_prefetched_remote_refs(request_callable, documents):
+    """Serve requests for remote refs from already downloaded documents
+    instead of performing the request.
+
+    :param request_callable: method on http_client to make a http request
+    :param documents: dict where (key, value) = (url, document in dict form),
+        see :meth:`aiobravado.swagger_model.Loader.load_remote_refs`
+    """
+    def request_wrapper(request_params, *args, **kwargs):
+        if is_remote_ref_request(request_params, kwargs):
+            url = urlparse.urldefrag(request_params.get('url', ''))[0]
+            if url in documents:
+                return PrefetchedFuture(documents[url])
 
         return request_callable(request_params, *args, **kwargs)
 
@@ -186,18 +375,29 @@ class ResourceDecorator(object):
     operations can be instrumented.
     """
 
-    def __init__(self, resource, also_return_response=False):
+    def __init__(self, resource, also_return_response=False, config=None):
         """
         :type resource: :class:`bravado_core.resource.Resource`
+        :param config: aiobravado config, see CONFIG_DEFAULTS
         """
         self.also_return_response = also_return_response
+        self.config = config
         self.resource = resource
+        # (key, value) = (operation name, CallableOperation)
+        self._callable_operations = {}
 
     def __getattr__(self, name):
         """
         :rtype: :class:`CallableOperation`
         """
-        return CallableOperation(getattr(self.resource, name), self.also_return_response)
+        if name.startswith('__'):
+            raise AttributeError(name)
+        try:
+            return self._callable_operations[name]
+        except KeyError:
+            callable_operation = CallableOperation(getattr(self.resource, name), self.also_return_response, self.config)
+            self._callable_operations[name] = callable_operation
+            return callable_operation
 
     def __dir__(self):
         """
@@ -211,11 +411,13 @@ class CallableOperation(object):
     the operation uses the configured http_client.
 
     :type operation: :class:`bravado_core.operation.Operation`
+    :param config: aiobravado config, see CONFIG_DEFAULTS
     """
 
-    def __init__(self, operation, also_return_response=False):
+    def __init__(self, operation, also_return_response=False, config=None):
         self.also_return_response = also_return_response
         self.operation = operation
+        self.config = CONFIG_DEFAULTS if config is None else config
 
     @docstring_property(__doc__)
     def __doc__(self):
@@ -227,18 +429,44 @@ class CallableOperation(object):
         """
         return getattr(self.operation, name)
 
+    async def batch(self, list_of_kwargs, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+        """Invoke the operation once per item of ``list_of_kwargs``, with at
+        most ``concurrency`` requests in flight.
+
+        :param list_of_kwargs: iterable of dicts of kwargs to invoke the
+            operation with, e.g. ``[{'petId': 1}, {'petId': 2}]``
+        :param concurrency: maximum number of requests in flight
+        :param timeout: passed to :meth:`HttpFuture.result` for each request
+        :returns: list with the result of each call, or the exception it
+            raised, in the order of ``list_of_kwargs``
+        """
+        return await batch(self, list_of_kwargs, concurrency, timeout)
+
+    def iter_batch(self, list_of_kwargs, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+        """Like :meth:`batch`, but returns an async iterator yielding tuples
+        ``(index, result or exception)`` as the requests complete.
+
+        :rtype: :class:`aiobravado.batch.BatchIterator`
+        """
+        return BatchIterator(self, list_of_kwargs, concurrency, timeout)
+
     def __call__(self, **op_kwargs):
         """Invoke the actual HTTP request and return a future.
 
         :rtype: :class:`aiobravado.http_future.HTTPFuture`
         """
         log.debug(u'%s(%s)', self.operation.operation_id, op_kwargs)
-        warn_for_deprecated_op(self.operation)
-
-        # Apply request_options defaults
-        request_options = dict(
-            REQUEST_OPTIONS_DEFAULTS,
-            **(op_kwargs.pop('_request_options', {})))
+        if get_request_plan(self.operation).is_deprecated:
+            warn_for_deprecated_op(self.operation)
+
+        # Apply request_options defaults. Nothing downstream modifies
+        # request_options, so the defaults can be used as they are if the
+        # caller did not pass any.
+        request_options = op_kwargs.pop('_request_options', None)
+        if request_options:
+            request_options = dict(REQUEST_OPTIONS_DEFAULTS, **request_options)
+        else:
+            request_options = REQUEST_OPTIONS_DEFAULTS
 
         request_params = construct_request(
             self.operation, request_options, **op_kwargs)
@@ -251,6 +479,22 @@ class CallableOperation(object):
             self.also_return_response,
         )
 
+        request_policies = get_request_policies(self.config, request_options)
+        deadline = get_deadline(request_options)
+        stream = request_options.get('stream', False)
+        result_mode = get_result_mode(self.config, request_options)
+        if request_policies or deadline is not None or stream or result_mode != MODELS:
+            service_call = (StreamingServiceCall if stream else ServiceCall)(
+                http_client,
+                request_params,
+                self.operation,
+                request_options,
+                also_return_response,
+                deadline,
+                result_mode,
+            )
+            return DeferredHttpFuture(service_call, request_policies)
+
         return http_client.request(
             request_params,
             operation=self.operation,
@@ -258,6 +502,24 @@ class CallableOperation(object):
             also_return_response=also_return_response)
 
 
+def get_request_policies(config, request_options):
+    """Collect the request policies a service call has to go through, from
+    outermost to innermost. Policies given in the request options override
+    the ones of the client.
+
+    :param config: aiobravado config of the client, see CONFIG_DEFAULTS
+    :param request_options: _request_options of the service call
+    :returns: list of request policies, see
+        :class:`aiobravado.http_future.DeferredHttpFuture`
+    """
+    request_policies = []
+    for key in REQUEST_POLICY_KEYS:
+        request_policy = request_options.get(key, config.get(key))
+        if request_policy is not None:
+            request_policies.append(request_policy)
+    return request_policies
+
+
 def construct_request(operation, request_options, **op_kwargs):
     """Construct the outgoing request dict.
 
@@ -269,10 +531,10 @@ def construct_request(operation, request_options, **op_kwargs):
 
     :return: request in dict form
     """
-    url = operation.swagger_spec.api_url.rstrip('/') + operation.path_name
+    plan = get_request_plan(operation)
     request = {
-        'method': str(operation.http_method.upper()),
-        'url': url,
+        'method': plan.method,
+        'url': plan.url,
         'params': {},  # filled in downstream
         'headers': request_options.get('headers', {}),
     }
@@ -301,17 +563,25 @@ def construct_params(operation, request, op_kwargs):
     :raises: SwaggerMappingError on extra parameters or when a required
         parameter is not supplied.
     """
-    current_params = operation.params.copy()
+    plan = get_request_plan(operation)
+    json_codec = getattr(operation.swagger_spec, 'json_codec', None)
     for param_name, param_value in iteritems(op_kwargs):
-        param = current_params.pop(param_name, None)
+        param = plan.params.get(param_name)
         if param is None:
             raise SwaggerMappingError(
                 "{0} does not have parameter {1}"
-                .format(operation.operation_id, param_name))
-        marshal_param(param, param_value, request)
-
-    # Check required params and non-required params with a 'default' value
-    for remaining_param in itervalues(current_params):
+                .format(plan.operation_id, param_name))
+        if json_codec is not None and param.location == 'body':
+            marshal_json_body(param, param_value, request, json_codec)
+        else:
+            marshal_param(param, param_value, request)
+
+    # Check required params and non-required params with a 'default' value.
+    # Only params that can have an effect when missing are part of
+    # plan.implicit_params, see :class:`aiobravado.request_plan.RequestPlan`.
+    for remaining_param in plan.implicit_params:
+        if remaining_param.name in op_kwargs:
+            continue
         if remaining_param.location == 'header' and remaining_param.name in request['headers']:
             marshal_param(remaining_param, request['headers'][remaining_param.name], request)
         else:
@@ -320,3 +590,29 @@ def construct_params(operation, request, op_kwargs):
                     '{0} is a required parameter'.format(remaining_param.name))
             if not remaining_param.required and remaining_param.has_default():
                 marshal_param(remaining_param, None, request)
+
+
+def marshal_json_body(param, value, request, json_codec):
+    """Like :func:`bravado_core.param.marshal_param` for a body parameter,
+    but serializes it with the given JSON codec.
+
+    :type param: :class:`bravado_core.param.Param`
+    :param value: value of the body
+    :type request: dict
+    :param json_codec: see :mod:`aiobravado.json_codec`
+    """
+    if request['headers'].get('Content-Type', '').lower() == APP_MSGPACK:
+        marshal_param(param, value, request)
+        return
+
+    swagger_spec = param.swagger_spec
+    if value is None and not param.required:
+        return
+
+    param_spec = swagger_spec.deref(get_param_type_spec(param))
+    value = marshal_schema_object(swagger_spec, param_spec, value)
+    if swagger_spec.config['validate_requests']:
+        validate_schema_object(swagger_spec, param_spec, value)
+
+    request['headers']['Content-Type'] = APP_JSON
+    request['data'] = json_codec.dumps(value)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Single-flight coalescing of identical GET requests.
+"""
+import asyncio
+from functools import partial
+
+
+class RequestCoalescer(object):
+    """Request policy making concurrent identical GET requests share a
+    single http request. The first request is sent, the others wait for it
+    and get the same result, or the same exception. Use it through the
+    ``request_coalescer`` config key or request option.
+
+    Requests are identical if they have the same method, url, query
+    parameters, headers and request timeouts. The shared result is the same
+    object for all callers, don't modify it. Response callbacks only run for
+    the request that is actually sent.
+
+    Calls with a deadline or a timeout passed to ``result()`` are not
+    coalesced: the shared request would be bounded by the deadline or
+    timeout of the first caller.
+
+    :param headers: names of the headers which are part of the identity of
+        a request, None for all of them. Narrowing it, e.g. to
+        ``('Authorization', 'Accept')``, lets requests differing only in
+        other headers share a request. Only leave out headers the responses
+        do not depend on.
+    """
+
+    def __init__(self, headers=None):
+        self.headers = None if headers is None else tuple(headers)
+        # (key, value) = (request key, task of the request in flight)
+        self._in_flight = {}
+        # Number of requests which did not need to be sent
+        self.coalesced = 0
+
+    def _request_done(self, key, task):
+        del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved, all the callers may be gone
+            task.exception()
+
+    async def __call__(self, service_call, timeout, send):
+        key = service_call.key(self.headers)
+        if key is None or timeout is not None or service_call.deadline is not None:
+            return await send(service_call, timeout)
+        request_params = service_call.request_params
+        key += (request_params.get('timeout'), request_params.get('connect_timeout'))
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(send(service_call, timeout))
+            task.add_done_callback(partial(self._request_done, key))
+        else:
+            self.coalesced += 1
+
+        # Cancelling one of the callers must not cancel the request the
+        # others are waiting for.
+        return await asyncio.shield(task)
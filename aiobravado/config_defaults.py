@@ -3,6 +3,72 @@ CONFIG_DEFAULTS = {
     # See the constructor of :class:`bravado.http_future.HttpFuture` for an
     # in depth explanation of what this means.
     'also_return_response': False,
+
+    # Directory used to cache built specs across process restarts, see
+    # :mod:`aiobravado.spec_cache`. Caching is disabled when None.
+    'spec_cache_dir': None,
+
+    # Build resources and models the first time they are used instead of
+    # building the whole spec up front, see :mod:`aiobravado.lazy_spec`.
+    'lazy_resources': False,
+
+    # Sets of operation ids and tags. If any is given, the spec is pruned
+    # down to the matching operations (and the models they use) before it is
+    # built, see :func:`aiobravado.spec_pruning.prune_spec_dict`.
+    'include_operations': None,
+    'include_tags': None,
+
+    # Parse YAML specs with the much faster libyaml based loader. None uses it
+    # when PyYAML was built with libyaml, True requires it, False disables it.
+    'use_libyaml': None,
+
+    # Seconds between two background reloads of the spec of clients built
+    # with from_url, see :mod:`aiobravado.spec_reload`. Disabled when None.
+    'spec_reload_interval': None,
+
+    # Codec used to decode JSON responses and specs and to encode JSON request
+    # bodies: the name of one of aiobravado.json_codec.JSON_CODECS, e.g.
+    # 'orjson', or a codec object. None uses the http client's json decoding
+    # and bravado-core's encoding.
+    'json_codec': None,
+
+    # How much of the unmarshalling of responses is done, see
+    # :mod:`aiobravado.unmarshal`: 'models', 'raw' to return the decoded body
+    # as is, 'formats' to only convert formatted strings, or 'lazy' to
+    # convert the parts of the body when they are accessed.
+    'result_mode': 'models',
+
+    # === Request policies ===
+    # Service calls go through these, see
+    # :class:`aiobravado.http_future.DeferredHttpFuture`. They can also be
+    # set, or disabled with None, per service call in _request_options.
+
+    # :class:`aiobravado.response_cache.ResponseCache` caching the results
+    # of GET requests.
+    'response_cache': None,
+
+    # :class:`aiobravado.coalescing.RequestCoalescer` sharing a single http
+    # request between concurrent identical GET requests.
+    'request_coalescer': None,
+
+    # :class:`aiobravado.retry.RetryPolicy` sending failed requests again.
+    'retry_policy': None,
+
+    # :class:`aiobravado.circuit_breaker.CircuitBreaker` failing requests
+    # right away while their operation keeps failing.
+    'circuit_breaker': None,
+
+    # :class:`aiobravado.hedging.HedgingPolicy` sending a second request when
+    # the first one is slow.
+    'hedging_policy': None,
+
+    # :class:`aiobravado.limiter.ConcurrencyLimiter` limiting the number of
+    # requests in flight per host and per operation.
+    'concurrency_limiter': None,
+
+    # :class:`aiobravado.adaptive_timeout.AdaptiveTimeout` computing the
+    # timeout of each request from the observed latencies of its operation.
+    'adaptive_timeout': None,
 }
 
 REQUEST_OPTIONS_DEFAULTS = {
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Deadlines bounding the whole of a service call: waiting for a concurrency
+slot, connecting, reading, decoding, retries and the backoff between them.
+
+A deadline is given per service call with the ``deadline`` request option, or
+for all the service calls made in a block of code with :func:`deadline`::
+
+    with deadline(2.5):
+        pet = await client.pet.getPetById(petId=42).result()
+        owner = await client.user.getUserByName(username=pet.owner).result()
+
+The earliest of the two applies. :func:`deadline` needs Python 3.7+, where
+the current deadline is kept in a :mod:`contextvars` variable. It is inherited
+by the tasks created in the block.
+"""
+import time
+from contextlib import contextmanager
+
+from aiobravado.exception import DeadlineExceeded
+
+try:
+    from contextvars import ContextVar
+except ImportError:  # pragma: no cover
+    # Python < 3.7
+    ContextVar = None
+
+# Deadline set by the innermost deadline() block
+_current_deadline = None if ContextVar is None else ContextVar('aiobravado_deadline', default=None)
+
+
+class Deadline(object):
+    """An absolute point in time after which a service call fails with
+    :class:`aiobravado.exception.DeadlineExceeded`.
+
+    :param expires_at: :func:`time.monotonic` value of the deadline
+    """
+
+    def __init__(self, expires_at):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds):
+        """
+        :param seconds: number of seconds from now
+        :rtype: :class:`Deadline`
+        """
+        return cls(time.monotonic() + seconds)
+
+    def __repr__(self):
+        return '{0}(remaining={1:.3f})'.format(type(self).__name__, self.remaining())
+
+    def remaining(self):
+        """Number of seconds until the deadline, negative once it passed."""
+        return self.expires_at - time.monotonic()
+
+    def get_timeout(self, timeout=None):
+        """Shorten a timeout to the time left until the deadline.
+
+        :param timeout: number of seconds, or None for no timeout
+        :returns: number of seconds
+        :raises: DeadlineExceeded if the deadline passed
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded('Deadline exceeded by {0:.3f} seconds'.format(-remaining))
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+    def bound_request_params(self, request_params):
+        """Shorten the connect and idle timeouts the http client is given to
+        the time left until the deadline.
+
+        :param request_params: request in dict form
+        :returns: copy of request_params
+        :raises: DeadlineExceeded if the deadline passed
+        """
+        return dict(
+            request_params,
+            timeout=self.get_timeout(request_params.get('timeout')),
+            connect_timeout=self.get_timeout(request_params.get('connect_timeout')),
+        )
+
+
+def earliest(*deadlines):
+    """
+    :param deadlines: :class:`Deadline` instances or None
+    :returns: the earliest of the deadlines, None if there are none
+    """
+    deadlines = [deadline for deadline in deadlines if deadline is not None]
+    if not deadlines:
+        return None
+    return min(deadlines, key=lambda deadline: deadline.expires_at)
+
+
+def get_current_deadline():
+    """
+    :returns: the deadline set by the innermost :func:`deadline` block, or
+        None
+    :rtype: :class:`Deadline`
+    """
+    if _current_deadline is None:
+        return None
+    return _current_deadline.get()
+
+
+def to_deadline(value):
+    """
+    :param value: number of seconds from now, a :class:`Deadline` or None
+    :rtype: :class:`Deadline`
+    """
+    if value is None or isinstance(value, Deadline):
+        return value
+    return Deadline.after(value)
+
+
+@contextmanager
+def deadline(seconds):
+    """Context manager setting a deadline for the service calls made in its
+    block. Nested blocks can only make the deadline earlier.
+
+    :param seconds: number of seconds from now, or a :class:`Deadline`
+    :returns: the deadline of the block
+    :rtype: :class:`Deadline`
+    """
+    if _current_deadline is None:
+        raise RuntimeError('Deadline blocks need contextvars (Python 3.7+)')
+    new_deadline = earliest(get_current_deadline(), to_deadline(seconds))
+    token = _current_deadline.set(new_deadline)
+    try:
+        yield new_deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def get_deadline(request_options):
+    """Deadline of a service call: the earliest of its ``deadline`` request
+    option and the current deadline.
+
+    :param request_options: _request_options of the service call
+    :rtype: :class:`Deadline`
+    """
+    return earliest(to_deadline(request_options.get('deadline')), get_current_deadline())
@@ -240,3 +240,33 @@ class HTTPNetworkAuthenticationRequired(HTTPServerError):
 
 class BravadoTimeoutError(base_exception):
     pass
+
+
+class DeadlineExceeded(BravadoTimeoutError):
+    """The deadline of a service call passed before it completed, see
+    :mod:`aiobravado.deadline`.
+    """
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """A request was rejected by a
+    :class:`aiobravado.limiter.ConcurrencyLimiter` because its queue was
+    full or the request waited in it for too long.
+    """
+
+
+class CircuitOpenError(Exception):
+    """A request was rejected by a
+    :class:`aiobravado.circuit_breaker.CircuitBreaker` because too many
+    requests of its operation failed recently.
+
+    :param key: operation id, or (host, operation id), of the open circuit
+    :param retry_in: seconds until requests are let through again
+    """
+
+    def __init__(self, key, retry_in):
+        super(CircuitOpenError, self).__init__(
+            'Circuit of {0} is open, retry in {1:.1f} seconds'.format(key, retry_in),
+        )
+        self.key = key
+        self.retry_in = retry_in
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Hedged requests: send a second identical request when the first is slow.
+"""
+import asyncio
+import logging
+import time
+
+from aiobravado.http_future import IDEMPOTENT_READ_METHODS
+from aiobravado.latency import LatencyWindow
+from aiobravado.retry import RetryBudget
+
+log = logging.getLogger(__name__)
+
+
+class HedgingPolicy(object):
+    """Request policy sending a second identical request, the hedge, if the
+    first one has not completed after a delay. The first successful response
+    is returned and the other request is cancelled. This cuts the tail
+    latency caused by a slow server or connection, at the cost of some extra
+    requests. Use it through the ``hedging_policy`` config key or request
+    option.
+
+    The delay is either fixed, or the ``percentile`` of the latencies of the
+    last ``window_size`` successful calls of the operation. Operations are not
+    hedged until ``min_samples`` latencies were observed.
+
+    Only requests with idempotent ``methods`` are hedged. The number of
+    hedges is limited by ``budget``, a :class:`aiobravado.retry.RetryBudget`
+    where hedges count as retries.
+
+    :param delay: fixed number of seconds to wait for before sending the
+        hedge. The observed percentile is used if None.
+    :param percentile: percentile of the observed latencies to use as delay
+    :param min_delay: minimum delay in seconds
+    :param min_samples: number of latencies to observe before hedging
+    :param window_size: number of latencies kept per operation
+    :param methods: http methods of the requests to hedge
+    :param budget: hedging budget, by default at most one hedge per ten
+        requests
+    :type budget: :class:`aiobravado.retry.RetryBudget`
+    """
+
+    def __init__(self, delay=None, percentile=95, min_delay=0.005, min_samples=20, window_size=100,
+                 methods=IDEMPOTENT_READ_METHODS, budget=None):
+        self.delay = delay
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window_size = window_size
+        self.methods = frozenset(methods)
+        self.budget = RetryBudget(ratio=0.1, min_retries=1) if budget is None else budget
+        # (key, value) = (operation id, LatencyWindow)
+        self._latencies = {}
+        self.hedges = 0
+        self.hedges_won = 0
+        self.budget_exhausted = 0
+
+    def _get_window(self, operation_id):
+        window = self._latencies.get(operation_id)
+        if window is None:
+            window = self._latencies[operation_id] = LatencyWindow(self.window_size)
+        return window
+
+    def get_delay(self, operation_id):
+        """
+        :returns: seconds to wait for before hedging a request of the
+            operation, or None if it must not be hedged
+        """
+        if self.delay is not None:
+            return max(self.delay, self.min_delay)
+        window = self._get_window(operation_id)
+        if len(window) < self.min_samples:
+            return None
+        return max(window.percentile(self.percentile), self.min_delay)
+
+    def stats(self):
+        """
+        :returns: dict with the number of hedges sent, hedges which returned
+            first and hedges not sent because the budget was exhausted
+        """
+        return {
+            'hedges': self.hedges,
+            'hedges_won': self.hedges_won,
+            'budget_exhausted': self.budget_exhausted,
+        }
+
+    async def _hedge(self, service_call, timeout, send, delay, start):
+        first = asyncio.ensure_future(send(service_call, timeout))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return first.result()
+            if not self.budget.try_retry():
+                self.budget_exhausted += 1
+                return await first
+
+            self.hedges += 1
+            log.debug(u'Hedging %s after %.3fs', service_call.operation.operation_id, delay)
+            if timeout is not None:
+                # both requests share the timeout of the call
+                timeout = max(timeout - (time.monotonic() - start), 0)
+            tasks.append(asyncio.ensure_future(send(service_call, timeout)))
+
+            pending = tasks
+            while pending:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # ties go to the first request
+                for task in tasks:
+                    if task.done() and not task.cancelled() and task.exception() is None:
+                        if task is not first:
+                            self.hedges_won += 1
+                        return task.result()
+            # both failed
+            return first.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Mark the exception of the loser as retrieved
+                    task.exception()
+
+    async def __call__(self, service_call, timeout, send):
+        if service_call.request_params['method'] not in self.methods:
+            return await send(service_call, timeout)
+
+        operation_id = service_call.operation.operation_id
+        self.budget.record_request()
+        delay = self.get_delay(operation_id)
+        start = time.monotonic()
+        if delay is None:
+            result = await send(service_call, timeout)
+        else:
+            result = await self._hedge(service_call, timeout, send, delay, start)
+        self._get_window(operation_id).add(time.monotonic() - start)
+        return result
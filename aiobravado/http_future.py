@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import sys
+from functools import partial
 from functools import wraps
 
 import six
@@ -7,13 +9,38 @@ from bravado_core.content_type import APP_JSON
 from bravado_core.content_type import APP_MSGPACK
 from bravado_core.exception import MatchingResponseNotFound
 from bravado_core.response import get_response_spec
-from bravado_core.unmarshal import unmarshal_schema_object
 from bravado_core.validate import validate_schema_object
 from msgpack import unpackb
 
 from aiobravado.config_defaults import REQUEST_OPTIONS_DEFAULTS
 from aiobravado.exception import BravadoTimeoutError
+from aiobravado.exception import HTTPError
 from aiobravado.exception import make_http_exception
+from aiobravado.unmarshal import MODELS
+from aiobravado.unmarshal import unmarshal_value
+
+
+# Methods of requests which can be answered with the response to an identical
+# request, see ServiceCall.key
+IDEMPOTENT_READ_METHODS = frozenset(('GET', 'HEAD'))
+
+
+# Headers which can turn the response to a request into a 304 Not Modified
+CONDITIONAL_REQUEST_HEADERS = ('If-None-Match', 'If-Modified-Since')
+
+# Request param marking the requests of service calls sent without an
+# operation, see ServiceCall.request_without_operation. Without an operation,
+# they would look like requests for remote refs to the wrappers around the
+# http client, see aiobravado.client.is_remote_ref_request
+SERVICE_CALL_PARAM = 'aiobravado_service_call'
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in six.iteritems(value)))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
 
 
 class FutureAdapter(object):
@@ -131,7 +158,248 @@ class HttpFuture():
         raise make_http_exception(response=incoming_response)
 
 
-async def unmarshal_response(incoming_response, operation, response_callbacks=None):
+class ServiceCall(object):
+    """All that is needed to send the request of a service call, possibly
+    several times.
+
+    :param http_client: http client to send the request with
+    :param request_params: request in dict form, see
+        :func:`aiobravado.client.construct_request`
+    :type operation: :class:`bravado_core.operation.Operation`
+    :param request_options: _request_options of the service call
+    :param also_return_response: see :class:`HttpFuture`
+    :param deadline: deadline of the service call, or None
+    :type deadline: :class:`aiobravado.deadline.Deadline`
+    :param result_mode: one of :data:`aiobravado.unmarshal.RESULT_MODES`
+    """
+
+    def __init__(self, http_client, request_params, operation, request_options, also_return_response=False,
+                 deadline=None, result_mode=MODELS):
+        self.http_client = http_client
+        self.request_params = request_params
+        self.operation = operation
+        self.request_options = request_options
+        self.also_return_response = also_return_response
+        self.deadline = deadline
+        self.result_mode = result_mode
+
+    def get_timeout(self, timeout=None):
+        """Shorten a timeout to the time left until the deadline, if any.
+
+        :raises: DeadlineExceeded if the deadline passed
+        """
+        if self.deadline is None:
+            return timeout
+        return self.deadline.get_timeout(timeout)
+
+    def get_request_params(self):
+        """The request params to send, with their timeouts shortened to the
+        time left until the deadline, if any.
+
+        :raises: DeadlineExceeded if the deadline passed
+        """
+        if self.deadline is None:
+            return self.request_params
+        return self.deadline.bound_request_params(self.request_params)
+
+    def request(self):
+        """Send the request.
+
+        :returns: future whose result is the tuple (swagger result, http
+            response), regardless of also_return_response
+        :rtype: :class:`HttpFuture`
+        """
+        return self.http_client.request(
+            self.get_request_params(),
+            operation=self.operation,
+            response_callbacks=self.request_options['response_callbacks'],
+            also_return_response=True,
+        )
+
+    def request_without_operation(self):
+        """Send the request without its operation. The http client returns
+        the response as is, unread, for 2XX status codes, and raises
+        HTTPError for the others.
+
+        :rtype: :class:`HttpFuture`
+        """
+        request_params = dict(self.get_request_params())
+        request_params[SERVICE_CALL_PARAM] = True
+        return self.http_client.request(request_params)
+
+    async def send(self, timeout=None):
+        """Send the request and wait for the response.
+
+        :param timeout: see :meth:`HttpFuture.result`
+        :returns: tuple (swagger result, http response)
+        """
+        timeout = self.get_timeout(timeout)
+        if self.result_mode == MODELS:
+            return await self.request().result(timeout=timeout)
+
+        # The http client only knows how to unmarshal models, the response is
+        # unmarshalled here instead
+        try:
+            incoming_response = await self.request_without_operation().result(timeout=timeout)
+        except HTTPError as e:
+            incoming_response = e.response
+        return await self.unmarshal(incoming_response)
+
+    async def unmarshal(self, incoming_response):
+        """Unmarshal a response of the operation according to the result mode.
+
+        :type incoming_response: :class:`bravado_core.response.IncomingResponse`
+        :returns: tuple (swagger result, http response)
+        :raises: HTTPError for error responses
+        """
+        await unmarshal_response(
+            incoming_response,
+            self.operation,
+            self.request_options['response_callbacks'],
+            self.result_mode,
+        )
+        return incoming_response.swagger_result, incoming_response
+
+    def revalidation(self, etag=None, last_modified=None):
+        """Conditional version of this service call, see
+        :class:`RevalidationServiceCall`.
+
+        :param etag: value of the ETag header of the response to revalidate
+        :param last_modified: value of its Last-Modified header
+        :rtype: :class:`RevalidationServiceCall`
+        """
+        headers = dict(self.request_params.get('headers') or {})
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return RevalidationServiceCall(
+            self.http_client,
+            dict(self.request_params, headers=headers),
+            self.operation,
+            self.request_options,
+            self.also_return_response,
+            self.deadline,
+            self.result_mode,
+        )
+
+    def key(self, headers=None):
+        """Identity of the request, for requests that can be answered with
+        the response to an identical request.
+
+        :param headers: names of the headers which are part of the identity
+            of the request, None for all of them. Other headers, except for
+            conditional request headers, are ignored.
+        :returns: hashable key made of the method, url, query parameters,
+            the values of the given headers and the result mode, or None if
+            the request is not a GET or HEAD request
+        """
+        request_params = self.request_params
+        if request_params['method'] not in IDEMPOTENT_READ_METHODS or request_params.get('data') is not None:
+            return None
+        request_headers = request_params.get('headers') or {}
+        try:
+            if headers is None:
+                header_values = tuple(sorted(
+                    (name.lower(), value) for name, value in six.iteritems(request_headers)
+                ))
+            else:
+                header_values = tuple(
+                    request_headers.get(header) for header in tuple(headers) + CONDITIONAL_REQUEST_HEADERS
+                )
+            key = (
+                request_params['method'],
+                request_params['url'],
+                _freeze(request_params.get('params') or {}),
+                header_values,
+                self.result_mode,
+            )
+            hash(key)
+        except TypeError:
+            # unorderable or unhashable values
+            return None
+        return key
+
+
+class RevalidationServiceCall(ServiceCall):
+    """Service call with conditional request headers. A ``304 Not Modified``
+    response is not unmarshalled, :meth:`send` returns the tuple (None, http
+    response) for it.
+    """
+
+    async def send(self, timeout=None):
+        timeout = self.get_timeout(timeout)
+        try:
+            incoming_response = await self.request_without_operation().result(timeout=timeout)
+        except HTTPError as e:
+            if e.status_code == 304:
+                return None, e.response
+            incoming_response = e.response
+        return await self.unmarshal(incoming_response)
+
+
+class DeferredHttpFuture(object):
+    """Future of a service call that goes through request policies, e.g. a
+    :class:`aiobravado.limiter.ConcurrencyLimiter`. Unlike with
+    :class:`HttpFuture`, the request is only sent when :meth:`result` is
+    called.
+
+    A request policy is a callable ``policy(service_call, timeout, send)``
+    returning an awaitable for the tuple (swagger result, http response). It
+    calls ``send(service_call, timeout)`` to go through the next policies and
+    send the request, as many times as it sees fit, possibly with another
+    service call, e.g. one returned by :meth:`ServiceCall.revalidation`.
+
+    If the service call has a deadline, it bounds the whole of :meth:`result`,
+    request policies included.
+
+    :type service_call: :class:`ServiceCall`
+    :param request_policies: list of request policies, outermost first
+    """
+
+    def __init__(self, service_call, request_policies):
+        self.service_call = service_call
+        self.request_policies = request_policies
+
+    def _send(self, index, service_call, timeout=None):
+        if index == len(self.request_policies):
+            return service_call.send(timeout)
+        return self.request_policies[index](
+            service_call,
+            timeout,
+            partial(self._send, index + 1),
+        )
+
+    async def result(self, timeout=None):
+        """Send the request through the request policies and wait for the
+        result.
+
+        :param timeout: Number of seconds to wait for a response. Defaults to
+            None which means wait indefinitely.
+        :type timeout: float
+        :return: Depends on the value of also_return_response, see
+            :meth:`HttpFuture.result`
+        :raises: DeadlineExceeded if the deadline of the service call passes
+        """
+        deadline = self.service_call.deadline
+        if deadline is None:
+            swagger_result, incoming_response = await self._send(0, self.service_call, timeout)
+        else:
+            try:
+                swagger_result, incoming_response = await asyncio.wait_for(
+                    self._send(0, self.service_call, timeout),
+                    deadline.get_timeout(),
+                )
+            except asyncio.TimeoutError:
+                # Raises DeadlineExceeded if the deadline is what timed out
+                deadline.get_timeout()
+                raise
+        if self.service_call.also_return_response:
+            return swagger_result, incoming_response
+        return swagger_result
+
+
+async def unmarshal_response(incoming_response, operation, response_callbacks=None, result_mode=MODELS):
     """So the http_client is finished with its part of processing the response.
     This hands the response over to bravado_core for validation and
     unmarshalling and then runs any response callbacks. On success, the
@@ -140,6 +408,7 @@ async def unmarshal_response(incoming_response, operation, response_callbacks=No
     :type operation: :class:`bravado_core.operation.Operation`
     :type response_callbacks: list of callable. See
         bravado_core.client.REQUEST_OPTIONS_DEFAULTS.
+    :param result_mode: one of :data:`aiobravado.unmarshal.RESULT_MODES`
     :raises: HTTPError
         - On 5XX status code, the HTTPError has minimal information.
         - On non-2XX status code with no matching response, the HTTPError
@@ -154,6 +423,7 @@ async def unmarshal_response(incoming_response, operation, response_callbacks=No
         incoming_response.swagger_result = await unmarshal_response_inner(
             response=incoming_response,
             op=operation,
+            result_mode=result_mode,
         )
     except MatchingResponseNotFound as e:
         exception = make_http_exception(
@@ -172,12 +442,13 @@ async def unmarshal_response(incoming_response, operation, response_callbacks=No
     raise_on_expected(incoming_response)
 
 
-async def unmarshal_response_inner(response, op):
+async def unmarshal_response_inner(response, op, result_mode=MODELS):
     """
     Unmarshal incoming http response into a value based on the
     response specification.
     :type response: :class:`bravado_core.response.IncomingResponse`
     :type op: :class:`bravado_core.operation.Operation`
+    :param result_mode: one of :data:`aiobravado.unmarshal.RESULT_MODES`
     :returns: value where type(value) matches response_spec['schema']['type']
         if it exists, None otherwise.
     """
@@ -192,18 +463,20 @@ async def unmarshal_response_inner(response, op):
     if content_type.startswith(APP_JSON) or content_type.startswith(APP_MSGPACK):
         content_spec = deref(response_spec['schema'])
         if content_type.startswith(APP_JSON):
-            content_value = await response.json()
+            json_codec = getattr(op.swagger_spec, 'json_codec', None)
+            if json_codec is None:
+                content_value = await response.json()
+            else:
+                content_value = json_codec.loads(await response.raw_bytes)
         else:
             content_value = unpackb(await response.raw_bytes, encoding='utf-8')
 
+        # Validates the whole value, in the lazy result mode too: invalid
+        # responses fail here rather than when a part of them is accessed
         if op.swagger_spec.config.get('validate_responses', False):
             validate_schema_object(op.swagger_spec, content_spec, content_value)
 
-        return unmarshal_schema_object(
-            swagger_spec=op.swagger_spec,
-            schema_object_spec=content_spec,
-            value=content_value,
-        )
+        return unmarshal_value(op.swagger_spec, content_spec, content_value, result_mode)
 
     # TODO: Non-json response contents
     return await response.text
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+JSON codecs used to decode response bodies and specs, and to encode request
+bodies, see the ``json_codec`` config key.
+
+A codec is an object with two methods:
+
+- ``loads(data)`` decoding JSON bytes, or str, to a value
+- ``dumps(value)`` encoding a value to JSON bytes or str
+"""
+import six
+
+from aiobravado.compat import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JsonCodec(object):
+    """Codec using :mod:`aiobravado.compat.json`, i.e. simplejson if it is
+    installed, the standard library json module otherwise.
+    """
+
+    def loads(self, data):
+        if isinstance(data, six.binary_type):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+    def dumps(self, value):
+        return json.dumps(value)
+
+
+class OrjsonCodec(object):
+    """Codec using `orjson <https://github.com/ijl/orjson>`_, several times
+    faster than the json module. orjson only supports str dict keys and
+    integers up to 64 bits.
+    """
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('The orjson codec needs orjson to be installed')
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, value):
+        return orjson.dumps(value)
+
+
+# (key, value) = (name, codec class) of the codecs the json_codec config key
+# can be set to by name
+JSON_CODECS = {
+    'json': JsonCodec,
+    'orjson': OrjsonCodec,
+}
+
+DEFAULT_JSON_CODEC = JsonCodec()
+
+
+def get_json_codec(json_codec):
+    """
+    :param json_codec: None, the name of one of the JSON_CODECS, or a codec
+    :returns: a codec, or None
+    :raises: ValueError if there is no codec with the given name
+    """
+    if not isinstance(json_codec, six.string_types):
+        return json_codec
+    try:
+        return JSON_CODECS[json_codec]()
+    except KeyError:
+        raise ValueError('Unknown JSON codec {0!r}, expected one of {1}'.format(
+            json_codec, ', '.join(sorted(JSON_CODECS)),
+        ))
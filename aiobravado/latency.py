@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Rolling windows of observed request latencies.
+"""
+import math
+from collections import deque
+
+
+class LatencyWindow(object):
+    """The latencies of the last ``size`` requests.
+
+    :param size: number of latencies kept
+    """
+
+    def __init__(self, size=100):
+        self._latencies = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self._latencies)
+
+    def add(self, latency):
+        """
+        :param latency: latency of a request, in seconds
+        """
+        self._latencies.append(latency)
+
+    def percentile(self, percentile):
+        """Nearest-rank percentile of the latencies in the window.
+
+        :param percentile: between 0 and 100, e.g. 95 for the p95
+        :returns: latency in seconds, or None if the window is empty
+        """
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        rank = int(math.ceil(percentile / 100.0 * len(latencies)))
+        return latencies[min(max(rank, 1), len(latencies)) - 1]
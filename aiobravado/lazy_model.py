@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Lazy unmarshalling, see the ``'lazy'`` result mode. Instead of converting
+the whole decoded body up front, it is wrapped in read-only proxies which
+convert nested objects, arrays and formatted strings the first time they are
+accessed, and keep the converted value. Callers reading a few fields of a
+large response only pay for these fields.
+
+- Models are returned as :class:`LazyModel`, supporting attribute and item
+  access like :class:`bravado_core.model.Model`
+- Other objects are returned as :class:`LazyDict`, a read-only mapping
+- Arrays are returned as :class:`LazyList`, a read-only sequence
+
+Response validation is not lazy: with ``validate_responses`` enabled, the
+whole decoded body is still validated before it is wrapped.
+"""
+from collections.abc import Mapping
+from collections.abc import Sequence
+
+from bravado_core.formatter import to_python
+from bravado_core.model import is_model
+from bravado_core.model import MODEL_MARKER
+from six import iteritems
+
+
+def _collect_properties(swagger_spec, schema, properties):
+    # Properties of the schema and of the schemas it includes through allOf.
+    # Returns the schema of additional properties, None if there is none.
+    additional_properties = None
+    for part in schema.get('allOf', ()):
+        part_additional_properties = _collect_properties(swagger_spec, swagger_spec.deref(part), properties)
+        if additional_properties is None:
+            additional_properties = part_additional_properties
+    properties.update(schema.get('properties') or {})
+    if isinstance(schema.get('additionalProperties'), dict):
+        additional_properties = schema['additionalProperties']
+    return additional_properties
+
+
+def lazy_unmarshal(swagger_spec, schema, value):
+    """Unmarshal a decoded value lazily.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :param schema: schema of the value
+    :param value: decoded value, e.g. from a JSON body
+    :returns: a :class:`LazyModel`, :class:`LazyDict` or :class:`LazyList`
+        for objects and arrays, the converted value for primitives
+    """
+    if value is None:
+        return None
+    schema = swagger_spec.deref(schema)
+
+    if isinstance(value, dict):
+        discriminator = schema.get('discriminator')
+        if discriminator:
+            sub_schema = swagger_spec.spec_dict.get('definitions', {}).get(value.get(discriminator))
+            if sub_schema is not None:
+                schema = sub_schema
+        if is_model(swagger_spec, schema):
+            return LazyModel(swagger_spec, schema, value)
+        return LazyDict(swagger_spec, schema, value)
+
+    if isinstance(value, list):
+        return LazyList(swagger_spec, schema.get('items') or {}, value)
+
+    if 'format' in schema:
+        return to_python(swagger_spec, schema, value)
+    return value
+
+
+def as_plain(value):
+    """Convert the lazy proxies in a value to dicts and lists, recursively.
+
+    :param value: value returned by :func:`lazy_unmarshal`
+    """
+    if isinstance(value, LazyDict):
+        return {name: as_plain(item) for name, item in iteritems(value)}
+    if isinstance(value, LazyList):
+        return [as_plain(item) for item in value]
+    return value
+
+
+class LazyDict(Mapping):
+    """Read-only mapping over a decoded object, converting its values when
+    they are first accessed. Properties which are in the schema but not in
+    the object have their default value, or None, unless
+    ``include_missing_properties`` is disabled.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :param schema: schema of the object, dereferenced
+    :param value: the decoded object
+    """
+
+    __slots__ = ('_swagger_spec', '_schema', '_value', '_properties', '_additional_properties', '_cache')
+
+    def __init__(self, swagger_spec, schema, value):
+        self._swagger_spec = swagger_spec
+        self._schema = schema
+        self._value = value
+        self._properties = {}
+        self._additional_properties = _collect_properties(swagger_spec, schema, self._properties)
+        # (key, value) = (name, converted value)
+        self._cache = {}
+
+    def _include_missing_properties(self):
+        return self._swagger_spec.config.get('include_missing_properties', True)
+
+    def __getitem__(self, name):
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+
+        property_schema = self._properties.get(name)
+        if name in self._value:
+            value = self._value[name]
+            if property_schema is None:
+                property_schema = self._additional_properties
+        elif property_schema is not None and self._include_missing_properties():
+            value = self._swagger_spec.deref(property_schema).get('default')
+        else:
+            raise KeyError(name)
+
+        if property_schema is not None:
+            value = lazy_unmarshal(self._swagger_spec, property_schema, value)
+        self._cache[name] = value
+        return value
+
+    def __iter__(self):
+        for name in self._value:
+            yield name
+        if self._include_missing_properties():
+            for name in self._properties:
+                if name not in self._value:
+                    yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, name):
+        return name in self._value or (name in self._properties and self._include_missing_properties())
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(type(self).__name__, self._value)
+
+    def _as_dict(self):
+        """
+        :returns: the object fully converted, with dicts and lists instead of
+            lazy proxies
+        """
+        return as_plain(self)
+
+
+class LazyModel(LazyDict):
+    """:class:`LazyDict` over an object whose schema is a model. Properties
+    can be accessed as attributes, like with models.
+    """
+
+    __slots__ = ()
+
+    @property
+    def _model_name(self):
+        return self._schema.get(MODEL_MARKER)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError('{0} has no attribute {1}'.format(self._model_name, name))
+
+    def __dir__(self):
+        return sorted(set(dir(type(self))) | set(self))
+
+    def __repr__(self):
+        return '{0}({1})'.format(self._model_name, ', '.join(
+            '{0}={1!r}'.format(name, self[name]) for name in sorted(self)
+        ))
+
+
+class LazyList(Sequence):
+    """Read-only sequence over a decoded array, converting its items when
+    they are first accessed.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :param items_schema: schema of the items
+    :param value: the decoded array
+    """
+
+    __slots__ = ('_swagger_spec', '_items_schema', '_value', '_cache')
+
+    def __init__(self, swagger_spec, items_schema, value):
+        self._swagger_spec = swagger_spec
+        self._items_schema = items_schema
+        self._value = value
+        # converted items, None until an item is accessed
+        self._cache = None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._value)))]
+
+        item = self._value[index]
+        if index < 0:
+            index += len(self._value)
+        if self._cache is None:
+            self._cache = {}
+        try:
+            return self._cache[index]
+        except KeyError:
+            pass
+        item = self._cache[index] = lazy_unmarshal(self._swagger_spec, self._items_schema, item)
+        return item
+
+    def __len__(self):
+        return len(self._value)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, LazyList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(type(self).__name__, self._value)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Lazy variant of :class:`bravado_core.spec.Spec` for very large specs of which
+only a small part is used.
+
+Validating a spec and discovering its models takes time proportional to the
+size of the whole spec, and all resources, operations and models are kept in
+memory. :class:`LazySpec` skips all of that up front. Resources (and models)
+are built the first time they are accessed, from a copy of the spec dict
+pruned down to the operations of that resource and the models reachable from
+them, see :func:`aiobravado.spec_pruning.prune_spec_dict`.
+"""
+import logging
+from collections import defaultdict
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+from bravado_core.resource import convert_path_to_resource
+from bravado_core.spec import build_api_serving_url
+from bravado_core.spec import Spec
+from bravado_core.util import sanitize_name
+from six import iteritems
+
+from aiobravado.spec_cache import build_spec
+from aiobravado.spec_pruning import iter_operations
+from aiobravado.spec_pruning import prune_spec_dict
+
+log = logging.getLogger(__name__)
+
+
+class LazyResources(Mapping):
+    """Mapping of resource names to :class:`bravado_core.resource.Resource`
+    which builds resources on first access.
+
+    :type lazy_spec: :class:`LazySpec`
+    """
+
+    def __init__(self, lazy_spec):
+        self.lazy_spec = lazy_spec
+        # (key, value) = (resource name, list of (path_name, http_method))
+        self._operations = defaultdict(list)
+        # (key, value) = (tag, resource name) for tags which are not valid
+        # python identifiers
+        self._aliases = {}
+        for path_name, http_method, op_spec in iter_operations(lazy_spec.spec_dict):
+            for tag in op_spec.get('tags') or [convert_path_to_resource(path_name)]:
+                resource_name = sanitize_name(tag)
+                self._operations[resource_name].append((path_name, http_method))
+                if tag != resource_name:
+                    self._aliases[tag] = resource_name
+        # (key, value) = (resource name, Resource)
+        self._resources = {}
+
+    def __getitem__(self, item):
+        resource_name = self._aliases.get(item, item)
+        try:
+            return self._resources[resource_name]
+        except KeyError:
+            pass
+
+        operations = self._operations.get(resource_name)
+        if not operations:
+            raise KeyError(item)
+
+        log.debug(u'Building resource %s', resource_name)
+        resource_spec = self.lazy_spec.build_partial_spec(operations=operations)
+        resource = self._resources[resource_name] = resource_spec.resources[resource_name]
+        return resource
+
+    def __iter__(self):
+        return iter(self._operations)
+
+    def __len__(self):
+        return len(self._operations)
+
+    def __contains__(self, item):
+        return self._aliases.get(item, item) in self._operations
+
+
+class LazyDefinitions(Mapping):
+    """Mapping of model names to model types which builds models on first
+    access. Models are shared between all the resources of a
+    :class:`LazySpec`, no matter which resource caused them to be built.
+
+    :type lazy_spec: :class:`LazySpec`
+    """
+
+    def __init__(self, lazy_spec):
+        self.lazy_spec = lazy_spec
+        # (key, value) = (model name, model type)
+        self._models = {}
+
+    def __getitem__(self, item):
+        try:
+            return self._models[item]
+        except KeyError:
+            pass
+
+        if item not in self.lazy_spec.spec_dict.get('definitions', {}):
+            raise KeyError(item)
+
+        log.debug(u'Building model %s', item)
+        self.lazy_spec.build_partial_spec(definitions=[item])
+        return self._models[item]
+
+    def __iter__(self):
+        return iter(self.lazy_spec.spec_dict.get('definitions', {}))
+
+    def __len__(self):
+        return len(self.lazy_spec.spec_dict.get('definitions', {}))
+
+    def __contains__(self, item):
+        return item in self._models or item in self.lazy_spec.spec_dict.get('definitions', {})
+
+    def share_models(self, partial_spec):
+        """Make ``partial_spec`` use the already built models, so that there
+        is only a single model type per model name, and register the models
+        it built for the first time.
+
+        :type partial_spec: :class:`bravado_core.spec.Spec`
+        """
+        for model_name, model_type in list(iteritems(partial_spec.definitions)):
+            shared_model_type = self._models.setdefault(model_name, model_type)
+            if shared_model_type is not model_type:
+                partial_spec.definitions[model_name] = shared_model_type
+
+
+class LazySpec(Spec):
+    """A :class:`bravado_core.spec.Spec` that builds resources and models on
+    demand. The spec is validated piece by piece, only the parts which are
+    actually used are validated.
+
+    :param cache_dir: passed on to :func:`aiobravado.spec_cache.build_spec`
+        when building partial specs.
+    :param remote_ref_documents: passed on to
+        :func:`aiobravado.spec_cache.build_spec` when building partial specs.
+    """
+
+    def __init__(self, spec_dict, origin_url=None, http_client=None, config=None, cache_dir=None,
+                 remote_ref_documents=None):
+        super(LazySpec, self).__init__(spec_dict, origin_url, http_client, config)
+        self.cache_dir = cache_dir
+        self.remote_ref_documents = remote_ref_documents
+
+    @classmethod
+    def from_dict(cls, spec_dict, origin_url=None, http_client=None, config=None, cache_dir=None,
+                  remote_ref_documents=None):
+        spec = cls(
+            spec_dict, origin_url, http_client, config,
+            cache_dir=cache_dir, remote_ref_documents=remote_ref_documents,
+        )
+        spec.build()
+        return spec
+
+    def build(self):
+        self.definitions = LazyDefinitions(self)
+        self.resources = LazyResources(self)
+
+        kwargs = {}
+        if self.config.get('use_spec_url_for_base_path'):
+            kwargs['use_spec_url_for_base_path'] = True
+        self.api_url = build_api_serving_url(
+            spec_dict=self.spec_dict,
+            origin_url=self.origin_url,
+            **kwargs
+        )
+
+    def build_partial_spec(self, operations=(), definitions=()):
+        """Build a spec containing only the given operations and definitions
+        (and what they reference), sharing its models with this spec.
+
+        :param operations: operations to include
+        :type operations: iterable of tuples (path_name, http_method)
+        :param definitions: names of additional definitions to include
+        :rtype: :class:`bravado_core.spec.Spec`
+        """
+        partial_spec = build_spec(
+            prune_spec_dict(self.spec_dict, operations=operations, definitions=definitions),
+            self.origin_url,
+            self.http_client,
+            self.config,
+            cache_dir=self.cache_dir,
+            remote_ref_documents=self.remote_ref_documents,
+        )
+        self.definitions.share_models(partial_spec)
+        partial_spec.json_codec = getattr(self, 'json_codec', None)
+        return partial_spec
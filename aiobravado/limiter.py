@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Limit the number of requests in flight per upstream host and per operation.
+"""
+import asyncio
+from collections import deque
+
+from six import iteritems
+
+from aiobravado.exception import ConcurrencyLimitExceeded
+from aiobravado.request_plan import get_request_plan
+
+
+class Limit(object):
+    """A counting semaphore with a FIFO queue of waiters, which keeps track
+    of how many requests are in flight and queued.
+
+    :param limit: maximum number of requests in flight
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters = deque()
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    async def acquire(self, max_queue_size=None, queue_timeout=None):
+        """Wait for a free slot.
+
+        :param max_queue_size: maximum number of waiting requests, None for
+            no limit
+        :param queue_timeout: maximum number of seconds to wait, None for no
+            limit
+        :raises: ConcurrencyLimitExceeded if the queue is full or the timeout
+            expires
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+
+        if max_queue_size is not None and len(self._waiters) >= max_queue_size:
+            raise ConcurrencyLimitExceeded('Queue is full ({0} requests)'.format(len(self._waiters)))
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # release() hands its slot over to the waiter, in_flight is not
+            # decremented then
+            await asyncio.wait_for(waiter, queue_timeout)
+        except asyncio.TimeoutError:
+            raise ConcurrencyLimitExceeded('Waited for more than {0} seconds in the queue'.format(queue_timeout))
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # got the slot but nobody is going to use it
+                self.release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def release(self):
+        """Free a slot, or hand it over to the first waiter."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class ConcurrencyLimiter(object):
+    """Request policy limiting the number of requests in flight per upstream
+    host and per operation id. Requests over a limit wait in a queue until a
+    slot is free. Use it through the ``concurrency_limiter`` config key or
+    request option.
+
+    :param max_per_host: maximum number of requests in flight per host, None
+        for no limit
+    :param host_limits: dict where (key, value) = (host, limit), overrides
+        max_per_host for the given hosts. A host is ``host[:port]`` as in the
+        url of the request.
+    :param max_per_operation: maximum number of requests in flight per
+        operation id, None for no limit
+    :param operation_limits: dict where (key, value) = (operation id,
+        limit), overrides max_per_operation for the given operations
+    :param max_queue_size: maximum number of requests waiting per host or
+        operation. Requests over it fail right away with
+        :class:`aiobravado.exception.ConcurrencyLimitExceeded`. None for no
+        limit.
+    :param queue_timeout: maximum number of seconds a request waits in a
+        queue before failing with
+        :class:`aiobravado.exception.ConcurrencyLimitExceeded`. None for no
+        limit.
+    """
+
+    def __init__(self, max_per_host=None, host_limits=None, max_per_operation=None, operation_limits=None,
+                 max_queue_size=None, queue_timeout=None):
+        self.max_per_host = max_per_host
+        self.host_limits = host_limits or {}
+        self.max_per_operation = max_per_operation
+        self.operation_limits = operation_limits or {}
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+        # (key, value) = (host, Limit)
+        self._host_limits = {}
+        # (key, value) = (operation id, Limit)
+        self._operation_limits = {}
+
+    def _get_limit(self, limits, key, configured_limits, default_limit):
+        limit = limits.get(key)
+        if limit is None:
+            max_in_flight = configured_limits.get(key, default_limit)
+            if max_in_flight is None:
+                return None
+            limit = limits[key] = Limit(max_in_flight)
+        return limit
+
+    async def __call__(self, service_call, timeout, send):
+        plan = get_request_plan(service_call.operation)
+        # The operation limit comes first, don't hold a host slot while
+        # waiting for an operation slot.
+        limits = [
+            limit
+            for limit in (
+                self._get_limit(self._operation_limits, plan.operation_id, self.operation_limits,
+                                self.max_per_operation),
+                self._get_limit(self._host_limits, plan.host, self.host_limits, self.max_per_host),
+            )
+            if limit is not None
+        ]
+
+        acquired = []
+        try:
+            for limit in limits:
+                await limit.acquire(self.max_queue_size, self.queue_timeout)
+                acquired.append(limit)
+            return await send(service_call, timeout)
+        finally:
+            for limit in acquired:
+                limit.release()
+
+    def gauges(self):
+        """Current number of requests in flight and queued.
+
+        :returns: dict like ``{'hosts': {host: {'in_flight': int, 'queued':
+            int}}, 'operations': {operation_id: {...}}}``
+        """
+        return {
+            'hosts': {
+                host: {'in_flight': limit.in_flight, 'queued': limit.queued}
+                for host, limit in iteritems(self._host_limits)
+            },
+            'operations': {
+                operation_id: {'in_flight': limit.in_flight, 'queued': limit.queued}
+                for operation_id, limit in iteritems(self._operation_limits)
+            },
+        }
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Everything needed to turn the kwargs of an operation invocation into an
+outgoing request that does not depend on the kwargs themselves is computed
+once per :class:`bravado_core.operation.Operation` and stored in a
+:class:`RequestPlan`. This keeps the per-call cost of building a request
+proportional to the number of parameters passed in rather than to the size of
+the operation.
+"""
+import weakref
+
+from six import itervalues
+from six.moves.urllib import parse as urlparse
+
+# (key, value) = (operation, RequestPlan)
+_request_plans = weakref.WeakKeyDictionary()
+
+
+class RequestPlan(object):
+    """Precomputed request data for a single operation.
+
+    :param operation: operation to build the plan for
+    :type operation: :class:`bravado_core.operation.Operation`
+    """
+
+    def __init__(self, operation):
+        self.operation_id = operation.operation_id
+        self.method = str(operation.http_method.upper())
+        self.url = operation.swagger_spec.api_url.rstrip('/') + operation.path_name
+        self.host = urlparse.urlparse(self.url).netloc
+        self.is_deprecated = bool(operation.op_spec.get('deprecated', False))
+
+        # (key, value) = (param name, Param)
+        self.params = dict(operation.params)
+
+        # Params that still need to be looked at when the caller did not pass
+        # them in: header params (the value might be in the request headers),
+        # required params and params with a default value. Everything else can
+        # be skipped. The order of operation.params is preserved so that
+        # errors are raised for the same parameter as before.
+        self.implicit_params = tuple(
+            param for param in itervalues(operation.params)
+            if param.location == 'header' or param.required or param.has_default()
+        )
+
+
+def get_request_plan(operation):
+    """Return the :class:`RequestPlan` for the given operation, building it
+    on first use.
+
+    :type operation: :class:`bravado_core.operation.Operation`
+    :rtype: :class:`RequestPlan`
+    """
+    try:
+        return _request_plans[operation]
+    except KeyError:
+        plan = _request_plans[operation] = RequestPlan(operation)
+        return plan
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Client-side cache of the results of GET requests, with revalidation of stale
+results.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from six import iteritems
+
+log = logging.getLogger(__name__)
+
+
+def parse_cache_control(header_value):
+    """Parse the value of a ``Cache-Control`` header.
+
+    :param header_value: value of the header, or None
+    :returns: dict where (key, value) = (lowercase directive name, directive
+        value or None)
+    """
+    directives = {}
+    for directive in (header_value or '').split(','):
+        name, _, value = directive.partition('=')
+        name = name.strip().lower()
+        if name:
+            directives[name] = value.strip().strip('"') or None
+    return directives
+
+
+def _parse_seconds(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class CacheEntry(object):
+    """A cached response.
+
+    :param swagger_result: unmarshalled result of the response
+    :param incoming_response: the response, None if responses are not stored
+    :param etag: value of the ETag header of the response
+    :param last_modified: value of the Last-Modified header of the response
+    """
+
+    def __init__(self, swagger_result, incoming_response, etag=None, last_modified=None):
+        self.swagger_result = swagger_result
+        self.incoming_response = incoming_response
+        self.etag = etag
+        self.last_modified = last_modified
+        # time.monotonic() values after which the entry is stale, and after
+        # which it can not be served while being revalidated anymore
+        self.expires_at = 0
+        self.stale_until = 0
+        # task revalidating the entry in the background
+        self.revalidation = None
+
+    def is_fresh(self, now):
+        return now < self.expires_at
+
+    def can_revalidate(self):
+        return bool(self.etag or self.last_modified)
+
+    def refresh(self, ttl, stale_while_revalidate):
+        now = time.monotonic()
+        self.expires_at = now + ttl
+        self.stale_until = self.expires_at + stale_while_revalidate
+
+
+class ResponseCache(object):
+    """Request policy caching the results of successful GET and HEAD
+    requests. Use it through the ``response_cache`` config key or request
+    option.
+
+    Responses are cached for as long as their ``Cache-Control: max-age``
+    allows, and not at all if they are marked ``no-store``.
+    ``operation_ttls`` overrides this per operation. Requests are identical,
+    and share cache entries, if they have the same method, url, query
+    parameters and headers.
+
+    Stale responses with an ``ETag`` or ``Last-Modified`` header are
+    revalidated with a conditional request. A ``304 Not Modified`` response
+    makes the cached result fresh again, without decoding or unmarshalling
+    anything. During the ``stale-while-revalidate`` window of a response, the
+    stale result is returned right away and revalidated in the background,
+    once. Responses marked ``no-cache`` are always revalidated.
+
+    The cached results are shared between all callers, don't modify them.
+
+    :param max_size: maximum number of entries. The least recently used
+        entries are evicted first.
+    :param default_ttl: seconds to cache responses without a max-age for.
+        Not cached if None, unless they can be revalidated.
+    :param operation_ttls: dict where (key, value) = (operation id, seconds
+        to cache the responses of the operation for). Takes precedence over
+        Cache-Control.
+    :param stale_while_revalidate: seconds a stale response can be served
+        while it is revalidated in the background. Takes precedence over the
+        stale-while-revalidate Cache-Control directive if not None.
+    :param headers: names of the headers which are part of the identity of
+        a request, None for all of them. Narrowing it, e.g. to
+        ``('Authorization', 'Accept')``, lets requests differing only in
+        other headers share cache entries. Only leave out headers the
+        responses do not depend on, like tracing headers: the entries of a
+        caller are served to any other caller with the same values for these
+        headers.
+    :param store_responses: also cache the http responses, so that calls
+        with also_return_response can be answered from the cache. Without
+        it, these calls bypass the cache.
+    """
+
+    def __init__(self, max_size=1024, default_ttl=None, operation_ttls=None, stale_while_revalidate=None,
+                 headers=None, store_responses=False):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.operation_ttls = operation_ttls or {}
+        self.stale_while_revalidate = stale_while_revalidate
+        self.headers = None if headers is None else tuple(headers)
+        self.store_responses = store_responses
+        # (key, value) = (request key, CacheEntry), least recently used first
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_ttl(self, service_call, incoming_response):
+        """Number of seconds a response can be cached for.
+
+        :type service_call: :class:`aiobravado.http_future.ServiceCall`
+        :type incoming_response: :class:`bravado_core.response.IncomingResponse`
+        :returns: seconds, or None if the response must not be cached
+        """
+        operation_id = service_call.operation.operation_id
+        if operation_id in self.operation_ttls:
+            return self.operation_ttls[operation_id]
+
+        directives = parse_cache_control(incoming_response.headers.get('cache-control'))
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives:
+            return 0
+        max_age = _parse_seconds(directives.get('max-age'))
+        if max_age is None:
+            return self.default_ttl
+        # the response may have been cached by a proxy already
+        return max(max_age - (_parse_seconds(incoming_response.headers.get('age')) or 0), 0)
+
+    def get_stale_while_revalidate(self, incoming_response):
+        """Number of seconds a stale response can be served while it is
+        revalidated.
+        """
+        if self.stale_while_revalidate is not None:
+            return self.stale_while_revalidate
+        directives = parse_cache_control(incoming_response.headers.get('cache-control'))
+        return _parse_seconds(directives.get('stale-while-revalidate')) or 0
+
+    def get_entry(self, key):
+        """
+        :returns: the entry for the request key, fresh or not, or None
+        :rtype: :class:`CacheEntry`
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set_entry(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def remove_expired(self):
+        """Remove the entries which can neither be served nor revalidated
+        anymore.
+        """
+        now = time.monotonic()
+        for key, entry in list(iteritems(self._entries)):
+            if now >= entry.stale_until and not entry.can_revalidate():
+                del self._entries[key]
+
+    def stats(self):
+        """
+        :returns: dict with the number of hits, stale hits, misses,
+            revalidations (304 responses), evictions and entries
+        """
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+        }
+
+    def _store(self, key, service_call, swagger_result, incoming_response):
+        ttl = self.get_ttl(service_call, incoming_response)
+        if ttl is None:
+            return
+        entry = CacheEntry(
+            swagger_result,
+            incoming_response if self.store_responses else None,
+            etag=incoming_response.headers.get('etag'),
+            last_modified=incoming_response.headers.get('last-modified'),
+        )
+        if ttl > 0 or entry.can_revalidate():
+            entry.refresh(ttl, self.get_stale_while_revalidate(incoming_response))
+            self.set_entry(key, entry)
+
+    async def _send(self, key, entry, service_call, timeout, send):
+        """Send the request, conditionally if the entry can be revalidated,
+        and update the cache with the response.
+        """
+        if entry is None or not entry.can_revalidate():
+            swagger_result, incoming_response = await send(service_call, timeout)
+        else:
+            revalidation = service_call.revalidation(entry.etag, entry.last_modified)
+            swagger_result, incoming_response = await send(revalidation, timeout)
+            if incoming_response.status_code == 304:
+                self.revalidations += 1
+                entry.etag = incoming_response.headers.get('etag') or entry.etag
+                ttl = self.get_ttl(service_call, incoming_response)
+                entry.refresh(ttl or 0, self.get_stale_while_revalidate(incoming_response))
+                return entry.swagger_result, entry.incoming_response or incoming_response
+
+        self._store(key, service_call, swagger_result, incoming_response)
+        return swagger_result, incoming_response
+
+    async def _revalidate(self, key, entry, service_call, timeout, send):
+        try:
+            await self._send(key, entry, service_call, timeout, send)
+        except Exception:
+            log.debug(u'Revalidation of %s failed', service_call.request_params['url'], exc_info=True)
+
+    async def __call__(self, service_call, timeout, send):
+        key = service_call.key(self.headers)
+        if key is None or (service_call.also_return_response and not self.store_responses):
+            return await send(service_call, timeout)
+
+        entry = self.get_entry(key)
+        if entry is not None:
+            now = time.monotonic()
+            if entry.is_fresh(now):
+                self.hits += 1
+                return entry.swagger_result, entry.incoming_response
+            if now < entry.stale_until:
+                self.stale_hits += 1
+                if entry.revalidation is None or entry.revalidation.done():
+                    entry.revalidation = asyncio.ensure_future(
+                        self._revalidate(key, entry, service_call, timeout, send),
+                    )
+                return entry.swagger_result, entry.incoming_response
+
+        self.misses += 1
+        return await self._send(key, entry, service_call, timeout, send)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Retrying failed requests with exponential backoff.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from email.utils import mktime_tz
+from email.utils import parsedate_tz
+
+from aiohttp import ClientConnectionError
+
+from aiobravado.exception import BravadoTimeoutError
+from aiobravado.exception import HTTPError
+
+log = logging.getLogger(__name__)
+
+# Methods of requests which have the same effect when sent more than once
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'))
+
+# Errors of requests which may succeed if sent again
+RETRIABLE_EXCEPTIONS = (BravadoTimeoutError, asyncio.TimeoutError, ConnectionError, ClientConnectionError)
+
+# Status codes of responses to requests which may succeed if sent again
+RETRIABLE_STATUS_CODES = frozenset((429, 502, 503, 504))
+
+
+def parse_retry_after(header_value):
+    """Parse the value of a ``Retry-After`` header.
+
+    :param header_value: number of seconds or HTTP date, or None
+    :returns: number of seconds to wait, or None
+    """
+    if not header_value:
+        return None
+    try:
+        return max(float(header_value), 0.0)
+    except ValueError:
+        pass
+    parsed_date = parsedate_tz(header_value)
+    if parsed_date is None:
+        return None
+    return max(mktime_tz(parsed_date) - time.time(), 0.0)
+
+
+class RetryBudget(object):
+    """Limits the number of retries to a ratio of the number of requests, so
+    that retries can't multiply the load on a failing service. Share a
+    budget between several :class:`RetryPolicy` to limit their retries
+    together.
+
+    :param ratio: maximum number of retries per request, over ``window``
+    :param min_retries: number of retries allowed in ``window`` regardless of
+        the number of requests, so that services with little traffic can
+        retry as well
+    :param window: number of seconds the requests and retries are counted
+        over
+    """
+
+    def __init__(self, ratio=0.2, min_retries=10, window=10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        # [second, requests, retries] per second of the window, oldest first
+        self._buckets = deque()
+        self._requests = 0
+        self._retries = 0
+
+    def _current_bucket(self):
+        now = int(time.monotonic())
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            _, requests, retries = self._buckets.popleft()
+            self._requests -= requests
+            self._retries -= retries
+        if not self._buckets or self._buckets[-1][0] != now:
+            self._buckets.append([now, 0, 0])
+        return self._buckets[-1]
+
+    def record_request(self):
+        self._current_bucket()[1] += 1
+        self._requests += 1
+
+    def try_retry(self):
+        """Withdraw a retry from the budget.
+
+        :returns: False if the budget is exhausted
+        """
+        bucket = self._current_bucket()
+        if self._retries >= max(self.min_retries, self.ratio * self._requests):
+            return False
+        bucket[2] += 1
+        self._retries += 1
+        return True
+
+
+class RetryPolicy(object):
+    """Request policy sending requests again if they fail with a connection
+    error, a timeout or one of the ``status_codes``. Use it through the
+    ``retry_policy`` config key or request option.
+
+    Attempts are spaced by an exponential backoff: ``backoff_base * 2 **
+    (attempt - 1)`` seconds, at most ``backoff_max``. With jitter, a random
+    delay between 0 and that value is used instead. If the response has a
+    ``Retry-After`` header, it is used instead, unless it asks to wait for
+    longer than ``max_retry_after`` seconds, in which case the error is
+    raised.
+
+    :param max_attempts: maximum number of times a request is sent
+    :param backoff_base: seconds to wait before the first retry
+    :param backoff_max: maximum number of seconds to wait between attempts
+    :param jitter: randomize the backoff
+    :param status_codes: status codes of the responses to retry
+    :param exceptions: exception types of the errors to retry
+    :param methods: http methods of the requests to retry. Only idempotent
+        methods by default.
+    :param max_retry_after: maximum Retry-After to honor, in seconds
+    :param budget: retry budget, a new one by default
+    :type budget: :class:`RetryBudget`
+    """
+
+    def __init__(self, max_attempts=3, backoff_base=0.1, backoff_max=10.0, jitter=True,
+                 status_codes=RETRIABLE_STATUS_CODES, exceptions=RETRIABLE_EXCEPTIONS, methods=IDEMPOTENT_METHODS,
+                 max_retry_after=30.0, budget=None):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.status_codes = frozenset(status_codes)
+        self.exceptions = tuple(exceptions)
+        self.methods = frozenset(methods)
+        self.max_retry_after = max_retry_after
+        self.budget = RetryBudget() if budget is None else budget
+        self.retries = 0
+        self.budget_exhausted = 0
+
+    def get_backoff(self, attempt):
+        """
+        :param attempt: number of the attempt which failed, starting at 1
+        :returns: seconds to wait before the next attempt
+        """
+        backoff = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        if self.jitter:
+            return random.uniform(0, backoff)
+        return backoff
+
+    def get_retry_delay(self, exception, attempt):
+        """
+        :param exception: error of the attempt which failed
+        :param attempt: number of the attempt which failed, starting at 1
+        :returns: seconds to wait before the next attempt, or None if the
+            error must not be retried
+        """
+        if isinstance(exception, HTTPError):
+            if exception.status_code not in self.status_codes:
+                return None
+            retry_after = parse_retry_after(exception.response.headers.get('retry-after'))
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+        elif not isinstance(exception, self.exceptions):
+            return None
+        return self.get_backoff(attempt)
+
+    async def __call__(self, service_call, timeout, send):
+        if service_call.request_params['method'] not in self.methods:
+            return await send(service_call, timeout)
+
+        self.budget.record_request()
+        attempt = 1
+        while True:
+            try:
+                return await send(service_call, timeout)
+            except Exception as e:
+                if attempt >= self.max_attempts:
+                    raise
+                delay = self.get_retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                if service_call.deadline is not None and delay >= service_call.deadline.remaining():
+                    # the next attempt could not complete in time
+                    raise
+                if not self.budget.try_retry():
+                    self.budget_exhausted += 1
+                    raise
+                log.debug(
+                    u'Retrying %s in %.3fs after attempt %d failed with %r',
+                    service_call.operation.operation_id, delay, attempt, e,
+                )
+
+            self.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
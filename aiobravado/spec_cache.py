@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Caches that speed up (re)loading specs.
+
+Building a spec validates it, resolves refs and creates all resources,
+operations and models, which can take a significant amount of time for large
+specs. :func:`build_spec` pickles the built spec into a cache directory, keyed
+by a hash of the spec dict, the documents it references, the origin url and
+the bravado-core config, and unpickles it the next time the same spec is used
+with the same config. Specs referencing documents whose content is not known
+up front are not cached. Loading a pickled spec can run arbitrary code, so the
+cache directory must only be writable by the account running the service.
+
+:class:`SpecResponseCache` remembers downloaded spec documents together with
+their ``ETag`` / ``Last-Modified`` headers, so that
+:class:`aiobravado.swagger_model.Loader` can revalidate them with conditional
+requests instead of downloading them again.
+"""
+import copy
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from collections import namedtuple
+
+import bravado_core
+from bravado_core.spec import Spec
+from six import itervalues
+from six.moves.urllib import parse as urlparse
+
+from aiobravado.compat import json
+
+log = logging.getLogger(__name__)
+
+
+def iter_ref_urls(document, base_url):
+    """Yield the urls of the documents referenced by the $refs in document,
+    whatever their scheme.
+
+    :param document: swagger spec (or part of it) in dict form
+    :param base_url: url of document, relative refs are resolved against it
+    """
+    pending = [document]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, dict):
+            ref = item.get('$ref')
+            if isinstance(ref, str) and not ref.startswith('#'):
+                yield urlparse.urldefrag(urlparse.urljoin(base_url or '', ref))[0]
+            pending.extend(itervalues(item))
+        elif isinstance(item, list):
+            pending.extend(item)
+
+
+def get_referenced_documents(spec_dict, origin_url, documents):
+    """Collect the documents a spec references, directly or not.
+
+    :param spec_dict: swagger spec in json-like dict form
+    :param origin_url: the url used to retrieve the spec, if any
+    :param documents: dict where (key, value) = (url, document in dict form)
+        of the documents already downloaded, or None
+    :returns: dict where (key, value) = (url, document) of the referenced
+        documents, or None if some of them are not in documents
+    """
+    documents = documents or {}
+    referenced = {}
+    pending = [(spec_dict, origin_url)]
+    while pending:
+        document, base_url = pending.pop()
+        for url in iter_ref_urls(document, base_url):
+            if url in referenced:
+                continue
+            if url not in documents:
+                return None
+            referenced[url] = documents[url]
+            pending.append((documents[url], url))
+    return referenced
+
+
+def spec_cache_key(spec_dict, origin_url, config, documents=None):
+    """Compute the cache key for a spec.
+
+    :param spec_dict: swagger spec in json-like dict form
+    :param origin_url: the url used to retrieve the spec, if any
+    :param config: bravado-core config dict
+    :param documents: dict where (key, value) = (url, document in dict form)
+        of the documents referenced by the spec, see
+        :func:`get_referenced_documents`
+    :rtype: str
+    """
+    # User-defined formats contain callables which have no stable
+    # representation, so only their names are taken into account.
+    key_config = dict(config)
+    key_config['formats'] = sorted(
+        user_defined_format.format
+        for user_defined_format in key_config.get('formats') or ()
+    )
+    key_data = {
+        'spec_dict': spec_dict,
+        'documents': documents or {},
+        'origin_url': origin_url,
+        'config': key_config,
+        'bravado_core_version': bravado_core.version,
+        'python_version': list(sys.version_info[:2]),
+    }
+    serialized = json.dumps(key_data, sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def _load_cached_spec(cache_path, http_client):
+    """Load a spec stored by _store_spec.
+
+    The file is unpickled, and unpickling can run arbitrary code: the cache
+    directory must be trusted, writable only by the account running the
+    service and not shared with untrusted processes.
+
+    :param cache_path: path of the cache file
+    :returns: the spec, or None if the file is missing or unreadable
+    :rtype: :class:`bravado_core.spec.Spec`
+    """
+    try:
+        with open(cache_path, 'rb') as fp:
+            swagger_spec = pickle.load(fp)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        log.warning(u'Ignoring unreadable spec cache file %s', cache_path, exc_info=True)
+        return None
+
+    # The http client is not part of the cached state, see _store_spec
+    swagger_spec.http_client = http_client
+    return swagger_spec
+
+
+def _atomic_write(cache_dir, cache_path, data):
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write to a temporary file first and then move it into place, so that
+    # concurrently starting processes never read a partial file.
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def _store_spec(cache_dir, cache_path, swagger_spec):
+    http_client = swagger_spec.http_client
+    swagger_spec.http_client = None
+    try:
+        data = pickle.dumps(swagger_spec, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # e.g. user-defined formats with lambdas, or a bravado-core version
+        # that does not support pickling specs
+        log.warning(u'Unable to cache spec in %s', cache_dir, exc_info=True)
+        return
+    finally:
+        swagger_spec.http_client = http_client
+
+    try:
+        _atomic_write(cache_dir, cache_path, data)
+    except OSError:
+        log.warning(u'Unable to write spec cache file %s', cache_path, exc_info=True)
+
+
+def build_spec(spec_dict, origin_url=None, http_client=None, config=None, cache_dir=None,
+               remote_ref_documents=None):
+    """Build a :class:`bravado_core.spec.Spec`, reusing a previously built
+    one from ``cache_dir`` if available.
+
+    :param spec_dict: swagger spec in json-like dict form
+    :param origin_url: the url used to retrieve the spec, if any
+    :param http_client: http client used to download remote $refs
+    :param config: bravado-core config dict
+    :param cache_dir: directory to store built specs in. Caching is disabled
+        if None.
+    :param remote_ref_documents: dict where (key, value) = (url, document in
+        dict form) of the already downloaded documents referenced by the
+        spec, see :meth:`aiobravado.swagger_model.Loader.load_remote_refs`.
+        Specs referencing other documents are not cached, since changes to
+        these documents would go unnoticed.
+    :rtype: :class:`bravado_core.spec.Spec`
+    """
+    if cache_dir is None:
+        return Spec.from_dict(spec_dict, origin_url, http_client, config)
+
+    documents = get_referenced_documents(spec_dict, origin_url, remote_ref_documents)
+    if documents is None:
+        log.debug(u'Not caching spec %s, it references documents of unknown content', origin_url)
+        return Spec.from_dict(spec_dict, origin_url, http_client, config)
+
+    # Building the spec modifies spec_dict, compute the key beforehand
+    cache_path = os.path.join(
+        cache_dir,
+        'spec-{0}.pickle'.format(spec_cache_key(spec_dict, origin_url, config or {}, documents)),
+    )
+    swagger_spec = _load_cached_spec(cache_path, http_client)
+    if swagger_spec is not None:
+        log.debug(u'Loaded spec from cache file %s', cache_path)
+        return swagger_spec
+
+    swagger_spec = Spec.from_dict(spec_dict, origin_url, http_client, config)
+    _store_spec(cache_dir, cache_path, swagger_spec)
+    return swagger_spec
+
+
+CachedSpecResponse = namedtuple('CachedSpecResponse', ['etag', 'last_modified', 'spec_dict'])
+
+
+class SpecResponseCache(object):
+    """Downloaded spec documents and their validators (``ETag`` and
+    ``Last-Modified`` response headers), kept in memory and, if
+    ``cache_dir`` is given, on disk so that they survive restarts. Files are
+    stored as JSON, unreadable ones are treated as cache misses.
+
+    :param cache_dir: directory to store the documents in
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        # (key, value) = (url, CachedSpecResponse)
+        self._entries = {}
+
+    def _cache_path(self, url):
+        return os.path.join(
+            self.cache_dir,
+            'response-{0}.json'.format(hashlib.sha256(url.encode('utf-8')).hexdigest()),
+        )
+
+    def get(self, url):
+        """
+        :param url: url of the spec document
+        :returns: the cached response, or None
+        :rtype: :class:`CachedSpecResponse`
+        """
+        entry = self._entries.get(url)
+        if entry is None and self.cache_dir is not None:
+            cache_path = self._cache_path(url)
+            try:
+                with open(cache_path, 'rb') as fp:
+                    entry = CachedSpecResponse(**json.loads(fp.read().decode('utf-8')))
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError, TypeError):
+                log.warning(u'Ignoring unreadable spec cache file %s', cache_path, exc_info=True)
+                return None
+            self._entries[url] = entry
+        return entry
+
+    def set(self, url, etag, last_modified, spec_dict):
+        """Remember a downloaded spec document. A copy of spec_dict is
+        stored, so the caller is free to modify it afterwards.
+
+        :param url: url of the spec document
+        :param etag: value of the ETag response header, or None
+        :param last_modified: value of the Last-Modified response header, or
+            None
+        :param spec_dict: the document in dict form
+        """
+        entry = self._entries[url] = CachedSpecResponse(etag, last_modified, copy.deepcopy(spec_dict))
+        if self.cache_dir is not None:
+            cache_path = self._cache_path(url)
+            try:
+                _atomic_write(self.cache_dir, cache_path, json.dumps(entry._asdict()).encode('utf-8'))
+            except (OSError, TypeError, ValueError):
+                # e.g. YAML documents with values JSON can't represent
+                log.warning(u'Unable to write spec cache file %s', cache_path, exc_info=True)
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers to cut a spec dict down to a subset of its operations and models,
+keeping everything they (transitively) reference so that the result is still
+a valid spec.
+"""
+import copy
+import logging
+from collections import defaultdict
+
+from bravado_core.resource import convert_path_to_resource
+from bravado_core.util import sanitize_name
+from six import iteritems
+from six import itervalues
+from six.moves.urllib.parse import unquote
+
+log = logging.getLogger(__name__)
+
+# Top-level sections of a spec whose entries are only kept if referenced
+PRUNED_SECTIONS = ('definitions', 'parameters', 'responses')
+
+
+def _parse_local_ref(ref):
+    """Split a local ref like ``#/definitions/Pet/properties/id`` into the
+    section and name of the top-level entry it points into.
+
+    :rtype: tuple (section, name) or None if the ref is not local to the spec
+        or does not point into a pruned section
+    """
+    if not ref.startswith('#/'):
+        return None
+    tokens = ref[2:].split('/')
+    if len(tokens) < 2 or tokens[0] not in PRUNED_SECTIONS:
+        return None
+    name = unquote(tokens[1]).replace('~1', '/').replace('~0', '~')
+    return tokens[0], name
+
+
+def _iter_refs(value):
+    """Yield all the $ref values contained in value, recursively."""
+    pending = [value]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, dict):
+            ref = item.get('$ref')
+            if isinstance(ref, str):
+                yield ref
+            pending.extend(itervalues(item))
+        elif isinstance(item, list):
+            pending.extend(item)
+
+
+def _build_subtypes_index(definitions):
+    """Map the name of a definition to the names of the definitions that
+    extend it through ``allOf``. Needed to keep the subtypes of polymorphic
+    models, which are not referenced by the model itself.
+    """
+    subtypes = defaultdict(list)
+    for name, definition in iteritems(definitions):
+        if not isinstance(definition, dict):
+            continue
+        for parent_ref in _iter_refs(definition.get('allOf', [])):
+            parsed = _parse_local_ref(parent_ref)
+            if parsed is not None and parsed[0] == 'definitions':
+                subtypes[parsed[1]].append(name)
+    return subtypes
+
+
+def iter_operations(spec_dict):
+    """Yield all the operations of a spec dict.
+
+    :rtype: iterator of tuples (path_name, http_method, op_spec)
+    """
+    for path_name, path_spec in iteritems(spec_dict.get('paths', {})):
+        for http_method, op_spec in iteritems(path_spec):
+            # vendor extensions and parameters that are shared across all
+            # operations for a given path are also defined at this level
+            if http_method.startswith('x-') or http_method == 'parameters':
+                continue
+            yield path_name, http_method, op_spec
+
+
+def select_operations(spec_dict, operation_ids=None, tags=None):
+    """Select the operations of a spec dict matching the given operation ids
+    or tags. Both the names used in the spec and their sanitized versions (as
+    used for attribute access on the client) are accepted. Operations without
+    tags are matched by the resource name derived from their path.
+
+    :param spec_dict: swagger spec in json-like dict form
+    :param operation_ids: operation ids to select
+    :type operation_ids: set of str or None
+    :param tags: tags to select all operations of
+    :type tags: set of str or None
+    :returns: list of tuples (path_name, http_method)
+    """
+    operation_ids = set(operation_ids or ())
+    tags = set(tags or ())
+    selected = []
+    found_operation_ids = set()
+    for path_name, http_method, op_spec in iter_operations(spec_dict):
+        operation_id = op_spec.get('operationId')
+        matching_ids = operation_ids.intersection((operation_id, sanitize_name(operation_id or '')))
+        op_tags = op_spec.get('tags') or [convert_path_to_resource(path_name)]
+        if matching_ids or any(tag in tags or sanitize_name(tag) in tags for tag in op_tags):
+            selected.append((path_name, http_method))
+            found_operation_ids.update(matching_ids)
+
+    missing_operation_ids = operation_ids - found_operation_ids
+    if missing_operation_ids:
+        log.warning(u'Operations not found in spec: %s', ', '.join(sorted(missing_operation_ids)))
+    return selected
+
+
+def prune_spec_dict(spec_dict, operations=(), definitions=()):
+    """Return a copy of ``spec_dict`` which only contains the given
+    operations and definitions, plus the definitions, parameters and
+    responses they reference. Refs to other documents are left untouched.
+
+    :param spec_dict: swagger spec in json-like dict form
+    :param operations: operations to keep
+    :type operations: iterable of tuples (path_name, http_method)
+    :param definitions: names of additional definitions to keep
+    :type definitions: iterable of str
+    :rtype: dict
+    """
+    pruned = {
+        key: value
+        for key, value in iteritems(spec_dict)
+        if key not in PRUNED_SECTIONS and key != 'paths'
+    }
+
+    methods_by_path = defaultdict(set)
+    for path_name, http_method in operations:
+        methods_by_path[path_name].add(http_method)
+
+    pruned['paths'] = {}
+    for path_name, path_spec in iteritems(spec_dict.get('paths', {})):
+        methods = methods_by_path.get(path_name)
+        if methods:
+            pruned['paths'][path_name] = {
+                key: value
+                for key, value in iteritems(path_spec)
+                if key in methods or key == 'parameters' or key.startswith('x-')
+            }
+
+    # (key, value) = (section, set of names of entries to keep)
+    kept = defaultdict(set)
+    subtypes = None
+    pending = [pruned]
+    pending.extend(('definitions', name) for name in definitions)
+    while pending:
+        item = pending.pop()
+        if isinstance(item, tuple):
+            section, name = item
+            entry = spec_dict.get(section, {}).get(name)
+            if entry is None or name in kept[section]:
+                continue
+            kept[section].add(name)
+            pending.append(entry)
+            if section == 'definitions' and isinstance(entry, dict) and 'discriminator' in entry:
+                if subtypes is None:
+                    subtypes = _build_subtypes_index(spec_dict.get('definitions', {}))
+                pending.extend(('definitions', subtype) for subtype in subtypes[name])
+        else:
+            for ref in _iter_refs(item):
+                parsed = _parse_local_ref(ref)
+                if parsed is not None and parsed[1] not in kept[parsed[0]]:
+                    pending.append(parsed)
+
+    for section in PRUNED_SECTIONS:
+        if section in spec_dict:
+            pruned[section] = {
+                name: entry
+                for name, entry in iteritems(spec_dict[section])
+                if name in kept[section]
+            }
+
+    # Building a spec modifies the spec dict, don't share anything with the
+    # original one
+    return copy.deepcopy(pruned)
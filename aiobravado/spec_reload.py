@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Background reloading of the spec of long-lived clients.
+
+:class:`SpecReloader` periodically downloads the spec again, using conditional
+requests, and builds a new :class:`bravado_core.spec.Spec` in an executor
+when it changed. Hashing the spec to detect changes is done in the executor
+too, and skipped when the server answers the conditional requests with
+``304 Not Modified``. The new spec is swapped in by assigning
+:attr:`aiobravado.client.SwaggerClient.swagger_spec`: calls already in flight
+finish on the old spec, new calls use the new one. Nothing is added to the
+cost of a service call.
+"""
+import asyncio
+import hashlib
+import logging
+
+from aiobravado.compat import json
+
+log = logging.getLogger(__name__)
+
+
+def hash_spec_dict(spec_dict, remote_ref_documents=None):
+    """
+    :param spec_dict: swagger spec in json-like dict form
+    :param remote_ref_documents: dict where (key, value) = (url, document in
+        dict form) of the documents referenced by the spec
+    :returns: a hash of the spec dict and of the documents it references,
+        used to detect changes
+    :rtype: str
+    """
+    if remote_ref_documents:
+        spec_dict = {'spec_dict': spec_dict, 'remote_ref_documents': remote_ref_documents}
+    serialized = json.dumps(spec_dict, sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+class SpecReloader(object):
+    """Periodically reload the spec of a client.
+
+    :param client: the client to update
+    :type client: :class:`aiobravado.client.SwaggerClient`
+    :param spec_url: url pointing at the swagger API specification
+    :param loader: loader used to download the spec and its remote refs
+    :type loader: :class:`aiobravado.swagger_model.Loader`
+    :param build_spec: callable building a
+        :class:`bravado_core.spec.Spec` from a spec dict. Run in an executor.
+    :param remote_ref_documents: dict where (key, value) = (url, document in
+        dict form) the http client serves remote refs from, see
+        :func:`aiobravado.client.serve_prefetched_remote_refs`. Updated with
+        the remote refs of new specs.
+    :param interval: seconds to wait between two reloads
+    :param spec_hash: hash of the spec the client currently uses and of the
+        documents it references, see :func:`hash_spec_dict`
+    """
+
+    def __init__(self, client, spec_url, loader, build_spec, remote_ref_documents, interval, spec_hash=None):
+        self.client = client
+        self.spec_url = spec_url
+        self.loader = loader
+        self.build_spec = build_spec
+        self.remote_ref_documents = remote_ref_documents
+        self.interval = interval
+        self.spec_hash = spec_hash
+        # urls of the documents referenced by the current spec
+        self.remote_ref_urls = set(remote_ref_documents)
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start reloading the spec in the background. Does nothing if
+        already started.
+        """
+        if not self.running:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop reloading the spec."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def reload(self):
+        """Download the spec and the documents it references, and swap the
+        spec in if any of them changed.
+
+        :returns: True if the client now uses a new spec
+        """
+        spec_dict = await self.loader.load_spec(self.spec_url, only_if_modified=True)
+        if spec_dict is None:
+            if not await self._remote_refs_modified():
+                log.debug(u"Spec at %s not modified", self.spec_url)
+                return False
+            spec_dict = self.loader.get_cached_spec(self.spec_url)
+        remote_ref_documents = await self.loader.load_remote_refs(spec_dict, self.spec_url)
+
+        # Documents which are no longer referenced are kept around, since
+        # lazily built specs may still need them.
+        self.remote_ref_documents.update(remote_ref_documents)
+
+        loop = asyncio.get_event_loop()
+        spec_hash, swagger_spec = await loop.run_in_executor(
+            None, self._hash_and_build, spec_dict, remote_ref_documents,
+        )
+        self.remote_ref_urls = set(remote_ref_documents)
+        if swagger_spec is None:
+            log.debug(u"Spec at %s did not change", self.spec_url)
+            return False
+
+        self.client.swagger_spec = swagger_spec
+        self.spec_hash = spec_hash
+        log.info(u"Reloaded spec from %s", self.spec_url)
+        return True
+
+    async def _remote_refs_modified(self):
+        documents = await asyncio.gather(*[
+            self.loader.load_spec(url, only_if_modified=True) for url in self.remote_ref_urls
+        ])
+        return any(document is not None for document in documents)
+
+    def _hash_and_build(self, spec_dict, remote_ref_documents):
+        # Run in an executor. Building the spec modifies spec_dict, hash it
+        # beforehand.
+        spec_hash = hash_spec_dict(spec_dict, remote_ref_documents)
+        if spec_hash == self.spec_hash:
+            return spec_hash, None
+        return spec_hash, self.build_spec(spec_dict)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.warning(u"Unable to reload spec from %s", self.spec_url, exc_info=True)
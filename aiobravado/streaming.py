@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming of the items of array responses, see the ``stream`` request option.
+The body of the response is decoded as it is read, and each item is
+unmarshalled as soon as it is complete, instead of buffering, decoding and
+unmarshalling the whole array before returning it.
+"""
+import asyncio
+import codecs
+import inspect
+import re
+from collections import deque
+
+from bravado_core.content_type import APP_JSON
+from bravado_core.content_type import APP_MSGPACK
+from bravado_core.exception import MatchingResponseNotFound
+from bravado_core.response import get_response_spec
+from bravado_core.validate import validate_schema_object
+from msgpack import OutOfData
+from msgpack import Unpacker
+
+from aiobravado.compat import json
+from aiobravado.exception import HTTPError
+from aiobravado.http_future import ServiceCall
+from aiobravado.unmarshal import MODELS
+from aiobravado.unmarshal import unmarshal_value
+
+# Number of bytes read from the response at a time
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Characters which can follow an item of an array
+_VALUE_END = frozenset(' \t\n\r,]')
+
+# First bytes of msgpack arrays: fixarray, array 16 and array 32
+_MSGPACK_ARRAY_HEADERS = frozenset(list(range(0x90, 0xa0)) + [0xdc, 0xdd])
+
+# States of JsonArrayDecoder
+_START = 0
+_FIRST_ITEM = 1
+_ITEM = 2
+_SEPARATOR = 3
+_END = 4
+
+
+class JsonArrayDecoder(object):
+    """Incremental decoder of a JSON array, returning its items as soon as
+    they are complete.
+    """
+
+    def __init__(self):
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._state = _START
+        # Size of the buffer worth trying to decode the next item again at,
+        # so that an item spread over many chunks isn't decoded over and over
+        self._retry_size = 0
+
+    def feed(self, data, final=False):
+        """
+        :param data: next bytes of the document
+        :param final: True if there are no more bytes after these
+        :returns: list of the items completed by these bytes
+        :raises: ValueError if the document is not a JSON array
+        """
+        self._buffer += self._text_decoder.decode(data, final)
+        if len(self._buffer) < self._retry_size and not final:
+            return []
+
+        buffer = self._buffer
+        items = []
+        position = 0
+        while True:
+            position = _WHITESPACE.match(buffer, position).end()
+            if position == len(buffer):
+                break
+
+            if self._state == _START:
+                if buffer[position] != '[':
+                    raise ValueError('Expected a JSON array')
+                self._state = _FIRST_ITEM
+                position += 1
+            elif self._state == _FIRST_ITEM and buffer[position] == ']':
+                self._state = _END
+                position += 1
+            elif self._state in (_FIRST_ITEM, _ITEM):
+                try:
+                    item, end = self._json_decoder.raw_decode(buffer, position)
+                except ValueError:
+                    if final:
+                        raise
+                    self._retry_size = 2 * (len(buffer) - position)
+                    break
+                if not final and (end == len(buffer) or buffer[end] not in _VALUE_END):
+                    # numbers, e.g. 1 in 1.5, may go on in the next bytes
+                    break
+                items.append(item)
+                self._state = _SEPARATOR
+                position = end
+            elif self._state == _SEPARATOR:
+                if buffer[position] == ',':
+                    self._state = _ITEM
+                elif buffer[position] == ']':
+                    self._state = _END
+                else:
+                    raise ValueError('Expected , or ] at position {0}'.format(position))
+                position += 1
+            else:
+                raise ValueError('Extra data after the JSON array')
+
+        self._buffer = buffer[position:]
+        if items:
+            self._retry_size = 0
+        if final and self._state != _END:
+            raise ValueError('Truncated JSON array')
+        return items
+
+
+def _make_unpacker():
+    try:
+        return Unpacker(raw=False)
+    except TypeError:
+        # msgpack-python < 0.5.2
+        return Unpacker(encoding='utf-8')
+
+
+class MsgpackArrayDecoder(object):
+    """Incremental decoder of a msgpack array, returning its items as soon as
+    they are complete. A document which does not start with an array is
+    decoded as a stream of concatenated msgpack objects, each object being
+    an item.
+    """
+
+    def __init__(self):
+        self._unpacker = _make_unpacker()
+        # Number of bytes fed, and decoded. Unpacker.tell() is only accurate
+        # after a successful unpack.
+        self._size = 0
+        self._decoded_size = 0
+        # Number of items of the array left to decode, None until the array
+        # header is decoded, -1 for a stream of concatenated objects
+        self._remaining = None
+
+    def feed(self, data, final=False):
+        """
+        :param data: next bytes of the document
+        :param final: True if there are no more bytes after these
+        :returns: list of the items completed by these bytes
+        :raises: ValueError if the document is not valid
+        """
+        self._unpacker.feed(data)
+        self._size += len(data)
+        items = []
+
+        if self._remaining is None and data:
+            if self._size == len(data) and bytearray(data[:1])[0] not in _MSGPACK_ARRAY_HEADERS:
+                self._remaining = -1
+            else:
+                try:
+                    self._remaining = self._unpacker.read_array_header()
+                    self._decoded_size = self._unpacker.tell()
+                except OutOfData:
+                    pass
+
+        while self._remaining is not None and self._remaining != 0:
+            try:
+                items.append(self._unpacker.unpack())
+            except OutOfData:
+                break
+            self._decoded_size = self._unpacker.tell()
+            if self._remaining > 0:
+                self._remaining -= 1
+
+        incomplete = self._decoded_size < self._size
+        if self._remaining == 0 and incomplete:
+            raise ValueError('Extra data after the msgpack array')
+        if final and (incomplete or (self._remaining or 0) > 0):
+            raise ValueError('Truncated msgpack document')
+        return items
+
+
+def get_body_reader(response):
+    """
+    :type response: :class:`bravado_core.response.IncomingResponse`
+    :returns: object with a coroutine method ``read(size)`` returning the
+        next bytes of the body, at most size, or b'' at the end. None if the
+        response adapter does not support reading the body in chunks.
+    """
+    content = getattr(response, 'content', None)
+    if content is None:
+        # aiohttp response wrapped by a bravado-asyncio response adapter
+        content = getattr(getattr(response, '_delegate', None), 'content', None)
+    if content is not None and hasattr(content, 'read'):
+        return content
+    return None
+
+
+async def release_response(response):
+    """Release the connection of a response. If its body was not read
+    completely, the connection is closed instead of being reused.
+
+    :type response: :class:`bravado_core.response.IncomingResponse`
+    """
+    for raw_response in (response, getattr(response, '_delegate', None)):
+        # aiohttp response, possibly wrapped by a bravado-asyncio response
+        # adapter. release() is a coroutine in older aiohttp versions.
+        release = getattr(raw_response, 'release', None)
+        if release is not None:
+            result = release()
+            if inspect.isawaitable(result):
+                await result
+            return
+
+
+class ItemStream(object):
+    """Async iterator over the items of the array in the body of a response,
+    each one validated and unmarshalled as soon as it is decoded.
+
+    Streams which are not consumed completely must be closed with
+    :meth:`aclose`, or used with ``async with``, to release the connection
+    of the response right away.
+
+    :type response: :class:`bravado_core.response.IncomingResponse`
+    :type op: :class:`bravado_core.operation.Operation`
+    :param items_spec: schema of the items
+    :param decoder: incremental decoder of the body,
+        :class:`JsonArrayDecoder` or :class:`MsgpackArrayDecoder`
+    :param chunk_size: number of bytes read from the response at a time
+    :param deadline: deadline of the service call, bounding the reads
+    :type deadline: :class:`aiobravado.deadline.Deadline`
+    :param result_mode: how the items are unmarshalled, one of
+        :data:`aiobravado.unmarshal.RESULT_MODES`
+    """
+
+    def __init__(self, response, op, items_spec, decoder, chunk_size=DEFAULT_CHUNK_SIZE, deadline=None,
+                 result_mode=MODELS):
+        self.response = response
+        self.op = op
+        self.items_spec = items_spec
+        self.decoder = decoder
+        self.chunk_size = chunk_size
+        self.deadline = deadline
+        self.result_mode = result_mode
+        self._reader = get_body_reader(response)
+        self._items = deque()
+        self._done = False
+
+    async def _read_body(self):
+        if self._reader is not None:
+            return await self._reader.read(self.chunk_size)
+        # the whole body at once
+        self._done = True
+        return await self.response.raw_bytes
+
+    async def _read(self):
+        if self.deadline is None:
+            return await self._read_body()
+        try:
+            return await asyncio.wait_for(self._read_body(), self.deadline.get_timeout())
+        except asyncio.TimeoutError:
+            # Raises DeadlineExceeded if the deadline is what timed out
+            self.deadline.get_timeout()
+            raise
+
+    async def aclose(self):
+        """Stop reading the response and release its connection. Items not
+        read yet are dropped.
+        """
+        self._done = True
+        self._items.clear()
+        await release_response(self.response)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._items:
+            if self._done:
+                raise StopAsyncIteration
+            chunk = await self._read()
+            if not chunk:
+                self._done = True
+            self._items.extend(self.decoder.feed(chunk, final=self._done))
+
+        value = self._items.popleft()
+        swagger_spec = self.op.swagger_spec
+        if swagger_spec.config.get('validate_responses', False):
+            validate_schema_object(swagger_spec, self.items_spec, value)
+        return unmarshal_value(swagger_spec, self.items_spec, value, self.result_mode)
+
+
+def get_item_stream(response, op, chunk_size=DEFAULT_CHUNK_SIZE, deadline=None, result_mode=MODELS):
+    """
+    :type response: :class:`bravado_core.response.IncomingResponse`
+    :type op: :class:`bravado_core.operation.Operation`
+    :param result_mode: see :class:`ItemStream`
+    :returns: :class:`ItemStream` over the items of the response, or None if
+        the response is not a JSON or msgpack array
+    """
+    try:
+        response_spec = get_response_spec(status_code=response.status_code, op=op)
+    except MatchingResponseNotFound:
+        return None
+    deref = op.swagger_spec.deref
+    schema = deref(response_spec.get('schema'))
+    if not schema or schema.get('type') != 'array':
+        return None
+    content_type = response.headers.get('content-type', '').lower()
+    if content_type.startswith(APP_JSON):
+        decoder = JsonArrayDecoder()
+    elif content_type.startswith(APP_MSGPACK):
+        decoder = MsgpackArrayDecoder()
+    else:
+        return None
+    return ItemStream(response, op, deref(schema.get('items', {})), decoder, chunk_size, deadline, result_mode)
+
+
+class StreamingServiceCall(ServiceCall):
+    """Service call whose swagger result is an :class:`ItemStream` over the
+    items of the response, if it is a 2XX response with an array schema.
+    Other responses are unmarshalled as usual.
+
+    Streams can only be consumed once, these service calls are neither
+    cached nor coalesced.
+    """
+
+    def key(self, headers=None):
+        return None
+
+    async def send(self, timeout=None):
+        timeout = self.get_timeout(timeout)
+        response_callbacks = self.request_options['response_callbacks']
+        try:
+            incoming_response = await self.request_without_operation().result(timeout=timeout)
+        except HTTPError as e:
+            incoming_response = e.response
+        else:
+            item_stream = get_item_stream(
+                incoming_response, self.operation, deadline=self.deadline, result_mode=self.result_mode,
+            )
+            if item_stream is not None:
+                incoming_response.swagger_result = item_stream
+                for response_callback in response_callbacks:
+                    response_callback(incoming_response, self.operation)
+                return item_stream, incoming_response
+
+        return await self.unmarshal(incoming_response)
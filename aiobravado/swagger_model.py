@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import collections
 import contextlib
+import copy
+import functools
 import logging
 import os
 import os.path
+import threading
 
 import yaml
 from bravado_asyncio.definitions import RunMode
@@ -14,9 +19,37 @@ from six.moves import urllib
 from six.moves.urllib import parse as urlparse
 
 from aiobravado.compat import json
+from aiobravado.exception import HTTPError
+from aiobravado.json_codec import DEFAULT_JSON_CODEC
+
+try:
+    from yaml import CSafeLoader
+except ImportError:  # pragma: no cover
+    # PyYAML was built without libyaml
+    CSafeLoader = None
 
 log = logging.getLogger(__name__)
 
+# Maximum number of remote ref documents downloaded at the same time
+MAX_CONCURRENT_REMOTE_REF_REQUESTS = 10
+
+# Maximum number of parsed spec files kept in memory, see
+# Loader.load_file_spec
+MAX_PARSED_FILES = 4
+
+# (key, value) = (file path, (modification time, size, parsed document)),
+# least recently used first
+_parsed_files = collections.OrderedDict()
+_parsed_files_lock = threading.Lock()
+
+
+def clear_parsed_files():
+    """Forget the parsed spec files kept in memory by
+    :meth:`Loader.load_file_spec`.
+    """
+    with _parsed_files_lock:
+        _parsed_files.clear()
+
 
 def is_file_scheme_uri(url):
     return urlparse.urlparse(url).scheme == u'file'
@@ -29,19 +62,21 @@ class FileEventual(object):
 
     class FileResponse(object):
 
-        def __init__(self, data):
+        def __init__(self, data, json_codec=None):
             self._text = data
             self.headers = {}
+            self.json_codec = json_codec or DEFAULT_JSON_CODEC
 
         @property
         async def text(self):
             return self._text
 
         async def json(self):
-            return json.loads(self._text.decode('utf-8'))
+            return self.json_codec.loads(self._text)
 
-    def __init__(self, path):
+    def __init__(self, path, json_codec=None):
         self.path = path
+        self.json_codec = json_codec
         self.is_yaml = is_yaml(path)
 
     def get_path(self):
@@ -52,32 +87,84 @@ class FileEventual(object):
     def wait(self, **kwargs):
         with contextlib.closing(urllib.request.urlopen(self.get_path())) as fp:
             content = fp.read()
-            return self.FileResponse(content)
+            return self.FileResponse(content, self.json_codec)
 
     async def result(self, *args, **kwargs):
-        return self.wait(*args, **kwargs)
+        # Reading a large file would block the event loop
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, functools.partial(self.wait, *args, **kwargs))
 
     def cancel(self):
         pass
 
 
-def request(http_client, url, headers):
-    """Download and parse JSON from a URL.
+def _copy_document(value):
+    """Copy a parsed JSON or YAML document. Much faster than
+    :func:`copy.deepcopy` since only dicts and lists need to be copied.
+    """
+    if isinstance(value, dict):
+        return {key: _copy_document(item) for key, item in iteritems(value)}
+    elif isinstance(value, list):
+        return [_copy_document(item) for item in value]
+    return value
 
-    :param http_client: a :class:`aiobravado.http_client.HttpClient`
-    :param url: url for api docs
-    :return: an object with a :func`wait` method which returns the api docs
+
+class PrefetchedResponse(object):
+    """Response for a remote ref document that has already been downloaded,
+    with the synchronous interface expected by bravado-core's ref handlers.
     """
-    if is_file_scheme_uri(url):
-        return FileEventual(url)
 
-    request_params = {
-        'method': 'GET',
-        'url': url,
-        'headers': headers,
-    }
+    def __init__(self, document):
+        self.document = document
+        self.headers = {'content-type': 'application/json'}
+
+    @property
+    def content(self):
+        # only used if the url looks like a YAML document; JSON is valid YAML
+        return json.dumps(self.document)
+
+    @property
+    def text(self):
+        return self.content
+
+    def json(self, **kwargs):
+        # The resolvers used for validation and for building the spec each
+        # get their own copy
+        return copy.deepcopy(self.document)
+
+
+class PrefetchedFuture(object):
+    """Future for a remote ref document that has already been downloaded."""
+
+    def __init__(self, document):
+        self.response = PrefetchedResponse(document)
+
+    def result(self, *args, **kwargs):
+        return self.response
+
+    def cancel(self):
+        pass
+
 
-    return http_client.request(request_params)
+def iter_remote_ref_urls(document, base_url):
+    """Yield the urls of the http(s) documents referenced by $refs in
+    document.
+
+    :param document: swagger spec (or part of it) in dict form
+    :param base_url: url of document, relative refs are resolved against it
+    """
+    pending = [document]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, dict):
+            ref = item.get('$ref')
+            if isinstance(ref, str) and not ref.startswith('#'):
+                url = urlparse.urldefrag(urlparse.urljoin(base_url, ref))[0]
+                if urlparse.urlparse(url).scheme in ('http', 'https'):
+                    yield url
+            pending.extend(itervalues(item))
+        elif isinstance(item, list):
+            pending.extend(item)
 
 
 class Loader(object):
@@ -86,30 +173,172 @@ class Loader(object):
     :param http_client: HTTP client interface.
     :type  http_client: http_client.HttpClient
     :param request_headers: dict of request headers
+    :param response_cache: cache used to revalidate downloaded specs
+    :type  response_cache: :class:`aiobravado.spec_cache.SpecResponseCache`
+    :param use_libyaml: parse YAML with the libyaml based loader. If None, it
+        is used when available. If True, libyaml is required.
+    :param json_codec: codec used to parse JSON specs, see
+        :mod:`aiobravado.json_codec`
     """
 
-    def __init__(self, http_client, request_headers=None):
+    def __init__(self, http_client, request_headers=None, response_cache=None, use_libyaml=None,
+                 json_codec=None):
         self.http_client = http_client
+        # SwaggerClient.from_url wraps the request method of the http client
+        # to serve and add headers to remote ref requests made while building
+        # the spec. Spec requests, e.g. when reloading, bypass these wrappers.
+        self.request_callable = getattr(http_client, 'request', None)
         self.request_headers = request_headers or {}
+        self.response_cache = response_cache
+        self.json_codec = json_codec
 
-    async def load_spec(self, spec_url, base_url=None):
+        if use_libyaml and CSafeLoader is None:
+            raise ImportError('use_libyaml is set but PyYAML was built without libyaml')
+        if use_libyaml is False or CSafeLoader is None:
+            self.yaml_loader = yaml.SafeLoader
+        else:
+            self.yaml_loader = CSafeLoader
+
+    async def load_spec(self, spec_url, base_url=None, only_if_modified=False):
         """Load a Swagger Spec from the given URL
 
+        If a response cache is configured, a previously downloaded spec is
+        revalidated with a conditional request and reused if the server
+        responds with 304 Not Modified.
+
         :param spec_url: URL to swagger.json
         :param base_url: TODO: need this?
+        :param only_if_modified: return None instead of a copy of the
+            previously downloaded spec if it was not modified
         :returns: json spec in dict form
         """
-        response = await request(
-            self.http_client,
-            spec_url,
-            self.request_headers,
-        ).result()
+        if is_file_scheme_uri(spec_url):
+            # Reading and parsing a large file would block the event loop
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, self.load_file_spec, spec_url)
+
+        headers = self.request_headers
+        cached_response = None
+        if self.response_cache is not None:
+            cached_response = self.response_cache.get(spec_url)
+            if cached_response is not None:
+                headers = dict(headers)
+                if cached_response.etag:
+                    headers['If-None-Match'] = cached_response.etag
+                if cached_response.last_modified:
+                    headers['If-Modified-Since'] = cached_response.last_modified
+
+        try:
+            response = await self.request_callable({
+                'method': 'GET',
+                'url': spec_url,
+                'headers': headers,
+            }).result()
+        except HTTPError as e:
+            if cached_response is not None and e.status_code == 304:
+                log.debug(u"Spec at %s not modified, using cached version", spec_url)
+                if only_if_modified:
+                    return None
+                return copy.deepcopy(cached_response.spec_dict)
+            raise
 
         content_type = response.headers.get('content-type', '').lower()
         if is_yaml(spec_url, content_type):
-            return self.load_yaml(await response.text)
+            spec_dict = self.load_yaml(await response.text)
+        else:
+            spec_dict = await self.load_json(response)
+
+        if self.response_cache is not None:
+            etag = response.headers.get('etag')
+            last_modified = response.headers.get('last-modified')
+            if etag or last_modified:
+                self.response_cache.set(spec_url, etag, last_modified, spec_dict)
+
+        return spec_dict
+
+    def get_cached_spec(self, spec_url):
+        """
+        :param spec_url: URL of a spec previously loaded with a response cache
+        :returns: copy of the spec last downloaded from spec_url, in dict form
+        """
+        return copy.deepcopy(self.response_cache.get(spec_url).spec_dict)
+
+    def load_file_spec(self, spec_url):
+        """Load a Swagger Spec from a file:// URL. This blocks, and is run in
+        an executor by :meth:`load_spec`.
+
+        The last MAX_PARSED_FILES parsed files are cached by path,
+        modification time and size, so loading the same unchanged file again
+        only costs a copy of the parsed document. See
+        :func:`clear_parsed_files`.
+
+        :param spec_url: file:// URL of the spec
+        :returns: json spec in dict form
+        """
+        file_eventual = FileEventual(spec_url, self.json_codec)
+        path = urllib.request.url2pathname(urlparse.urlparse(file_eventual.get_path()).path)
+        stat = os.stat(path)
+        with _parsed_files_lock:
+            cached = _parsed_files.get(path)
+            if cached is not None:
+                _parsed_files.move_to_end(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            log.debug(u"Using cached parsed spec for %s", path)
+            return _copy_document(cached[2])
+
+        with open(path, 'rb') as fp:
+            content = fp.read()
+        if file_eventual.is_yaml:
+            spec_dict = self.load_yaml(content)
         else:
+            spec_dict = (self.json_codec or DEFAULT_JSON_CODEC).loads(content)
+
+        with _parsed_files_lock:
+            _parsed_files[path] = (stat.st_mtime_ns, stat.st_size, _copy_document(spec_dict))
+            _parsed_files.move_to_end(path)
+            while len(_parsed_files) > MAX_PARSED_FILES:
+                _parsed_files.popitem(last=False)
+        return spec_dict
+
+    async def load_remote_refs(self, spec_dict, spec_url,
+                               max_concurrency=MAX_CONCURRENT_REMOTE_REF_REQUESTS):
+        """Download all the http(s) documents referenced by $refs in the given
+        spec, and in the documents referenced by it, concurrently.
+
+        :param spec_dict: swagger spec in dict form
+        :param spec_url: url the spec was loaded from
+        :param max_concurrency: maximum number of concurrent downloads
+        :returns: dict where (key, value) = (url, document in dict form)
+        """
+        documents = {}
+        seen_urls = {urlparse.urldefrag(spec_url)[0]}
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        def new_urls(document, base_url):
+            for url in iter_remote_ref_urls(document, base_url):
+                if url not in seen_urls:
+                    seen_urls.add(url)
+                    yield url
+
+        async def load_document(url):
+            async with semaphore:
+                log.debug(u"Loading remote ref %s", url)
+                document = await self.load_spec(url)
+            documents[url] = document
+            await asyncio.gather(*[load_document(ref_url) for ref_url in new_urls(document, url)])
+
+        await asyncio.gather(*[load_document(url) for url in new_urls(spec_dict, spec_url)])
+        return documents
+
+    async def load_json(self, response):
+        """
+        :param response: response with a JSON body
+        :type response: :class:`bravado_core.response.IncomingResponse`
+        :returns: the body in dict form
+        """
+        if self.json_codec is None:
             return await response.json()
+        return self.json_codec.loads(await response.raw_bytes)
 
     def load_yaml(self, text):
         """Load a YAML Swagger spec from the given string, transforming
@@ -121,7 +350,7 @@ class Loader(object):
         :return: Python dictionary representing the spec.
         :raise: yaml.parser.ParserError: If the text is not valid YAML.
         """
-        data = yaml.safe_load(text)
+        data = yaml.load(text, Loader=self.yaml_loader)
         for methods in itervalues(data.get('paths', {})):
             for operation in itervalues(methods):
                 if 'responses' in operation:
@@ -133,8 +362,6 @@ class Loader(object):
         return data
 
 
-# TODO: Adding the file scheme here just adds complexity to request()
-# Is there a better way to handle this?
 async def load_file(spec_file, http_client=None):
     """Loads a spec file
 
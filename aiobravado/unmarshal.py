@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Result modes, deciding how much of the unmarshalling of a response is done,
+see the ``result_mode`` config key and request option:
+
+- ``'models'``: the decoded body is unmarshalled into models, the default
+- ``'raw'``: the decoded body is returned as is
+- ``'formats'``: formatted strings, e.g. dates, are converted, but objects
+  are returned as dicts instead of models
+- ``'lazy'``: the decoded body is wrapped in proxies converting its parts
+  when they are accessed, see :mod:`aiobravado.lazy_model`
+"""
+from bravado_core.formatter import to_python
+from bravado_core.unmarshal import unmarshal_schema_object
+from six import iteritems
+
+from aiobravado.lazy_model import lazy_unmarshal
+
+MODELS = 'models'
+RAW = 'raw'
+FORMATS = 'formats'
+LAZY = 'lazy'
+
+RESULT_MODES = (MODELS, RAW, FORMATS, LAZY)
+
+
+def get_result_mode(config, request_options):
+    """Result mode of a service call: its ``result_mode`` request option, or
+    the one of the client.
+
+    :param config: aiobravado config of the client, see CONFIG_DEFAULTS
+    :param request_options: _request_options of the service call
+    :raises: ValueError if the result mode is not one of RESULT_MODES
+    """
+    result_mode = request_options.get('result_mode', config.get('result_mode', MODELS))
+    if result_mode not in RESULT_MODES:
+        raise ValueError('Unknown result mode {0!r}, expected one of {1}'.format(
+            result_mode, ', '.join(RESULT_MODES),
+        ))
+    return result_mode
+
+
+def _unmarshal_formats(swagger_spec, schema, value, follow_discriminator=True):
+    if value is None:
+        return None
+    schema = swagger_spec.deref(schema)
+
+    if isinstance(value, dict):
+        discriminator = schema.get('discriminator')
+        if follow_discriminator and discriminator:
+            sub_schema = swagger_spec.spec_dict.get('definitions', {}).get(value.get(discriminator))
+            if sub_schema is not None:
+                # the schema of the subtype includes this one through allOf
+                schema = sub_schema
+        for part in schema.get('allOf', ()):
+            value = _unmarshal_formats(swagger_spec, part, value, follow_discriminator=False)
+
+        properties = schema.get('properties') or {}
+        additional_properties = schema.get('additionalProperties')
+        if not isinstance(additional_properties, dict):
+            additional_properties = None
+        if not properties and additional_properties is None:
+            return value
+
+        result = {}
+        for name, item in iteritems(value):
+            item_schema = properties.get(name, additional_properties)
+            result[name] = item if item_schema is None else _unmarshal_formats(swagger_spec, item_schema, item)
+        return result
+
+    if isinstance(value, list):
+        items_schema = schema.get('items')
+        if not items_schema:
+            return value
+        return [_unmarshal_formats(swagger_spec, items_schema, item) for item in value]
+
+    if 'format' in schema:
+        return to_python(swagger_spec, schema, value)
+    return value
+
+
+def unmarshal_formats(swagger_spec, schema, value):
+    """Convert the formatted strings of a decoded value, e.g. date-time
+    strings to datetimes, leaving objects as dicts and arrays as lists.
+    Properties which are not in the schema are kept as they are.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :param schema: schema of the value
+    :param value: decoded value, e.g. from a JSON body
+    :returns: the value with its formatted strings converted
+    """
+    return _unmarshal_formats(swagger_spec, schema, value)
+
+
+def unmarshal_value(swagger_spec, schema, value, result_mode=MODELS):
+    """Unmarshal a decoded value according to a result mode.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :param schema: schema of the value
+    :param value: decoded value, e.g. from a JSON body
+    :param result_mode: one of RESULT_MODES
+    """
+    if result_mode == RAW:
+        return value
+    if result_mode == FORMATS:
+        return unmarshal_formats(swagger_spec, schema, value)
+    if result_mode == LAZY:
+        return lazy_unmarshal(swagger_spec, schema, value)
+    return unmarshal_schema_object(
+        swagger_spec=swagger_spec,
+        schema_object_spec=schema,
+        value=value,
+    )
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the JSON codecs on a large spec and on a response with many models.
+
+Usage: python -m benchmarks.json_codec_benchmark [copies] [pets]
+"""
+import sys
+import timeit
+
+from aiobravado.json_codec import JSON_CODECS
+from benchmarks.synthetic_spec import scaled_petstore_dict
+
+
+def make_pets(count):
+    return [
+        {
+            'id': index,
+            'name': 'pet{0}'.format(index),
+            'category': {'id': index % 10, 'name': 'category{0}'.format(index % 10)},
+            'photoUrls': ['http://example.com/pets/{0}.jpg'.format(index)],
+            'tags': [{'id': 1, 'name': 'good'}, {'id': 2, 'name': 'small'}],
+            'status': 'available',
+        }
+        for index in range(count)
+    ]
+
+
+def main(copies=50, pets=10000, repeat=3):
+    codecs = []
+    for name, codec_class in sorted(JSON_CODECS.items()):
+        try:
+            codecs.append((name, codec_class()))
+        except ImportError:
+            print('{0} is not installed'.format(name))
+
+    payloads = (('spec', scaled_petstore_dict(copies)), ('pets', make_pets(pets)))
+    for payload_name, value in payloads:
+        data = codecs[0][1].dumps(value)
+        print('{0}: {1:.1f} MiB'.format(payload_name, len(data) / 1024.0 / 1024.0))
+        for name, codec in codecs:
+            data = codec.dumps(value)
+            loads = min(timeit.repeat(lambda: codec.loads(data), number=1, repeat=repeat))
+            dumps = min(timeit.repeat(lambda: codec.dumps(value), number=1, repeat=repeat))
+            print('  {0}: loads {1:.3f}s, dumps {2:.3f}s'.format(name, loads, dumps))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Compare startup time and memory of eager and lazy (``lazy_resources``) spec
+building on a large spec of which only a few resources are used.
+
+Usage: python -m benchmarks.lazy_spec_benchmark [copies] [used_resources]
+"""
+import copy
+import gc
+import sys
+import time
+import tracemalloc
+
+from aiobravado.client import SwaggerClient
+from benchmarks.synthetic_spec import scaled_petstore_dict
+
+
+def build_and_use(spec_dict, config, used_resources):
+    client = SwaggerClient.from_spec(spec_dict, config=config)
+    for index in range(used_resources):
+        client.operation('pet{0}'.format(index), 'getPetById{0}'.format(index))
+    return client
+
+
+def measure(spec_dict, config, used_resources):
+    start = time.perf_counter()
+    SwaggerClient.from_spec(copy.deepcopy(spec_dict), config=config)
+    startup_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    build_and_use(copy.deepcopy(spec_dict), config, used_resources)
+    total_time = time.perf_counter() - start
+
+    # tracemalloc slows things down considerably, measure memory separately
+    spec_dict = copy.deepcopy(spec_dict)
+    gc.collect()
+    tracemalloc.start()
+    client = build_and_use(spec_dict, config, used_resources)  # noqa: F841
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return startup_time, total_time, memory
+
+
+def main(copies=50, used_resources=3):
+    spec_dict = scaled_petstore_dict(copies)
+    print('Spec with {0} paths and {1} definitions, using {2} resources'.format(
+        len(spec_dict['paths']), len(spec_dict['definitions']), used_resources))
+
+    for name, config in (('eager', {}), ('lazy', {'lazy_resources': True})):
+        startup_time, total_time, memory = measure(spec_dict, config, used_resources)
+        print('{0}: startup {1:.3f}s, startup + first calls {2:.3f}s, memory {3:.1f} MiB'.format(
+            name, startup_time, total_time, memory / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
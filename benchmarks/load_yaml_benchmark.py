@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Compare parsing a large YAML spec with the pure Python loader and with the
+libyaml based loader.
+
+Usage: python -m benchmarks.load_yaml_benchmark [copies]
+"""
+import sys
+import timeit
+
+import yaml
+
+from aiobravado.swagger_model import CSafeLoader
+from aiobravado.swagger_model import Loader
+from benchmarks.synthetic_spec import scaled_petstore_dict
+
+
+def main(copies=50, repeat=3):
+    text = yaml.safe_dump(scaled_petstore_dict(copies), default_flow_style=False)
+    print('YAML spec of {0:.1f} MiB'.format(len(text) / 1024.0 / 1024.0))
+
+    loaders = [('pure python', Loader(None, use_libyaml=False))]
+    if CSafeLoader is not None:
+        loaders.append(('libyaml', Loader(None, use_libyaml=True)))
+    else:
+        print('PyYAML was built without libyaml')
+
+    for name, loader in loaders:
+        elapsed = min(timeit.repeat(lambda: loader.load_yaml(text), number=1, repeat=repeat))
+        print('{0}: {1:.3f}s'.format(name, elapsed))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
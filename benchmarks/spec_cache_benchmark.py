@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Compare building a client from a large spec without the spec cache (cold)
+with building it from a populated spec cache (warm).
+
+Usage: python -m benchmarks.spec_cache_benchmark [copies]
+"""
+import copy
+import shutil
+import sys
+import tempfile
+import timeit
+
+from aiobravado.client import SwaggerClient
+from benchmarks.synthetic_spec import scaled_petstore_dict
+
+
+def main(copies=50, repeat=3):
+    spec_dict = scaled_petstore_dict(copies)
+    print('Spec with {0} paths and {1} definitions'.format(
+        len(spec_dict['paths']), len(spec_dict['definitions'])))
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            SwaggerClient.from_spec(copy.deepcopy(spec_dict), config={'spec_cache_dir': cache_dir})
+
+        def warm():
+            SwaggerClient.from_spec(copy.deepcopy(spec_dict), config={'spec_cache_dir': cache_dir})
+
+        cold_time = min(timeit.repeat(cold, number=1, repeat=repeat))
+        warm_time = min(timeit.repeat(warm, number=1, repeat=repeat))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print('cold: {0:.3f}s'.format(cold_time))
+    print('warm: {0:.3f}s'.format(warm_time))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers to build large synthetic specs out of the petstore spec in test-data.
+"""
+import copy
+import json
+import os
+
+from six import iteritems
+
+PETSTORE_PATH = os.path.join(
+    os.path.dirname(__file__), os.pardir, 'test-data', '2.0', 'petstore', 'swagger.json',
+)
+
+
+def load_petstore_dict():
+    with open(PETSTORE_PATH) as fp:
+        return json.load(fp)
+
+
+def _rename_refs(value, suffix):
+    if isinstance(value, dict):
+        return {
+            key: (
+                item + suffix
+                if key == '$ref' and item.startswith('#/definitions/')
+                else _rename_refs(item, suffix)
+            )
+            for key, item in iteritems(value)
+        }
+    if isinstance(value, list):
+        return [_rename_refs(item, suffix) for item in value]
+    return value
+
+
+def scaled_petstore_dict(copies):
+    """Build a spec containing ``copies`` renamed copies of all the paths,
+    operations, tags and definitions of the petstore spec.
+
+    :param copies: number of copies of the petstore spec
+    :rtype: dict
+    """
+    petstore_dict = load_petstore_dict()
+    spec_dict = copy.deepcopy(petstore_dict)
+    spec_dict['paths'] = {}
+    spec_dict['definitions'] = {}
+    spec_dict['tags'] = []
+
+    for index in range(copies):
+        suffix = str(index)
+        for path_name, path_item in iteritems(petstore_dict['paths']):
+            path_item = _rename_refs(path_item, suffix)
+            for op_spec in path_item.values():
+                op_spec['operationId'] += suffix
+                op_spec['tags'] = [tag + suffix for tag in op_spec.get('tags', [])]
+            spec_dict['paths']['/v{0}{1}'.format(index, path_name)] = path_item
+
+        for model_name, model_spec in iteritems(petstore_dict['definitions']):
+            spec_dict['definitions'][model_name + suffix] = _rename_refs(model_spec, suffix)
+
+        for tag in petstore_dict.get('tags', []):
+            spec_dict['tags'].append(dict(tag, name=tag['name'] + suffix))
+
+    return spec_dict
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory http client for tests of the request path. Responses are produced
+by a handler coroutine instead of a server, and go through the regular
+:class:`aiobravado.http_future.HttpFuture` unmarshalling.
+"""
+import asyncio
+
+from bravado_core.response import IncomingResponse
+
+from aiobravado.client import SwaggerClient
+from aiobravado.compat import json
+from aiobravado.exception import BravadoTimeoutError
+from aiobravado.http_future import FutureAdapter
+from aiobravado.http_future import HttpFuture
+
+PET = {'id': 1, 'name': 'Lassie', 'photoUrls': []}
+
+
+class FakeResponse(object):
+    """
+    :param body: value of the body, serialized as JSON
+    :param raw_body: bytes of the body, instead of body
+    :param chunk_size: maximum number of bytes the body is read in at a time,
+        to simulate a body received in several packets
+    """
+
+    def __init__(self, status_code=200, body=None, headers=None, raw_body=None, chunk_size=None):
+        self.status_code = status_code
+        self.body = body
+        self.raw_body = json.dumps(body).encode('utf-8') if raw_body is None else raw_body
+        self.chunk_size = chunk_size
+        # header names are case insensitive, like with aiohttp
+        self.headers = {'content-type': 'application/json'}
+        self.headers.update((name.lower(), value) for name, value in (headers or {}).items())
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+class FakeStreamReader(object):
+
+    def __init__(self, data, chunk_size=None):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.position = 0
+
+    async def read(self, size=-1):
+        if size < 0:
+            size = len(self.data)
+        if self.chunk_size is not None:
+            size = min(size, self.chunk_size)
+        chunk = self.data[self.position:self.position + size]
+        self.position += len(chunk)
+        return chunk
+
+
+class FakeResponseAdapter(IncomingResponse):
+
+    def __init__(self, response):
+        self._delegate = response
+        self.content = FakeStreamReader(response.raw_body, response.chunk_size)
+
+    @property
+    def status_code(self):
+        return self._delegate.status_code
+
+    @property
+    def reason(self):
+        return ''
+
+    @property
+    def headers(self):
+        return self._delegate.headers
+
+    @property
+    async def text(self):
+        return self._delegate.raw_body.decode('utf-8')
+
+    @property
+    async def raw_bytes(self):
+        return self._delegate.raw_body
+
+    async def json(self, **kwargs):
+        return json.loads(self._delegate.raw_body.decode('utf-8'))
+
+
+class FakeFutureAdapter(FutureAdapter):
+
+    def __init__(self, http_client, request_params):
+        self.http_client = http_client
+        self.request_params = request_params
+
+    async def result(self, timeout=None):
+        self.http_client.in_flight += 1
+        self.http_client.max_in_flight = max(self.http_client.max_in_flight, self.http_client.in_flight)
+        try:
+            return await asyncio.wait_for(self.http_client.handler(self.request_params), timeout)
+        except asyncio.TimeoutError:
+            raise BravadoTimeoutError()
+        finally:
+            self.http_client.in_flight -= 1
+
+
+async def default_handler(request_params):
+    return FakeResponse(body=PET)
+
+
+class ResponseSequence(object):
+    """Handler returning the given responses, or raising the given
+    exceptions, in order, then 200 responses with PET.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    async def __call__(self, request_params):
+        response = self.responses.pop(0) if self.responses else FakeResponse(body=PET)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class SlowHandler(object):
+    """Handler answering the nth request with PET after delays[n] seconds,
+    then without delay.
+    """
+
+    def __init__(self, *delays):
+        self.delays = list(delays)
+
+    async def __call__(self, request_params):
+        delay = self.delays.pop(0) if self.delays else 0
+        await asyncio.sleep(delay)
+        return FakeResponse(body=PET)
+
+
+class FakeHttpClient(object):
+    """Http client recording the requests it is asked to send.
+
+    :param handler: coroutine function called with the request params of
+        each request, returning a :class:`FakeResponse` or raising
+    """
+
+    def __init__(self, handler=default_handler):
+        self.handler = handler
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def request(self, request_params, operation=None, response_callbacks=None, also_return_response=False):
+        self.requests.append(request_params)
+        return HttpFuture(
+            FakeFutureAdapter(self, request_params),
+            FakeResponseAdapter,
+            operation,
+            response_callbacks,
+            also_return_response,
+        )
+
+
+def make_client(spec_dict, handler=default_handler, config=None):
+    """Build a client sending its requests to a :class:`FakeHttpClient`.
+
+    :param spec_dict: swagger spec in dict form
+    :param handler: see :class:`FakeHttpClient`, or a :class:`FakeResponse`
+        to answer every request with
+    :param config: config of the client
+    :returns: tuple (client, http client)
+    """
+    if isinstance(handler, FakeResponse):
+        response = handler
+
+        async def handler(request_params):
+            return response
+
+    http_client = FakeHttpClient(handler)
+    return SwaggerClient.from_spec(spec_dict, http_client=http_client, config=config), http_client
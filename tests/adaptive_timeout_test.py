@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from mock import patch
+
+from aiobravado.adaptive_timeout import AdaptiveTimeout
+from aiobravado.exception import BravadoTimeoutError
+from testing.fake_http_client import FakeFutureAdapter
+from testing.fake_http_client import make_client
+from testing.fake_http_client import SlowHandler
+
+
+def test_get_timeout():
+    adaptive_timeout = AdaptiveTimeout(percentile=50, factor=2, min_timeout=0.5, max_timeout=10, min_samples=3)
+    assert adaptive_timeout.get_timeout('getPetById') == 10
+
+    window = adaptive_timeout._get_window('getPetById')
+    for latency in (1, 2, 3):
+        window.add(latency)
+    assert adaptive_timeout.get_timeout('getPetById') == 4
+    for latency in (100, 100, 100, 100):
+        window.add(latency)
+    assert adaptive_timeout.get_timeout('getPetById') == 10
+
+    window = adaptive_timeout._get_window('findPetsByStatus')
+    for latency in (0.01, 0.01, 0.01):
+        window.add(latency)
+    assert adaptive_timeout.timeouts() == {'getPetById': 10, 'findPetsByStatus': 0.5}
+
+
+@pytest.mark.asyncio
+async def test_timeout_adapts_to_latencies(petstore_dict):
+    adaptive_timeout = AdaptiveTimeout(factor=2, min_timeout=0.001, min_samples=5)
+    client, _ = make_client(petstore_dict, SlowHandler(*[0] * 5 + [0.5]), {'adaptive_timeout': adaptive_timeout})
+
+    for _ in range(5):
+        await client.pet.getPetById(petId=1).result()
+    assert adaptive_timeout.get_timeout('getPetById') < 0.1
+
+    with pytest.raises(BravadoTimeoutError):
+        await client.pet.getPetById(petId=1).result()
+    # the timed out request counts
+    assert len(adaptive_timeout._get_window('getPetById')) == 6
+
+
+@pytest.mark.asyncio
+async def test_timeout_of_result_is_an_upper_bound(petstore_dict):
+    adaptive_timeout = AdaptiveTimeout(max_timeout=10)
+    client, _ = make_client(petstore_dict, SlowHandler(0.5), {'adaptive_timeout': adaptive_timeout})
+
+    with pytest.raises(BravadoTimeoutError):
+        await client.pet.getPetById(petId=1).result(timeout=0.01)
+
+
+class AsyncioTimeoutFutureAdapter(FakeFutureAdapter):
+    """Lets asyncio.TimeoutError through, like real http clients."""
+
+    async def result(self, timeout=None):
+        return await asyncio.wait_for(self.http_client.handler(self.request_params), timeout)
+
+
+@pytest.mark.asyncio
+async def test_asyncio_timeouts_count(petstore_dict):
+    adaptive_timeout = AdaptiveTimeout(factor=2, min_timeout=0.001, min_samples=5)
+    client, _ = make_client(petstore_dict, SlowHandler(*[0] * 5 + [0.5]), {'adaptive_timeout': adaptive_timeout})
+
+    with patch('testing.fake_http_client.FakeFutureAdapter', AsyncioTimeoutFutureAdapter):
+        for _ in range(5):
+            await client.pet.getPetById(petId=1).result()
+        with pytest.raises(asyncio.TimeoutError):
+            await client.pet.getPetById(petId=1).result()
+    assert len(adaptive_timeout._get_window('getPetById')) == 6
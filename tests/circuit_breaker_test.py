@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+import pytest
+from mock import patch
+
+from aiobravado.circuit_breaker import CircuitBreaker
+from aiobravado.exception import CircuitOpenError
+from aiobravado.exception import HTTPNotFound
+from aiobravado.exception import HTTPServiceUnavailable
+from testing.fake_http_client import FakeResponse
+from testing.fake_http_client import make_client
+from testing.fake_http_client import PET
+from testing.fake_http_client import ResponseSequence
+
+
+async def get_pet(client):
+    return await client.pet.getPetById(petId=1).result()
+
+
+@pytest.mark.asyncio
+async def test_opens_after_consecutive_failures(petstore_dict):
+    circuit_breaker = CircuitBreaker(failure_threshold=2)
+    handler = ResponseSequence(FakeResponse(503, body={}), ConnectionResetError(), FakeResponse(body=[PET]))
+    client, http_client = make_client(petstore_dict, handler, {'circuit_breaker': circuit_breaker})
+
+    with pytest.raises(HTTPServiceUnavailable):
+        await get_pet(client)
+    with pytest.raises(ConnectionResetError):
+        await get_pet(client)
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        await get_pet(client)
+    assert excinfo.value.key == 'getPetById'
+    assert len(http_client.requests) == 2
+    assert circuit_breaker.rejected == 1
+    assert circuit_breaker.states() == {'getPetById': 'open'}
+
+    # other operations are not affected
+    await client.pet.findPetsByStatus(status=['available']).result()
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_failures(petstore_dict):
+    circuit_breaker = CircuitBreaker(failure_threshold=2)
+    handler = ResponseSequence(FakeResponse(503, body={}), FakeResponse(404, body={}), FakeResponse(503, body={}))
+    client, http_client = make_client(petstore_dict, handler, {'circuit_breaker': circuit_breaker})
+
+    for exception_class in (HTTPServiceUnavailable, HTTPNotFound, HTTPServiceUnavailable):
+        with pytest.raises(exception_class):
+            await get_pet(client)
+    assert circuit_breaker.states() == {'getPetById': 'closed'}
+
+
+@pytest.mark.asyncio
+async def test_opens_on_error_rate(petstore_dict):
+    circuit_breaker = CircuitBreaker(failure_threshold=None, error_rate_threshold=0.5, min_requests=4)
+    handler = ResponseSequence(
+        FakeResponse(body=PET), ConnectionResetError(), FakeResponse(body=PET), ConnectionResetError(),
+    )
+    client, http_client = make_client(petstore_dict, handler, {'circuit_breaker': circuit_breaker})
+
+    for _ in range(4):
+        try:
+            await get_pet(client)
+        except ConnectionResetError:
+            pass
+
+    with pytest.raises(CircuitOpenError):
+        await get_pet(client)
+
+
+@pytest.mark.asyncio
+async def test_half_open(petstore_dict):
+    circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    handler = ResponseSequence(ConnectionResetError(), ConnectionResetError())
+    client, http_client = make_client(petstore_dict, handler, {'circuit_breaker': circuit_breaker})
+
+    with pytest.raises(ConnectionResetError):
+        await get_pet(client)
+
+    now = time.monotonic()
+    with patch('aiobravado.circuit_breaker.time.monotonic', return_value=now + 3600):
+        assert circuit_breaker.states() == {'getPetById': 'half_open'}
+        # the probe fails, the circuit opens again
+        with pytest.raises(ConnectionResetError):
+            await get_pet(client)
+        with pytest.raises(CircuitOpenError):
+            await get_pet(client)
+
+    with patch('aiobravado.circuit_breaker.time.monotonic', return_value=now + 7200):
+        assert (await get_pet(client)).id == 1
+        assert circuit_breaker.states() == {'getPetById': 'closed'}
+
+
+@pytest.mark.asyncio
+async def test_half_open_probes_are_limited(petstore_dict):
+    circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    release = asyncio.Event()
+
+    async def handler(request_params):
+        if len(http_client.requests) == 1:
+            raise ConnectionResetError()
+        await release.wait()
+        return FakeResponse(body=PET)
+
+    client, http_client = make_client(petstore_dict, handler, {'circuit_breaker': circuit_breaker})
+
+    with pytest.raises(ConnectionResetError):
+        await get_pet(client)
+
+    probe = asyncio.ensure_future(get_pet(client))
+    await asyncio.sleep(0.01)
+    with pytest.raises(CircuitOpenError):
+        await get_pet(client)
+
+    release.set()
+    assert (await probe).id == 1
+    assert (await get_pet(client)).id == 1
+
+
+@pytest.mark.asyncio
+async def test_per_host(petstore_dict):
+    circuit_breaker = CircuitBreaker(failure_threshold=1, per_host=True)
+    handler = ResponseSequence(ConnectionResetError())
+    client, http_client = make_client(petstore_dict, handler, {'circuit_breaker': circuit_breaker})
+
+    with pytest.raises(ConnectionResetError):
+        await get_pet(client)
+    assert circuit_breaker.states() == {('petstore.swagger.io', 'getPetById'): 'open'}
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from bravado_core.exception import SwaggerMappingError
+
+from aiobravado.exception import HTTPNotFound
+
+
+class FakeFuture(object):
+
+    def __init__(self, http_client, pet_id):
+        self.http_client = http_client
+        self.pet_id = pet_id
+
+    async def result(self, timeout=None):
+        self.http_client.in_flight += 1
+        self.http_client.max_in_flight = max(self.http_client.max_in_flight, self.http_client.in_flight)
+        try:
+            # complete in reverse order
+            await asyncio.sleep(0.001 * (10 - self.pet_id % 10))
+        finally:
+            self.http_client.in_flight -= 1
+        if self.pet_id == 13:
+            raise HTTPNotFound(response=type('Response', (), {'status_code': 404})())
+        return {'id': self.pet_id}
+
+
+class FakeHttpClient(object):
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def request(self, request_params, operation=None, **kwargs):
+        return FakeFuture(self, int(request_params['url'].rsplit('/', 1)[-1]))
+
+
+@pytest.fixture
+def http_client(petstore_client):
+    http_client = petstore_client.swagger_spec.http_client = FakeHttpClient()
+    return http_client
+
+
+@pytest.mark.asyncio
+async def test_batch(petstore_client, http_client):
+    results = await petstore_client.pet.getPetById.batch(
+        [{'petId': pet_id} for pet_id in range(50)] + [{'petId': 1, 'foo': 'bar'}],
+        concurrency=5,
+    )
+
+    assert http_client.max_in_flight == 5
+    assert len(results) == 51
+    assert results[:13] == [{'id': pet_id} for pet_id in range(13)]
+    # failing calls do not affect the others
+    assert isinstance(results[13], HTTPNotFound)
+    assert results[14:50] == [{'id': pet_id} for pet_id in range(14, 50)]
+    assert isinstance(results[50], SwaggerMappingError)
+
+
+@pytest.mark.asyncio
+async def test_batch_empty(petstore_client, http_client):
+    assert await petstore_client.pet.getPetById.batch([]) == []
+
+
+def test_batch_invalid_concurrency(petstore_client):
+    with pytest.raises(ValueError):
+        petstore_client.pet.getPetById.iter_batch([], concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_iter_batch(petstore_client, http_client):
+    results = []
+    async for index, result in petstore_client.pet.getPetById.iter_batch(
+        ({'petId': pet_id} for pet_id in range(10)),
+        concurrency=10,
+    ):
+        results.append((index, result))
+
+    # in the order the calls completed
+    assert results == [(pet_id, {'id': pet_id}) for pet_id in reversed(range(10))]
+
+
+@pytest.mark.asyncio
+async def test_iter_batch_cancel(petstore_client, http_client):
+    batch_iterator = petstore_client.pet.getPetById.iter_batch(
+        [{'petId': pet_id} for pet_id in range(100)],
+        concurrency=2,
+    )
+    async for _ in batch_iterator:
+        break
+    batch_iterator.cancel()
+    await asyncio.sleep(0.05)
+
+    assert http_client.in_flight == 0
+
+
+def failing_kwargs():
+    for pet_id in range(3):
+        yield {'petId': pet_id}
+    raise ValueError('no more pets')
+
+
+@pytest.mark.asyncio
+async def test_iter_batch_failing_kwargs(petstore_client, http_client):
+    batch_iterator = petstore_client.pet.getPetById.iter_batch(failing_kwargs(), concurrency=2)
+    results = []
+
+    async def consume():
+        async for index, result in batch_iterator:
+            results.append(index)
+
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(consume(), 1)
+    # the results of the calls in flight are still there
+    await asyncio.wait_for(consume(), 1)
+    assert sorted(results) == [0, 1, 2]
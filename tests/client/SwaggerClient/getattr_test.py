@@ -43,3 +43,19 @@ def client_tags_with_spaces():
 
 def test_get_resource(client_tags_with_spaces):
     assert type(client_tags_with_spaces._get_resource('my tag')) == ResourceDecorator
+
+
+def test_resource_is_cached(petstore_client):
+    assert petstore_client.pet is petstore_client.pet
+
+
+def test_resource_cache_invalidated_when_spec_is_swapped(petstore_client, petstore_dict):
+    pet_resource = petstore_client.pet
+    petstore_client.swagger_spec = SwaggerClient.from_spec(petstore_dict).swagger_spec
+    assert petstore_client.pet is not pet_resource
+    assert petstore_client.pet.resource is petstore_client.swagger_spec.resources['pet']
+
+
+def test_special_attribute_not_found(petstore_client):
+    with pytest.raises(AttributeError):
+        petstore_client.__deepcopy__
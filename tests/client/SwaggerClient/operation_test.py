@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from aiobravado.client import CallableOperation
+
+
+def test_operation(petstore_client):
+    operation = petstore_client.operation('pet', 'getPetById')
+    assert isinstance(operation, CallableOperation)
+    assert operation.operation is petstore_client.swagger_spec.resources['pet'].getPetById
+
+
+def test_operation_is_stable(petstore_client):
+    operation = petstore_client.operation('pet', 'getPetById')
+    assert petstore_client.operation('pet', 'getPetById') is operation
+    assert petstore_client.pet.getPetById is operation
+
+
+@pytest.mark.parametrize(
+    'resource_name, operation_id, message',
+    [
+        ('foo', 'getPetById', 'foo not found'),
+        ('pet', 'foo', "has no operation 'foo'"),
+    ],
+)
+def test_operation_not_found(petstore_client, resource_name, operation_id, message):
+    with pytest.raises(AttributeError) as excinfo:
+        petstore_client.operation(resource_name, operation_id)
+    assert message in str(excinfo.value)
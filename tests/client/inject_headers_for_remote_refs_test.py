@@ -3,6 +3,7 @@ from bravado_core.operation import Operation
 from mock import Mock
 
 from aiobravado.client import inject_headers_for_remote_refs
+from aiobravado.http_future import SERVICE_CALL_PARAM
 
 
 def test_headers_inject_when_retrieving_remote_ref():
@@ -27,3 +28,17 @@ def test_headers_not_injected_when_making_a_service_call():
     }
     injected_callable(request_params, operation=Mock(spec=Operation))
     assert 'headers' not in request_params
+
+
+def test_headers_not_injected_for_service_calls_without_operation():
+    callable = Mock()
+    headers = {'X-Foo': 'bar'}
+    injected_callable = inject_headers_for_remote_refs(callable, headers)
+    request_params = {
+        'method': 'GET',
+        'url': 'http://foo.bar.com/users/1',
+        'headers': {'If-None-Match': '"v1"'},
+        SERVICE_CALL_PARAM: True,
+    }
+    injected_callable(request_params)
+    assert request_params['headers'] == {'If-None-Match': '"v1"'}
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import pytest
+from bravado_core.operation import Operation
+
+from aiobravado.request_plan import get_request_plan
+from aiobravado.request_plan import RequestPlan
+
+
+@pytest.fixture
+def getPetById_op(minimal_swagger_spec, getPetById_spec):
+    return Operation.from_spec(
+        minimal_swagger_spec, '/pet/{petId}', 'get', getPetById_spec)
+
+
+def test_plan(getPetById_op):
+    plan = RequestPlan(getPetById_op)
+    assert plan.operation_id == 'getPetById'
+    assert plan.method == 'GET'
+    assert plan.url == 'http://localhost/pet/{petId}'
+    assert not plan.is_deprecated
+    assert set(plan.params) == {'petId', 'api_key'}
+
+
+def test_implicit_params_skip_optional_params_without_default(
+    minimal_swagger_spec, getPetById_spec,
+):
+    getPetById_spec['parameters'].append({
+        'name': 'verbose',
+        'in': 'query',
+        'type': 'boolean',
+    })
+    getPetById_spec['parameters'].append({
+        'name': 'limit',
+        'in': 'query',
+        'type': 'integer',
+        'default': 10,
+    })
+    op = Operation.from_spec(
+        minimal_swagger_spec, '/pet/{petId}', 'get', getPetById_spec)
+
+    plan = RequestPlan(op)
+
+    assert 'verbose' in plan.params
+    assert {param.name for param in plan.implicit_params} == {'petId', 'api_key', 'limit'}
+
+
+def test_deprecated(minimal_swagger_spec, getPetById_spec):
+    getPetById_spec['deprecated'] = True
+    op = Operation.from_spec(
+        minimal_swagger_spec, '/pet/{petId}', 'get', getPetById_spec)
+    assert RequestPlan(op).is_deprecated
+
+
+def test_get_request_plan_is_cached(getPetById_op):
+    plan = get_request_plan(getPetById_op)
+    assert isinstance(plan, RequestPlan)
+    assert get_request_plan(getPetById_op) is plan
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from bravado_core.operation import Operation
+from bravado_core.spec import Spec
+from mock import Mock
+
+from aiobravado.client import serve_prefetched_remote_refs
+from aiobravado.http_future import SERVICE_CALL_PARAM
+
+
+def test_serves_prefetched_documents():
+    request_callable = Mock()
+    wrapped = serve_prefetched_remote_refs(request_callable, {'http://foo.bar.com/defs.json': {'Pet': {}}})
+
+    response = wrapped({'method': 'GET', 'url': 'http://foo.bar.com/defs.json#/Pet'}).result()
+
+    assert not request_callable.called
+    assert response.json() == {'Pet': {}}
+    assert response.headers['content-type'] == 'application/json'
+
+
+def test_other_requests_are_passed_through():
+    request_callable = Mock()
+    wrapped = serve_prefetched_remote_refs(request_callable, {'http://foo.bar.com/defs.json': {}})
+
+    wrapped({'method': 'GET', 'url': 'http://foo.bar.com/other.json'})
+    request_params = {'method': 'GET', 'url': 'http://foo.bar.com/defs.json'}
+    operation = Mock(spec=Operation)
+    wrapped(request_params, operation=operation)
+    assert request_callable.call_count == 2
+    request_callable.assert_called_with(request_params, operation=operation)
+
+    # service calls sent without their operation
+    request_params = {'method': 'GET', 'url': 'http://foo.bar.com/defs.json', SERVICE_CALL_PARAM: True}
+    wrapped(request_params)
+    assert request_callable.call_count == 3
+    request_callable.assert_called_with(request_params)
+
+
+def test_spec_built_without_network_io(minimal_swagger_dict):
+    minimal_swagger_dict.update({
+        'swagger': '2.0',
+        'info': {'title': 'Remote refs', 'version': '1.0'},
+    })
+    minimal_swagger_dict['paths']['/pet/{petId}']['get']['responses']['200']['schema'] = {
+        '$ref': 'models.json#/Pet',
+    }
+    models = {
+        'Pet': {
+            'type': 'object',
+            'properties': {'name': {'type': 'string'}},
+        },
+    }
+    http_client = Mock()
+    http_client.request.side_effect = AssertionError('no network I/O expected')
+    http_client.request = serve_prefetched_remote_refs(
+        http_client.request, {'http://localhost/models.json': models})
+
+    spec = Spec.from_dict(minimal_swagger_dict, 'http://localhost/swagger.json', http_client)
+
+    response_schema = spec.resources['pet'].getPetById.op_spec['responses']['200']['schema']
+    assert spec.deref(response_schema) == models['Pet']
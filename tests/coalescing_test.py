@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from aiobravado.client import SwaggerClient
+from aiobravado.coalescing import RequestCoalescer
+from aiobravado.exception import HTTPNotFound
+from testing.fake_http_client import FakeHttpClient
+from testing.fake_http_client import FakeResponse
+from testing.fake_http_client import make_client
+from testing.fake_http_client import PET
+
+
+async def slow_handler(request_params):
+    await asyncio.sleep(0.01)
+    if request_params['url'].endswith('/404'):
+        return FakeResponse(404, body={})
+    return FakeResponse(body=dict(PET, id=int(request_params['url'].rsplit('/', 1)[-1])))
+
+
+@pytest.fixture
+def http_client():
+    return FakeHttpClient(slow_handler)
+
+
+@pytest.fixture
+def coalescer():
+    return RequestCoalescer(headers=('Authorization',))
+
+
+@pytest.fixture
+def client(petstore_dict, http_client, coalescer):
+    return SwaggerClient.from_spec(petstore_dict, http_client=http_client, config={'request_coalescer': coalescer})
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_coalesced(client, http_client, coalescer):
+    results = await asyncio.gather(*[client.pet.getPetById(petId=1).result() for _ in range(10)])
+
+    assert len(http_client.requests) == 1
+    assert coalescer.coalesced == 9
+    assert all(result is results[0] for result in results)
+    assert not coalescer._in_flight
+
+
+@pytest.mark.asyncio
+async def test_different_requests_are_not_coalesced(client, http_client):
+    results = await asyncio.gather(
+        client.pet.getPetById(petId=1).result(),
+        client.pet.getPetById(petId=2).result(),
+        client.pet.getPetById(petId=1, _request_options={'headers': {'Authorization': 'other'}}).result(),
+        client.pet.getPetById(petId=1, _request_options={'headers': {'X-Ignored': 'foo'}}).result(),
+    )
+
+    assert [result.id for result in results] == [1, 2, 1, 1]
+    assert len(http_client.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared(client, http_client):
+    results = await asyncio.gather(
+        *[client.pet.getPetById(petId=404).result() for _ in range(3)],
+        return_exceptions=True
+    )
+
+    assert len(http_client.requests) == 1
+    assert all(isinstance(result, HTTPNotFound) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_a_caller_does_not_cancel_the_request(client, http_client):
+    first = asyncio.ensure_future(client.pet.getPetById(petId=1).result())
+    second = asyncio.ensure_future(client.pet.getPetById(petId=1).result())
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert (await second).id == 1
+    assert len(http_client.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_only_gets_are_coalesced(client, http_client):
+    await asyncio.gather(
+        *[client.pet.deletePet(petId=1).result() for _ in range(2)],
+        return_exceptions=True
+    )
+
+    assert len(http_client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_disabled_per_call(client, http_client):
+    await asyncio.gather(*[
+        client.pet.getPetById(petId=1, _request_options={'request_coalescer': None}).result()
+        for _ in range(2)
+    ])
+
+    assert len(http_client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_all_headers_by_default(petstore_dict):
+    client, http_client = make_client(petstore_dict, slow_handler, {'request_coalescer': RequestCoalescer()})
+
+    await asyncio.gather(
+        client.pet.getPetById(petId=1, _request_options={'headers': {'Authorization': 'a'}}).result(),
+        client.pet.getPetById(petId=1, _request_options={'headers': {'Authorization': 'b'}}).result(),
+        client.pet.getPetById(petId=1, _request_options={'headers': {'authorization': 'b'}}).result(),
+    )
+
+    assert [request['headers'] for request in http_client.requests] == [{'Authorization': 'a'}, {'Authorization': 'b'}]
+
+
+@pytest.mark.asyncio
+async def test_bounded_calls_are_not_coalesced(client, http_client, coalescer):
+    await asyncio.gather(
+        client.pet.getPetById(petId=1).result(timeout=1),
+        client.pet.getPetById(petId=1).result(timeout=5),
+        client.pet.getPetById(petId=1, _request_options={'deadline': 1}).result(),
+        client.pet.getPetById(petId=1, _request_options={'timeout': 1}).result(),
+        client.pet.getPetById(petId=1, _request_options={'timeout': 2}).result(),
+        client.pet.getPetById(petId=1, _request_options={'timeout': 2}).result(),
+    )
+
+    assert len(http_client.requests) == 5
+    assert coalescer.coalesced == 1
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from aiobravado.deadline import deadline
+from aiobravado.deadline import Deadline
+from aiobravado.deadline import get_current_deadline
+from aiobravado.exception import DeadlineExceeded
+from aiobravado.retry import RetryPolicy
+from testing.fake_http_client import FakeResponse
+from testing.fake_http_client import make_client
+from testing.fake_http_client import PET
+
+
+async def slow_handler(request_params):
+    await asyncio.sleep(1)
+    return FakeResponse(body=PET)
+
+
+def test_deadline_get_timeout():
+    assert 9 < Deadline.after(10).get_timeout() <= 10
+    assert Deadline.after(10).get_timeout(1) == 1
+    with pytest.raises(DeadlineExceeded):
+        Deadline.after(-1).get_timeout(1)
+
+
+def test_nested_deadline_blocks():
+    assert get_current_deadline() is None
+    with deadline(10) as outer:
+        with deadline(20) as inner:
+            assert inner is outer
+        with deadline(1) as inner:
+            assert get_current_deadline() is inner
+        assert get_current_deadline() is outer
+    assert get_current_deadline() is None
+
+
+@pytest.mark.asyncio
+async def test_deadline_request_option(petstore_dict):
+    client, http_client = make_client(petstore_dict, slow_handler)
+
+    with pytest.raises(DeadlineExceeded):
+        await client.pet.getPetById(petId=1, _request_options={'deadline': 0.01}).result()
+
+    # the timeouts of the http client are shortened too
+    assert 0 < http_client.requests[0]['timeout'] <= 0.01
+    assert 0 < http_client.requests[0]['connect_timeout'] <= 0.01
+
+
+@pytest.mark.asyncio
+async def test_deadline_block(petstore_dict):
+    client, http_client = make_client(petstore_dict, slow_handler)
+
+    with deadline(0.01):
+        with pytest.raises(DeadlineExceeded):
+            await client.pet.getPetById(petId=1).result()
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_sends_nothing(petstore_dict):
+    client, http_client = make_client(petstore_dict, slow_handler)
+
+    with pytest.raises(DeadlineExceeded):
+        await client.pet.getPetById(petId=1, _request_options={'deadline': Deadline.after(-1)}).result()
+    assert http_client.requests == []
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_retries(petstore_dict):
+    async def handler(request_params):
+        raise ConnectionResetError()
+
+    retry_policy = RetryPolicy(max_attempts=100, backoff_base=0.05, jitter=False)
+    client, http_client = make_client(petstore_dict, handler, config={'retry_policy': retry_policy})
+
+    # no attempt once the backoff would go past the deadline
+    with pytest.raises(ConnectionResetError):
+        await client.pet.getPetById(petId=1, _request_options={'deadline': 0.3}).result()
+    assert len(http_client.requests) == 3
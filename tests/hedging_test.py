@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from aiobravado.hedging import HedgingPolicy
+from aiobravado.latency import LatencyWindow
+from aiobravado.retry import RetryBudget
+from testing.fake_http_client import FakeResponse
+from testing.fake_http_client import make_client
+from testing.fake_http_client import PET
+from testing.fake_http_client import SlowHandler
+
+
+def test_latency_window():
+    window = LatencyWindow(size=10)
+    assert window.percentile(95) is None
+
+    for latency in range(20):
+        window.add(latency)
+    assert len(window) == 10
+    assert window.percentile(50) == 14
+    assert window.percentile(95) == 19
+    assert window.percentile(0) == 10
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins(petstore_dict):
+    hedging_policy = HedgingPolicy(delay=0.01)
+    client, http_client = make_client(petstore_dict, SlowHandler(10, 0), {'hedging_policy': hedging_policy})
+
+    assert (await client.pet.getPetById(petId=1).result(timeout=1)).id == 1
+    assert len(http_client.requests) == 2
+    assert hedging_policy.stats() == {'hedges': 1, 'hedges_won': 1, 'budget_exhausted': 0}
+
+    # the slow request was cancelled
+    await asyncio.sleep(0.01)
+    assert http_client.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_not_hedged_when_fast(petstore_dict):
+    hedging_policy = HedgingPolicy(delay=0.05)
+    client, http_client = make_client(petstore_dict, SlowHandler(0), {'hedging_policy': hedging_policy})
+
+    await client.pet.getPetById(petId=1).result()
+    assert len(http_client.requests) == 1
+    assert hedging_policy.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_first_request_fails_after_hedging(petstore_dict):
+    hedging_policy = HedgingPolicy(delay=0.01)
+
+    async def handler(request_params):
+        if len(http_client.requests) == 1:
+            await asyncio.sleep(0.02)
+            raise ConnectionResetError()
+        await asyncio.sleep(0.03)
+        return FakeResponse(body=PET)
+
+    client, http_client = make_client(petstore_dict, handler, {'hedging_policy': hedging_policy})
+
+    assert (await client.pet.getPetById(petId=1).result()).id == 1
+    assert hedging_policy.hedges_won == 1
+
+
+@pytest.mark.asyncio
+async def test_only_idempotent_reads(petstore_dict):
+    hedging_policy = HedgingPolicy(delay=0.001)
+    client, http_client = make_client(petstore_dict, SlowHandler(0.02), {'hedging_policy': hedging_policy})
+
+    await client.user.createUser(body={'id': 1, 'username': 'lassie'}).result()
+    assert len(http_client.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_hedging_budget(petstore_dict):
+    hedging_policy = HedgingPolicy(delay=0.001, budget=RetryBudget(ratio=0, min_retries=1))
+    client, http_client = make_client(petstore_dict, SlowHandler(0.02, 0.02, 0.02), {'hedging_policy': hedging_policy})
+
+    await client.pet.getPetById(petId=1).result()
+    await client.pet.getPetById(petId=1).result()
+    assert len(http_client.requests) == 3
+    assert hedging_policy.stats() == {'hedges': 1, 'hedges_won': 0, 'budget_exhausted': 1}
+
+
+@pytest.mark.asyncio
+async def test_delay_from_observed_latencies(petstore_dict):
+    hedging_policy = HedgingPolicy(min_samples=5)
+    client, http_client = make_client(petstore_dict, config={'hedging_policy': hedging_policy})
+
+    for _ in range(4):
+        await client.pet.getPetById(petId=1).result()
+    assert hedging_policy.get_delay('getPetById') is None
+
+    await client.pet.getPetById(petId=1).result()
+    assert hedging_policy.get_delay('getPetById') == hedging_policy.min_delay
+    assert hedging_policy.get_delay('findPetsByStatus') is None
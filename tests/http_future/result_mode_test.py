@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import pytest
+from bravado_core.spec import Spec
+
+from aiobravado.client import inject_headers_for_remote_refs
+from aiobravado.exception import HTTPBadRequest
+from aiobravado.response_cache import ResponseCache
+from aiobravado.unmarshal import unmarshal_formats
+from testing.fake_http_client import FakeResponse
+from testing.fake_http_client import make_client
+from testing.fake_http_client import PET
+
+ORDER = {'id': 1, 'petId': 1, 'shipDate': '2018-01-02T03:04:05+00:00', 'status': 'placed', 'extra': 'x'}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('result_mode', ['raw', 'formats'])
+async def test_result_modes(petstore_dict, result_mode):
+    client, _ = make_client(petstore_dict, FakeResponse(body=ORDER))
+
+    order = await client.store.getOrderById(orderId=1, _request_options={'result_mode': result_mode}).result()
+    assert isinstance(order, dict)
+    assert order['extra'] == 'x'
+    if result_mode == 'raw':
+        assert order == ORDER
+    else:
+        assert isinstance(order['shipDate'], datetime.datetime)
+        assert order['shipDate'].year == 2018
+
+
+@pytest.mark.asyncio
+async def test_client_result_mode(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(body=[PET]), config={'result_mode': 'raw'})
+
+    assert await client.pet.findPetsByStatus(status=['available']).result() == [PET]
+    pets = await client.pet.findPetsByStatus(status=['available'], _request_options={'result_mode': 'models'}).result()
+    assert pets[0].name == 'Lassie'
+
+
+@pytest.mark.asyncio
+async def test_result_mode_error_responses(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(status_code=400, body={}))
+
+    with pytest.raises(HTTPBadRequest):
+        await client.pet.findPetsByStatus(status=['available'], _request_options={'result_mode': 'raw'}).result()
+
+
+@pytest.mark.asyncio
+async def test_result_mode_with_request_headers_for_remote_refs(petstore_dict):
+    client, http_client = make_client(petstore_dict, FakeResponse(body=PET))
+    # like SwaggerClient.from_url with request_headers
+    http_client.request = inject_headers_for_remote_refs(http_client.request, {'X-Spec': 'yes'})
+
+    pet = await client.pet.getPetById(
+        petId=1, _request_options={'result_mode': 'raw', 'headers': {'X-Trace': '1'}},
+    ).result()
+    assert pet == PET
+    assert http_client.requests[0]['headers'] == {'X-Trace': '1'}
+
+
+def test_unknown_result_mode(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(body=PET))
+
+    with pytest.raises(ValueError):
+        client.pet.getPetById(petId=1, _request_options={'result_mode': 'nope'})
+
+
+@pytest.mark.asyncio
+async def test_cached_results_depend_on_result_mode(petstore_dict):
+    client, http_client = make_client(
+        petstore_dict,
+        FakeResponse(body=PET, headers={'Cache-Control': 'max-age=60'}),
+        config={'response_cache': ResponseCache()},
+    )
+
+    assert await client.pet.getPetById(petId=1, _request_options={'result_mode': 'raw'}).result() == PET
+    pet = await client.pet.getPetById(petId=1).result()
+    assert pet.name == 'Lassie'
+    assert len(http_client.requests) == 2
+
+
+def test_unmarshal_formats_follows_discriminator():
+    swagger_spec = Spec.from_dict({
+        'swagger': '2.0',
+        'info': {'title': 'test', 'version': '1.0'},
+        'paths': {},
+        'definitions': {
+            'Event': {
+                'type': 'object',
+                'discriminator': 'kind',
+                'required': ['kind'],
+                'properties': {'kind': {'type': 'string'}, 'at': {'type': 'string', 'format': 'date'}},
+            },
+            'Delivery': {
+                'allOf': [
+                    {'$ref': '#/definitions/Event'},
+                    {'type': 'object', 'properties': {'until': {'type': 'string', 'format': 'date'}}},
+                ],
+            },
+        },
+    })
+    schema = {'type': 'array', 'items': {'$ref': '#/definitions/Event'}}
+
+    events = unmarshal_formats(swagger_spec, schema, [
+        {'kind': 'Delivery', 'at': '2018-01-02', 'until': '2018-01-03'},
+        {'kind': 'Event', 'at': None},
+    ])
+    assert events == [
+        {'kind': 'Delivery', 'at': datetime.date(2018, 1, 2), 'until': datetime.date(2018, 1, 3)},
+        {'kind': 'Event', 'at': None},
+    ]
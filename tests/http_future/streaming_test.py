@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+import msgpack
+import pytest
+from bravado_core.content_type import APP_MSGPACK
+from jsonschema.exceptions import ValidationError
+
+from aiobravado.client import inject_headers_for_remote_refs
+from aiobravado.compat import json
+from aiobravado.exception import HTTPBadRequest
+from aiobravado.streaming import ItemStream
+from aiobravado.streaming import JsonArrayDecoder
+from aiobravado.streaming import MsgpackArrayDecoder
+from testing.fake_http_client import FakeResponse
+from testing.fake_http_client import make_client
+from testing.fake_http_client import PET
+
+PETS = [PET, {'id': 2, 'name': u'Médor', 'photoUrls': ['a', 'b'], 'tags': [{'id': 1, 'name': 'dog'}]}]
+
+
+def decode(document, chunk_size):
+    decoder = JsonArrayDecoder()
+    items = []
+    for position in range(0, len(document), chunk_size):
+        items.extend(decoder.feed(document[position:position + chunk_size]))
+    items.extend(decoder.feed(b'', final=True))
+    return items
+
+
+@pytest.mark.parametrize('value', [
+    [],
+    [1, -2.5e3, True, None, 'a'],
+    PETS,
+    [[1, [2, []]], {'a': {'b': u'é ]'}}],
+])
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_json_array_decoder(value, chunk_size):
+    assert decode(json.dumps(value).encode('utf-8'), chunk_size) == value
+    assert decode(json.dumps(value, indent=2).encode('utf-8'), chunk_size) == value
+
+
+@pytest.mark.parametrize('document', [b'{"a": 1}', b'[1, 2', b'[1 2]', b'[1] 2', b'[1,'])
+def test_json_array_decoder_invalid(document):
+    with pytest.raises(ValueError):
+        decode(document, 1)
+
+
+@pytest.mark.asyncio
+async def test_stream_items(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(body=PETS, chunk_size=10))
+
+    pets = await client.pet.findPetsByStatus(status=['available'], _request_options={'stream': True}).result()
+    assert isinstance(pets, ItemStream)
+    results = []
+    async for pet in pets:
+        results.append((pet.name, len(pet.tags or [])))
+    assert results == [('Lassie', 0), (u'Médor', 1)]
+
+
+@pytest.mark.asyncio
+async def test_stream_raw_items(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(body=PETS, chunk_size=10))
+
+    pets = await client.pet.findPetsByStatus(
+        status=['available'], _request_options={'stream': True, 'result_mode': 'raw'},
+    ).result()
+    results = []
+    async for pet in pets:
+        results.append(pet)
+    assert results == PETS
+
+
+@pytest.mark.asyncio
+async def test_stream_with_request_headers_for_remote_refs(petstore_dict):
+    client, http_client = make_client(petstore_dict, FakeResponse(body=PETS))
+    # like SwaggerClient.from_url with request_headers
+    http_client.request = inject_headers_for_remote_refs(http_client.request, {'X-Spec': 'yes'})
+
+    pets = await client.pet.findPetsByStatus(
+        status=['available'], _request_options={'stream': True, 'headers': {'X-Trace': '1'}},
+    ).result()
+    assert isinstance(pets, ItemStream)
+    assert http_client.requests[0]['headers'] == {'X-Trace': '1'}
+
+
+@pytest.mark.asyncio
+async def test_partly_consumed_stream_releases_response(petstore_dict):
+    response = FakeResponse(body=PETS, chunk_size=10)
+    client, _ = make_client(petstore_dict, response)
+
+    pets = await client.pet.findPetsByStatus(status=['available'], _request_options={'stream': True}).result()
+    async with pets:
+        async for pet in pets:
+            break
+        assert not response.released
+    assert response.released
+    with pytest.raises(StopAsyncIteration):
+        await pets.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_stream_aclose(petstore_dict):
+    response = FakeResponse(body=PETS, chunk_size=10)
+    client, _ = make_client(petstore_dict, response)
+
+    pets = await client.pet.findPetsByStatus(status=['available'], _request_options={'stream': True}).result()
+    assert (await pets.__anext__()).id == 1
+    await pets.aclose()
+    assert response.released
+
+
+@pytest.mark.asyncio
+async def test_stream_items_are_validated(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(body=[PET, {'id': 'not an id'}]))
+
+    pets = await client.pet.findPetsByStatus(status=['available'], _request_options={'stream': True}).result()
+    assert (await pets.__anext__()).id == 1
+    with pytest.raises(ValidationError):
+        await pets.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_stream_error_response(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(400, body={}))
+
+    with pytest.raises(HTTPBadRequest):
+        await client.pet.findPetsByStatus(status=['available'], _request_options={'stream': True}).result()
+
+
+@pytest.mark.asyncio
+async def test_stream_not_an_array(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(body=PET))
+
+    pet = await client.pet.getPetById(petId=1, _request_options={'stream': True}).result()
+    assert pet.name == 'Lassie'
+
+
+def decode_msgpack(document, chunk_size):
+    decoder = MsgpackArrayDecoder()
+    items = []
+    for position in range(0, len(document), chunk_size):
+        items.extend(decoder.feed(document[position:position + chunk_size]))
+    items.extend(decoder.feed(b'', final=True))
+    return items
+
+
+@pytest.mark.parametrize('value', [[], [1, -2.5, True, None, u'é'], PETS, [[1, [2, []]]], list(range(20))])
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_msgpack_array_decoder(value, chunk_size):
+    assert decode_msgpack(msgpack.packb(value, use_bin_type=True), chunk_size) == value
+
+
+def test_msgpack_array_decoder_large_array():
+    # array 32 header
+    value = list(range(70000))
+    assert decode_msgpack(msgpack.packb(value), 1024) == value
+
+
+@pytest.mark.parametrize('chunk_size', [1, 1024])
+def test_msgpack_concatenated_objects(chunk_size):
+    document = b''.join(msgpack.packb(pet, use_bin_type=True) for pet in PETS)
+    assert decode_msgpack(document, chunk_size) == PETS
+
+
+@pytest.mark.parametrize('document', [
+    msgpack.packb([1, 2])[:-1],
+    msgpack.packb([1, 2]) + msgpack.packb(3),
+    msgpack.packb(list(range(20)))[:2],
+    msgpack.packb(PET)[:-1],
+])
+def test_msgpack_array_decoder_invalid(document):
+    with pytest.raises(ValueError):
+        decode_msgpack(document, 1)
+
+
+@pytest.mark.asyncio
+async def test_stream_msgpack_items(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(
+        raw_body=msgpack.packb(PETS, use_bin_type=True),
+        headers={'Content-Type': APP_MSGPACK},
+        chunk_size=10,
+    ))
+
+    pets = await client.pet.findPetsByStatus(
+        status=['available'], _request_options={'stream': True, 'use_msgpack': True},
+    ).result()
+    results = []
+    async for pet in pets:
+        results.append(pet.name)
+    assert results == ['Lassie', u'Médor']
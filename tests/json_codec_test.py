@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from aiobravado.json_codec import get_json_codec
+from aiobravado.json_codec import JsonCodec
+from aiobravado.swagger_model import Loader
+from testing.fake_http_client import make_client
+
+
+class RecordingCodec(JsonCodec):
+
+    def __init__(self):
+        self.calls = []
+
+    def loads(self, data):
+        self.calls.append('loads')
+        return super(RecordingCodec, self).loads(data)
+
+    def dumps(self, value):
+        self.calls.append('dumps')
+        return super(RecordingCodec, self).dumps(value).encode('utf-8')
+
+
+def test_get_json_codec():
+    codec = RecordingCodec()
+    assert get_json_codec(None) is None
+    assert get_json_codec(codec) is codec
+    assert isinstance(get_json_codec('json'), JsonCodec)
+    with pytest.raises(ValueError):
+        get_json_codec('nope')
+
+
+@pytest.mark.asyncio
+async def test_codec_decodes_responses(petstore_dict):
+    codec = RecordingCodec()
+    client, _ = make_client(petstore_dict, config={'json_codec': codec})
+
+    pet = await client.pet.getPetById(petId=1).result()
+    assert pet.name == 'Lassie'
+    assert codec.calls == ['loads']
+
+
+@pytest.mark.asyncio
+async def test_codec_encodes_request_bodies(petstore_dict):
+    codec = RecordingCodec()
+    client, http_client = make_client(petstore_dict, config={'json_codec': codec})
+
+    User = client.get_model('User')
+    await client.user.createUser(body=User(id=1, username='lassie')).result()
+    request = http_client.requests[0]
+    assert codec.calls == ['dumps']
+    assert request['headers']['Content-Type'] == 'application/json'
+    assert codec.loads(request['data']) == {'id': 1, 'username': 'lassie'}
+
+
+@pytest.mark.asyncio
+async def test_orjson_codec(petstore_dict):
+    pytest.importorskip('orjson')
+    client, http_client = make_client(petstore_dict, config={'json_codec': 'orjson'})
+
+    pet = await client.pet.getPetById(petId=1).result()
+    assert pet.name == 'Lassie'
+    await client.user.createUser(body={'id': 1, 'username': 'lassie'}).result()
+    assert http_client.requests[1]['data'] == b'{"id":1,"username":"lassie"}'
+
+
+@pytest.mark.asyncio
+async def test_loader_parses_specs_with_codec(tmpdir):
+    spec_file = tmpdir.join('codec.json')
+    spec_file.write('{"swagger": "2.0", "paths": {}}')
+    codec = RecordingCodec()
+
+    spec_dict = await Loader(None, json_codec=codec).load_spec('file://' + str(spec_file))
+    assert spec_dict == {'swagger': '2.0', 'paths': {}}
+    assert codec.calls == ['loads']
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import pytest
+from mock import patch
+
+from aiobravado.lazy_model import LazyList
+from aiobravado.lazy_model import LazyModel
+from testing.fake_http_client import FakeResponse
+from testing.fake_http_client import make_client
+
+PET = {
+    'id': 1,
+    'name': 'Lassie',
+    'photoUrls': ['a', 'b'],
+    'category': {'id': 2, 'name': 'dogs'},
+    'tags': [{'id': 3, 'name': 'good'}, {'id': 4, 'name': 'loud'}],
+}
+
+ORDER = {'id': 1, 'petId': 1, 'shipDate': '2018-01-02T03:04:05+00:00'}
+
+
+async def get_pet(client):
+    return await client.pet.getPetById(petId=1, _request_options={'result_mode': 'lazy'}).result()
+
+
+@pytest.mark.asyncio
+async def test_lazy_model(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(body=PET))
+
+    pet = await get_pet(client)
+    assert isinstance(pet, LazyModel)
+    assert pet._model_name == 'Pet'
+    assert pet.name == pet['name'] == 'Lassie'
+    assert pet.category.name == 'dogs'
+    assert isinstance(pet.tags, LazyList)
+    assert [tag.name for tag in pet.tags] == ['good', 'loud']
+    assert pet.tags[-1].id == 4
+    # missing properties are None, like with models
+    assert pet.status is None
+    with pytest.raises(AttributeError):
+        pet.nope
+
+
+@pytest.mark.asyncio
+async def test_lazy_model_converts_on_access_once(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(body=PET))
+
+    with patch('aiobravado.lazy_model.LazyModel', wraps=LazyModel) as mock_lazy_model:
+        pet = await get_pet(client)
+        assert mock_lazy_model.call_count == 1
+        assert pet.tags[0] is pet.tags[0]
+        assert pet.category is pet.category
+        assert mock_lazy_model.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_lazy_model_formats(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(body=ORDER))
+
+    order = await client.store.getOrderById(orderId=1, _request_options={'result_mode': 'lazy'}).result()
+    assert isinstance(order.shipDate, datetime.datetime)
+    assert order.complete is False
+
+
+@pytest.mark.asyncio
+async def test_lazy_model_as_dict(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(body=PET))
+
+    pet = await get_pet(client)
+    model = await client.pet.getPetById(petId=1).result()
+    assert pet._as_dict() == model._as_dict()
+    assert dict(pet) == dict(pet.items())
+    assert len(pet) == 6
+
+
+@pytest.mark.asyncio
+async def test_lazy_array(petstore_dict):
+    client, _ = make_client(petstore_dict, FakeResponse(body=[PET, PET]))
+
+    pets = await client.pet.findPetsByStatus(status=['available'], _request_options={'result_mode': 'lazy'}).result()
+    assert len(pets) == 2
+    assert [pet.name for pet in pets[:1]] == ['Lassie']
+    assert pets[1].photoUrls == ['a', 'b']
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import pytest
+from mock import patch
+
+from aiobravado.client import SwaggerClient
+from aiobravado.lazy_spec import LazySpec
+
+
+@pytest.fixture
+def lazy_client(petstore_dict):
+    return SwaggerClient.from_spec(petstore_dict, config={'lazy_resources': True})
+
+
+def test_nothing_built_up_front(petstore_dict):
+    with patch('aiobravado.lazy_spec.build_spec') as mock_build_spec:
+        client = SwaggerClient.from_spec(petstore_dict, config={'lazy_resources': True})
+
+    assert isinstance(client.swagger_spec, LazySpec)
+    assert not mock_build_spec.called
+    assert client.swagger_spec.api_url == 'http://petstore.swagger.io/v2'
+    assert 'lazy_resources' not in client.swagger_spec.config
+
+
+def test_dir(lazy_client):
+    assert set(dir(lazy_client)) == {'pet', 'store', 'user'}
+
+
+def test_resource_built_on_first_access(lazy_client):
+    operation = lazy_client.pet.getPetById.operation
+
+    assert operation.operation_id == 'getPetById'
+    partial_spec = operation.swagger_spec
+    assert set(partial_spec.resources) == {'pet'}
+    assert set(partial_spec.definitions) == {'Pet', 'Category', 'Tag', 'ApiResponse'}
+    assert lazy_client.swagger_spec.resources['pet'] is lazy_client.swagger_spec.resources['pet']
+
+
+def test_resource_not_found(lazy_client):
+    with pytest.raises(AttributeError) as excinfo:
+        lazy_client.foo
+    assert 'foo not found' in str(excinfo.value)
+
+
+def test_models_are_shared(lazy_client):
+    pet_model = lazy_client.get_model('Pet')
+    pet_spec = lazy_client.pet.getPetById.operation.swagger_spec
+
+    assert pet_spec.definitions['Pet'] is pet_model
+    assert lazy_client.get_model('Pet') is pet_model
+
+
+def test_model_not_found(lazy_client):
+    with pytest.raises(KeyError):
+        lazy_client.get_model('Foo')
+
+
+def test_tag_aliases():
+    spec_dict = {
+        'swagger': '2.0',
+        'info': {'version': '', 'title': 'API'},
+        'paths': {
+            '/ping': {
+                'get': {
+                    'operationId': 'ping',
+                    'responses': {'200': {'description': 'ping'}},
+                    'tags': ['my tag'],
+                },
+            },
+        },
+    }
+    client = SwaggerClient.from_spec(spec_dict, config={'lazy_resources': True})
+
+    assert client._get_resource('my tag').resource is client.my_tag.resource
+    assert client.my_tag.ping.operation.operation_id == 'ping'
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from aiobravado.exception import ConcurrencyLimitExceeded
+from aiobravado.http_future import DeferredHttpFuture
+from aiobravado.http_future import HttpFuture
+from aiobravado.limiter import ConcurrencyLimiter
+from aiobravado.limiter import Limit
+from testing.fake_http_client import FakeResponse
+from testing.fake_http_client import make_client
+from testing.fake_http_client import PET
+
+
+async def slow_handler(request_params):
+    await asyncio.sleep(0.01)
+    if request_params['url'].endswith('/store/inventory'):
+        return FakeResponse(body={'available': 1})
+    return FakeResponse(body=PET)
+
+
+@pytest.mark.asyncio
+async def test_limit_queues_in_order():
+    limit = Limit(1)
+    await limit.acquire()
+    order = []
+
+    async def waiter(name):
+        await limit.acquire()
+        order.append(name)
+        limit.release()
+
+    tasks = [asyncio.ensure_future(waiter(name)) for name in 'abc']
+    await asyncio.sleep(0)
+    assert (limit.in_flight, limit.queued) == (1, 3)
+
+    limit.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ['a', 'b', 'c']
+    assert (limit.in_flight, limit.queued) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_limit_max_queue_size_and_timeout():
+    limit = Limit(1)
+    await limit.acquire()
+    queued = asyncio.ensure_future(limit.acquire(max_queue_size=1))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ConcurrencyLimitExceeded):
+        await limit.acquire(max_queue_size=1)
+    queued.cancel()
+    await asyncio.sleep(0)
+    with pytest.raises(ConcurrencyLimitExceeded):
+        await limit.acquire(queue_timeout=0.01)
+
+    assert (limit.in_flight, limit.queued) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_limit_per_operation(petstore_dict):
+    limiter = ConcurrencyLimiter(operation_limits={'getPetById': 2}, max_per_operation=100)
+    client, http_client = make_client(petstore_dict, slow_handler, {'concurrency_limiter': limiter})
+
+    futures = [client.pet.getPetById(petId=1) for _ in range(10)]
+    assert isinstance(futures[0], DeferredHttpFuture)
+    results = asyncio.gather(*[future.result() for future in futures])
+    await asyncio.sleep(0.001)
+
+    assert limiter.gauges() == {
+        'hosts': {},
+        'operations': {'getPetById': {'in_flight': 2, 'queued': 8}},
+    }
+    assert [result.id for result in await results] == [1] * 10
+    assert http_client.max_in_flight == 2
+    assert limiter.gauges()['operations']['getPetById'] == {'in_flight': 0, 'queued': 0}
+
+
+@pytest.mark.asyncio
+async def test_limit_per_host(petstore_dict):
+    limiter = ConcurrencyLimiter(max_per_host=3)
+    client, http_client = make_client(petstore_dict, slow_handler, {'concurrency_limiter': limiter})
+
+    await asyncio.gather(*[
+        client.pet.getPetById(petId=1).result()
+        for _ in range(5)
+    ] + [
+        client.store.getInventory().result()
+        for _ in range(5)
+    ])
+
+    assert http_client.max_in_flight == 3
+    assert list(limiter.gauges()['hosts']) == ['petstore.swagger.io']
+
+
+@pytest.mark.asyncio
+async def test_queue_full(petstore_dict):
+    limiter = ConcurrencyLimiter(max_per_operation=1, max_queue_size=1)
+    client, http_client = make_client(petstore_dict, slow_handler, {'concurrency_limiter': limiter})
+
+    results = await asyncio.gather(
+        *[client.pet.getPetById(petId=1).result() for _ in range(3)],
+        return_exceptions=True
+    )
+
+    assert isinstance(results[2], ConcurrencyLimitExceeded)
+    assert len(http_client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_request_option_overrides_client_limiter(petstore_dict):
+    limiter = ConcurrencyLimiter(max_per_host=1)
+    client, http_client = make_client(petstore_dict, slow_handler, {'concurrency_limiter': limiter})
+
+    future = client.pet.getPetById(petId=1, _request_options={'concurrency_limiter': None})
+
+    assert isinstance(future, HttpFuture)
+    assert (await future.result()).id == 1
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from aiobravado.client import inject_headers_for_remote_refs
+from aiobravado.exception import HTTPNotFound
+from aiobravado.response_cache import parse_cache_control
+from aiobravado.response_cache import ResponseCache
+from testing.fake_http_client import FakeResponse
+from testing.fake_http_client import make_client
+from testing.fake_http_client import PET
+
+
+def make_handler(headers=None):
+    if headers is None:
+        headers = {'Cache-Control': 'max-age=60'}
+
+    async def handler(request_params):
+        pet_id = int(request_params['url'].rsplit('/', 1)[-1])
+        if pet_id == 404:
+            return FakeResponse(404, body={}, headers=headers)
+        return FakeResponse(body=dict(PET, id=pet_id), headers=headers)
+    return handler
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('public, Max-Age=60, no-transform, foo="bar"') == {
+        'public': None,
+        'max-age': '60',
+        'no-transform': None,
+        'foo': 'bar',
+    }
+    assert parse_cache_control(None) == {}
+
+
+@pytest.mark.asyncio
+async def test_hit_and_miss(petstore_dict):
+    response_cache = ResponseCache()
+    client, http_client = make_client(petstore_dict, make_handler(), {'response_cache': response_cache})
+
+    first = await client.pet.getPetById(petId=1).result()
+    second = await client.pet.getPetById(petId=1).result()
+    other = await client.pet.getPetById(petId=2).result()
+
+    assert second is first
+    assert other.id == 2
+    assert len(http_client.requests) == 2
+    assert response_cache.stats() == {
+        'hits': 1,
+        'stale_hits': 0,
+        'misses': 2,
+        'revalidations': 0,
+        'evictions': 0,
+        'size': 2,
+    }
+
+
+@pytest.mark.parametrize(
+    'headers',
+    (
+        {},
+        {'cache-control': 'no-store'},
+        {'cache-control': 'max-age=60, no-cache'},
+        {'cache-control': 'max-age=60', 'age': '60'},
+    ),
+)
+@pytest.mark.asyncio
+async def test_not_cacheable(petstore_dict, headers):
+    response_cache = ResponseCache()
+    client, http_client = make_client(petstore_dict, make_handler(headers), {'response_cache': response_cache})
+
+    await client.pet.getPetById(petId=1).result()
+    await client.pet.getPetById(petId=1).result()
+
+    assert len(http_client.requests) == 2
+    assert len(response_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_ttl(petstore_dict):
+    response_cache = ResponseCache(default_ttl=0.05, operation_ttls={'getInventory': 0})
+    client, http_client = make_client(petstore_dict, make_handler({}), {'response_cache': response_cache})
+
+    await client.pet.getPetById(petId=1).result()
+    await client.pet.getPetById(petId=1).result()
+    assert len(http_client.requests) == 1
+
+    await asyncio.sleep(0.06)
+    response_cache.remove_expired()
+    assert len(response_cache) == 0
+    await client.pet.getPetById(petId=1).result()
+    assert len(http_client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction(petstore_dict):
+    response_cache = ResponseCache(max_size=2)
+    client, http_client = make_client(petstore_dict, make_handler(), {'response_cache': response_cache})
+
+    for pet_id in (1, 2, 1, 3):
+        await client.pet.getPetById(petId=pet_id).result()
+    # 2 was the least recently used entry
+    await client.pet.getPetById(petId=1).result()
+    await client.pet.getPetById(petId=2).result()
+
+    assert [int(request['url'].rsplit('/', 1)[-1]) for request in http_client.requests] == [1, 2, 3, 2]
+    assert response_cache.evictions == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(petstore_dict):
+    response_cache = ResponseCache()
+    client, http_client = make_client(petstore_dict, make_handler(), {'response_cache': response_cache})
+
+    for _ in range(2):
+        with pytest.raises(HTTPNotFound):
+            await client.pet.getPetById(petId=404).result()
+
+    assert len(http_client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_entries_are_not_shared_across_credentials(petstore_dict):
+    response_cache = ResponseCache()
+    client, http_client = make_client(petstore_dict, make_handler(), {'response_cache': response_cache})
+
+    for authorization in ('alice', 'bob', 'alice'):
+        await client.pet.getPetById(petId=1, _request_options={'headers': {'Authorization': authorization}}).result()
+
+    assert [request['headers'] for request in http_client.requests] == [
+        {'Authorization': 'alice'},
+        {'Authorization': 'bob'},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_narrowed_headers(petstore_dict):
+    response_cache = ResponseCache(headers=('Authorization',))
+    client, http_client = make_client(petstore_dict, make_handler(), {'response_cache': response_cache})
+
+    for headers in ({'X-Request-Id': '1'}, {'X-Request-Id': '2'}, {'Authorization': 'bob'}):
+        await client.pet.getPetById(petId=1, _request_options={'headers': headers}).result()
+
+    assert len(http_client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_also_return_response(petstore_dict):
+    response_cache = ResponseCache()
+    client, http_client = make_client(petstore_dict, make_handler(), {'response_cache': response_cache})
+    options = {'also_return_response': True}
+
+    await client.pet.getPetById(petId=1, _request_options=options).result()
+    await client.pet.getPetById(petId=1, _request_options=options).result()
+    assert len(http_client.requests) == 2
+
+    response_cache.store_responses = True
+    await client.pet.getPetById(petId=1, _request_options=options).result()
+    result, response = await client.pet.getPetById(petId=1, _request_options=options).result()
+    assert len(http_client.requests) == 3
+    assert result.id == 1
+    assert response.status_code == 200
+
+
+class RevalidatingHandler(object):
+
+    def __init__(self, cache_control='max-age=0', delay=0):
+        self.cache_control = cache_control
+        self.delay = delay
+        self.version = 1
+        self.fail = False
+        self.conditional_requests = 0
+
+    async def __call__(self, request_params):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise IOError('connection reset')
+        etag = '"v{0}"'.format(self.version)
+        headers = {'ETag': etag, 'Cache-Control': self.cache_control}
+        if 'If-None-Match' in request_params['headers']:
+            self.conditional_requests += 1
+            if request_params['headers']['If-None-Match'] == etag:
+                return FakeResponse(304, body=None, headers=headers)
+        return FakeResponse(body=dict(PET, name='v{0}'.format(self.version)), headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_revalidation_not_modified(petstore_dict):
+    handler = RevalidatingHandler()
+    response_cache = ResponseCache()
+    client, http_client = make_client(petstore_dict, handler, {'response_cache': response_cache})
+
+    first = await client.pet.getPetById(petId=1).result()
+    second = await client.pet.getPetById(petId=1).result()
+
+    assert handler.conditional_requests == 1
+    assert http_client.requests[1]['headers'] == {'If-None-Match': '"v1"'}
+    # the request headers of the call are left untouched
+    assert http_client.requests[0]['headers'] == {}
+    assert second is first
+    assert response_cache.revalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_revalidation_with_request_headers_for_remote_refs(petstore_dict):
+    handler = RevalidatingHandler()
+    response_cache = ResponseCache()
+    client, http_client = make_client(petstore_dict, handler, {'response_cache': response_cache})
+    # like SwaggerClient.from_url with request_headers
+    http_client.request = inject_headers_for_remote_refs(http_client.request, {'X-Spec': 'yes'})
+
+    await client.pet.getPetById(petId=1).result()
+    await client.pet.getPetById(petId=1).result()
+
+    assert http_client.requests[1]['headers'] == {'If-None-Match': '"v1"'}
+    assert response_cache.revalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_revalidation_modified(petstore_dict):
+    handler = RevalidatingHandler(cache_control='no-cache')
+    response_cache = ResponseCache()
+    client, http_client = make_client(petstore_dict, handler, {'response_cache': response_cache})
+
+    assert (await client.pet.getPetById(petId=1).result()).name == 'v1'
+    handler.version = 2
+    assert (await client.pet.getPetById(petId=1).result()).name == 'v2'
+    assert (await client.pet.getPetById(petId=1).result()).name == 'v2'
+
+    assert handler.conditional_requests == 2
+    assert response_cache.revalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate(petstore_dict):
+    handler = RevalidatingHandler(delay=0.05)
+    response_cache = ResponseCache(operation_ttls={'getPetById': 0.01}, stale_while_revalidate=10)
+    client, http_client = make_client(petstore_dict, handler, {'response_cache': response_cache})
+    first = await client.pet.getPetById(petId=1).result()
+    await asyncio.sleep(0.02)
+    handler.version = 2
+
+    # served right away, while a single revalidation runs in the background
+    stale_results = await asyncio.wait_for(
+        asyncio.gather(*[client.pet.getPetById(petId=1).result() for _ in range(5)]),
+        timeout=0.04,
+    )
+    assert all(result is first for result in stale_results)
+    assert response_cache.stale_hits == 5
+
+    await asyncio.sleep(0.08)
+    assert len(http_client.requests) == 2
+    assert (await client.pet.getPetById(petId=1).result()).name == 'v2'
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_from_cache_control(petstore_dict):
+    handler = RevalidatingHandler(cache_control='max-age=0, stale-while-revalidate=10')
+    response_cache = ResponseCache()
+    client, http_client = make_client(petstore_dict, handler, {'response_cache': response_cache})
+    first = await client.pet.getPetById(petId=1).result()
+    handler.fail = True
+
+    # failed revalidations keep the stale result around
+    for _ in range(3):
+        assert await client.pet.getPetById(petId=1).result() is first
+        await asyncio.sleep(0.01)
+
+    assert len(http_client.requests) == 4
+    assert response_cache.stale_hits == 3
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+from mock import patch
+
+from aiobravado.exception import BravadoTimeoutError
+from aiobravado.exception import HTTPNotFound
+from aiobravado.exception import HTTPServiceUnavailable
+from aiobravado.retry import parse_retry_after
+from aiobravado.retry import RetryBudget
+from aiobravado.retry import RetryPolicy
+from testing.fake_http_client import FakeResponse
+from testing.fake_http_client import make_client
+from testing.fake_http_client import PET
+from testing.fake_http_client import ResponseSequence
+
+
+@pytest.fixture
+def retry_policy():
+    return RetryPolicy(backoff_base=0.001)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('2') == 2
+    assert parse_retry_after('garbage') is None
+    assert 9 < parse_retry_after(formatdate(usegmt=True, timeval=time.time() + 10)) <= 10
+
+
+def test_backoff():
+    retry_policy = RetryPolicy(backoff_base=0.5, backoff_max=3, jitter=False)
+    assert [retry_policy.get_backoff(attempt) for attempt in range(1, 5)] == [0.5, 1, 2, 3]
+
+    retry_policy.jitter = True
+    assert all(0 <= retry_policy.get_backoff(3) <= 2 for _ in range(100))
+
+
+@pytest.mark.asyncio
+async def test_retries_until_success(petstore_dict, retry_policy):
+    handler = ResponseSequence(ConnectionResetError(), BravadoTimeoutError())
+    client, http_client = make_client(petstore_dict, handler, {'retry_policy': retry_policy})
+
+    assert (await client.pet.getPetById(petId=1).result()).id == 1
+    assert len(http_client.requests) == 3
+    assert retry_policy.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_max_attempts(petstore_dict, retry_policy):
+    handler = ResponseSequence(*[FakeResponse(503, body={})] * 3)
+    client, http_client = make_client(petstore_dict, handler, {'retry_policy': retry_policy})
+
+    with pytest.raises(HTTPServiceUnavailable):
+        await client.pet.getPetById(petId=1).result()
+    assert len(http_client.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_not_retried(petstore_dict, retry_policy):
+    handler = ResponseSequence(FakeResponse(404, body={}), ValueError())
+    client, http_client = make_client(petstore_dict, handler, {'retry_policy': retry_policy})
+
+    with pytest.raises(HTTPNotFound):
+        await client.pet.getPetById(petId=1).result()
+    with pytest.raises(ValueError):
+        await client.pet.getPetById(petId=1).result()
+    assert len(http_client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_only_idempotent_methods(petstore_dict, retry_policy):
+    handler = ResponseSequence(ConnectionResetError())
+    client, http_client = make_client(petstore_dict, handler, {'retry_policy': retry_policy})
+
+    with pytest.raises(ConnectionResetError):
+        await client.pet.addPet(body=PET).result()
+    assert len(http_client.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after(petstore_dict, retry_policy):
+    handler = ResponseSequence(
+        FakeResponse(503, body={}, headers={'Retry-After': '0.02'}),
+        FakeResponse(503, body={}, headers={'Retry-After': '3600'}),
+    )
+    client, http_client = make_client(petstore_dict, handler, {'retry_policy': retry_policy})
+
+    with patch('aiobravado.retry.asyncio.sleep', side_effect=asyncio.sleep) as mock_sleep:
+        with pytest.raises(HTTPServiceUnavailable):
+            await client.pet.getPetById(petId=1).result()
+
+    # waiting for an hour is not an option
+    mock_sleep.assert_called_once_with(0.02)
+    assert len(http_client.requests) == 2
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, min_retries=2)
+    assert budget.try_retry()
+    assert budget.try_retry()
+    assert not budget.try_retry()
+
+    for _ in range(10):
+        budget.record_request()
+    assert [budget.try_retry() for _ in range(4)] == [True, True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_exhausted(petstore_dict):
+    retry_policy = RetryPolicy(backoff_base=0.001, budget=RetryBudget(ratio=0, min_retries=1))
+    handler = ResponseSequence(*[ConnectionResetError()] * 3)
+    client, http_client = make_client(petstore_dict, handler, {'retry_policy': retry_policy})
+
+    with pytest.raises(ConnectionResetError):
+        await client.pet.getPetById(petId=1).result()
+    assert len(http_client.requests) == 2
+    assert retry_policy.budget_exhausted == 1
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import copy
+import os
+
+import pytest
+from bravado_core.formatter import SwaggerFormat
+from bravado_core.spec import Spec
+from mock import Mock
+from mock import patch
+
+from aiobravado.client import serve_prefetched_remote_refs
+from aiobravado.client import SwaggerClient
+from aiobravado.spec_cache import build_spec
+from aiobravado.spec_cache import spec_cache_key
+
+
+@pytest.fixture
+def cache_dir(tmpdir):
+    return str(tmpdir.join('spec_cache'))
+
+
+def test_no_cache_dir(petstore_dict):
+    swagger_spec = build_spec(petstore_dict)
+    assert 'pet' in swagger_spec.resources
+
+
+def test_cold_and_warm(petstore_dict, cache_dir):
+    http_client = Mock()
+    cold_spec = build_spec(copy.deepcopy(petstore_dict), http_client=http_client, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+
+    with patch.object(Spec, 'from_dict') as mock_from_dict:
+        warm_spec = build_spec(copy.deepcopy(petstore_dict), http_client=http_client, cache_dir=cache_dir)
+
+    assert not mock_from_dict.called
+    assert warm_spec is not cold_spec
+    assert warm_spec.http_client is http_client
+    assert set(warm_spec.resources) == set(cold_spec.resources)
+    assert set(warm_spec.definitions) == set(cold_spec.definitions)
+    assert warm_spec.api_url == cold_spec.api_url
+
+
+def test_key_depends_on_spec_and_config(petstore_dict):
+    key = spec_cache_key(petstore_dict, None, {})
+    assert key == spec_cache_key(copy.deepcopy(petstore_dict), None, {})
+    assert key != spec_cache_key(petstore_dict, None, {'use_models': False})
+    assert key != spec_cache_key(petstore_dict, 'http://localhost/swagger.json', {})
+
+    petstore_dict['info']['version'] = '2.0.0'
+    assert key != spec_cache_key(petstore_dict, None, {})
+
+
+def make_remote_ref_spec(petstore_dict):
+    petstore_dict['definitions']['Pet'] = {'$ref': 'models.json#/Pet'}
+    return petstore_dict
+
+
+def test_key_depends_on_remote_ref_documents(petstore_dict, cache_dir):
+    documents = {'http://localhost/models.json': {'Pet': {'type': 'object'}}}
+    http_client = Mock()
+    http_client.request = serve_prefetched_remote_refs(http_client.request, documents)
+    build_spec(
+        make_remote_ref_spec(copy.deepcopy(petstore_dict)), 'http://localhost/swagger.json', http_client,
+        cache_dir=cache_dir, remote_ref_documents=documents,
+    )
+    assert len(os.listdir(cache_dir)) == 1
+
+    documents['http://localhost/models.json']['Pet']['required'] = ['name']
+    with patch.object(Spec, 'from_dict') as mock_from_dict:
+        build_spec(
+            make_remote_ref_spec(copy.deepcopy(petstore_dict)), 'http://localhost/swagger.json', http_client,
+            cache_dir=cache_dir, remote_ref_documents=documents,
+        )
+    assert mock_from_dict.called
+
+
+def test_not_cached_with_unknown_remote_refs(petstore_dict, cache_dir):
+    with patch.object(Spec, 'from_dict') as mock_from_dict:
+        build_spec(make_remote_ref_spec(petstore_dict), 'http://localhost/swagger.json', cache_dir=cache_dir)
+    assert mock_from_dict.called
+    assert not os.path.exists(cache_dir)
+
+
+def test_key_uses_format_names(petstore_dict):
+    def make_format():
+        return SwaggerFormat(
+            format='base64',
+            to_wire=lambda value: value,
+            to_python=lambda value: value,
+            validate=lambda value: None,
+            description='base64',
+        )
+
+    assert (
+        spec_cache_key(petstore_dict, None, {'formats': [make_format()]}) ==
+        spec_cache_key(petstore_dict, None, {'formats': [make_format()]})
+    )
+
+
+def test_unreadable_cache_file_is_ignored(petstore_dict, cache_dir):
+    build_spec(copy.deepcopy(petstore_dict), cache_dir=cache_dir)
+    cache_file, = os.listdir(cache_dir)
+    with open(os.path.join(cache_dir, cache_file), 'wb') as fp:
+        fp.write(b'garbage')
+
+    swagger_spec = build_spec(copy.deepcopy(petstore_dict), cache_dir=cache_dir)
+
+    assert 'pet' in swagger_spec.resources
+
+
+def test_unpickleable_spec_is_not_cached(petstore_dict, cache_dir):
+    lambda_format = SwaggerFormat(
+        format='base64',
+        to_wire=lambda value: value,
+        to_python=lambda value: value,
+        validate=lambda value: None,
+        description='base64',
+    )
+
+    swagger_spec = build_spec(petstore_dict, config={'formats': [lambda_format]}, cache_dir=cache_dir)
+
+    assert 'pet' in swagger_spec.resources
+    assert not os.path.exists(cache_dir)
+
+
+def test_swagger_client_from_spec(petstore_dict, cache_dir):
+    SwaggerClient.from_spec(copy.deepcopy(petstore_dict), config={'spec_cache_dir': cache_dir})
+    client = SwaggerClient.from_spec(copy.deepcopy(petstore_dict), config={'spec_cache_dir': cache_dir})
+
+    assert len(os.listdir(cache_dir)) == 1
+    assert 'spec_cache_dir' not in client.swagger_spec.config
+    assert client.pet.getPetById.operation.operation_id == 'getPetById'
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import pytest
+from mock import patch
+
+from aiobravado.client import SwaggerClient
+from aiobravado.spec_pruning import iter_operations
+from aiobravado.spec_pruning import prune_spec_dict
+from aiobravado.spec_pruning import select_operations
+
+
+@pytest.fixture
+def polymorphic_spec_dict():
+    return {
+        'swagger': '2.0',
+        'info': {'title': 'Polymorphic', 'version': '1.0'},
+        'paths': {
+            '/animals': {
+                'parameters': [{'$ref': '#/parameters/Limit'}],
+                'get': {
+                    'operationId': 'listAnimals',
+                    'responses': {'200': {'$ref': '#/responses/Animals'}},
+                },
+                'post': {
+                    'operationId': 'addAnimal',
+                    'parameters': [{'in': 'body', 'name': 'body', 'schema': {'$ref': '#/definitions/Animal'}}],
+                    'responses': {'200': {'description': 'added'}},
+                },
+            },
+            '/owners': {
+                'get': {
+                    'operationId': 'listOwners',
+                    'responses': {'200': {'description': 'owners', 'schema': {'$ref': '#/definitions/Owner'}}},
+                },
+            },
+        },
+        'parameters': {
+            'Limit': {'in': 'query', 'name': 'limit', 'type': 'integer'},
+            'Unused': {'in': 'query', 'name': 'unused', 'type': 'integer'},
+        },
+        'responses': {
+            'Animals': {
+                'description': 'animals',
+                'schema': {'type': 'array', 'items': {'$ref': '#/definitions/Animal'}},
+            },
+        },
+        'definitions': {
+            'Animal': {
+                'type': 'object',
+                'discriminator': 'type',
+                'required': ['type'],
+                'properties': {'type': {'type': 'string'}},
+            },
+            'Dog': {
+                'allOf': [
+                    {'$ref': '#/definitions/Animal'},
+                    {'type': 'object', 'properties': {'owner': {'$ref': '#/definitions/Owner'}}},
+                ],
+            },
+            'Owner': {'type': 'object', 'properties': {'name': {'type': 'string'}}},
+            'Unrelated': {'type': 'object'},
+        },
+    }
+
+
+def test_iter_operations(petstore_dict):
+    operations = list(iter_operations(petstore_dict))
+    assert len(operations) == 20
+    assert ('/pet/{petId}', 'get', petstore_dict['paths']['/pet/{petId}']['get']) in operations
+
+
+def test_prune_operations(petstore_dict):
+    pruned = prune_spec_dict(petstore_dict, operations=[('/pet/{petId}', 'get')])
+
+    assert pruned['paths'] == {'/pet/{petId}': {'get': petstore_dict['paths']['/pet/{petId}']['get']}}
+    assert set(pruned['definitions']) == {'Pet', 'Category', 'Tag'}
+    assert pruned['securityDefinitions'] == petstore_dict['securityDefinitions']
+    assert pruned['info'] == petstore_dict['info']
+
+
+def test_prune_does_not_share_with_original(petstore_dict):
+    pruned = prune_spec_dict(petstore_dict, operations=[('/pet/{petId}', 'get')])
+    pruned['definitions']['Pet']['x-model'] = 'Pet'
+    assert 'x-model' not in petstore_dict['definitions']['Pet']
+
+
+def test_prune_definitions(petstore_dict):
+    pruned = prune_spec_dict(petstore_dict, definitions=['Order'])
+    assert pruned['paths'] == {}
+    assert set(pruned['definitions']) == {'Order'}
+
+
+def test_prune_follows_parameters_responses_and_subtypes(polymorphic_spec_dict):
+    pruned = prune_spec_dict(polymorphic_spec_dict, operations=[('/animals', 'get')])
+
+    assert set(pruned['paths']['/animals']) == {'parameters', 'get'}
+    assert set(pruned['parameters']) == {'Limit'}
+    assert set(pruned['responses']) == {'Animals'}
+    # Dog is a subtype of the polymorphic Animal model and references Owner
+    assert set(pruned['definitions']) == {'Animal', 'Dog', 'Owner'}
+
+
+def test_prune_escaped_ref():
+    spec_dict = {
+        'paths': {
+            '/foo': {
+                'get': {
+                    'responses': {'200': {'description': 'foo', 'schema': {'$ref': '#/definitions/a~1b'}}},
+                },
+            },
+        },
+        'definitions': {
+            'a/b': {'type': 'object'},
+            'c': {'type': 'object'},
+        },
+    }
+    pruned = prune_spec_dict(spec_dict, operations=[('/foo', 'get')])
+    assert set(pruned['definitions']) == {'a/b'}
+
+
+def test_select_operations_by_id(petstore_dict):
+    assert select_operations(petstore_dict, operation_ids={'getPetById', 'placeOrder'}) == [
+        ('/pet/{petId}', 'get'),
+        ('/store/order', 'post'),
+    ]
+
+
+def test_select_operations_by_tag(petstore_dict):
+    selected = select_operations(petstore_dict, tags={'store'})
+    assert sorted(selected) == [
+        ('/store/inventory', 'get'),
+        ('/store/order', 'post'),
+        ('/store/order/{orderId}', 'delete'),
+        ('/store/order/{orderId}', 'get'),
+    ]
+
+
+def test_select_operations_by_sanitized_names(polymorphic_spec_dict):
+    polymorphic_spec_dict['paths']['/owners']['get']['operationId'] = 'list-owners'
+    polymorphic_spec_dict['paths']['/owners']['get']['tags'] = ['pet owners']
+
+    assert select_operations(polymorphic_spec_dict, operation_ids={'list_owners'}) == [('/owners', 'get')]
+    assert select_operations(polymorphic_spec_dict, tags={'pet_owners'}) == [('/owners', 'get')]
+    # operations without tags belong to the resource derived from the path
+    assert sorted(select_operations(polymorphic_spec_dict, tags={'animals'})) == [
+        ('/animals', 'get'),
+        ('/animals', 'post'),
+    ]
+
+
+@patch('aiobravado.spec_pruning.log')
+def test_select_operations_warns_about_missing_operations(mock_log, petstore_dict):
+    assert select_operations(petstore_dict, operation_ids={'getPetById', 'foo'}) == [('/pet/{petId}', 'get')]
+    mock_log.warning.assert_called_once_with(u'Operations not found in spec: %s', 'foo')
+
+
+def test_client_include_operations(petstore_dict):
+    client = SwaggerClient.from_spec(
+        petstore_dict,
+        config={'include_operations': {'getPetById'}, 'include_tags': {'user'}},
+    )
+
+    assert set(dir(client)) == {'pet', 'user'}
+    assert dir(client.pet) == ['getPetById']
+    assert 'Order' not in client.swagger_spec.definitions
+    assert 'include_operations' not in client.swagger_spec.config
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import copy
+import json
+import os
+
+import pytest
+from mock import Mock
+from mock import patch
+
+from aiobravado.client import build_swagger_spec
+from aiobravado.client import SwaggerClient
+from aiobravado.spec_reload import hash_spec_dict
+from aiobravado.spec_reload import SpecReloader
+from aiobravado.swagger_model import Loader
+from testing.fake_http_client import FakeHttpClient
+from testing.fake_http_client import FakeResponse
+
+SPEC_URL = 'http://localhost/swagger.json'
+
+
+class FakeLoader(Loader):
+
+    def __init__(self, spec_dict):
+        super(FakeLoader, self).__init__(None)
+        self.spec_dict = spec_dict
+        self.error = None
+
+    async def load_spec(self, spec_url, base_url=None, only_if_modified=False):
+        if self.error is not None:
+            raise self.error
+        return copy.deepcopy(self.spec_dict)
+
+
+@pytest.fixture
+def new_petstore_dict(petstore_dict):
+    new_petstore_dict = copy.deepcopy(petstore_dict)
+    new_petstore_dict['paths']['/pet/{petId}']['get']['operationId'] = 'getPetByIdV2'
+    return new_petstore_dict
+
+
+@pytest.fixture
+def client_and_reloader(petstore_dict):
+    loader = FakeLoader(petstore_dict)
+    client = SwaggerClient.from_spec(copy.deepcopy(petstore_dict), SPEC_URL)
+    reloader = SpecReloader(
+        client, SPEC_URL, loader,
+        lambda spec_dict: build_swagger_spec(spec_dict, SPEC_URL, Mock()),
+        {}, 0.01, spec_hash=hash_spec_dict(petstore_dict),
+    )
+    return client, reloader
+
+
+@pytest.mark.asyncio
+async def test_unchanged_spec_is_kept(client_and_reloader):
+    client, reloader = client_and_reloader
+    swagger_spec = client.swagger_spec
+
+    assert not await reloader.reload()
+    assert client.swagger_spec is swagger_spec
+
+
+@pytest.mark.asyncio
+async def test_changed_spec_is_swapped_in(client_and_reloader, new_petstore_dict):
+    client, reloader = client_and_reloader
+    get_pet_by_id = client.pet.getPetById
+    reloader.loader.spec_dict = new_petstore_dict
+
+    assert await reloader.reload()
+
+    assert client.pet.getPetByIdV2.operation.swagger_spec is client.swagger_spec
+    assert not hasattr(client.pet, 'getPetById')
+    # operations looked up before the reload keep using the old spec
+    assert get_pet_by_id.operation.swagger_spec is not client.swagger_spec
+
+
+@pytest.mark.asyncio
+async def test_background_reload(client_and_reloader, new_petstore_dict):
+    client, reloader = client_and_reloader
+    reloader.loader.error = IOError('connection refused')
+    reloader.start()
+    try:
+        await asyncio.sleep(0.05)
+        # errors are logged and reloading goes on
+        assert reloader.running
+        reloader.loader.error = None
+        reloader.loader.spec_dict = new_petstore_dict
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if 'getPetByIdV2' in dir(client.pet):
+                break
+        assert client.pet.getPetByIdV2
+    finally:
+        await reloader.stop()
+    assert not reloader.running
+
+
+@pytest.mark.asyncio
+async def test_from_url(petstore_dict, new_petstore_dict, tmpdir):
+    spec_file = tmpdir.join('swagger.json')
+    spec_file.write(json.dumps(petstore_dict))
+    spec_url = 'file://' + str(spec_file)
+
+    client = await SwaggerClient.from_url(spec_url, http_client=Mock(), config={'spec_reload_interval': 0.01})
+    try:
+        assert client.spec_reloader.running
+        assert client.pet.getPetById
+
+        spec_file.write(json.dumps(new_petstore_dict))
+        stat = os.stat(str(spec_file))
+        os.utime(str(spec_file), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if 'getPetByIdV2' in dir(client.pet):
+                break
+        assert client.pet.getPetByIdV2
+        assert 'spec_reload_interval' not in client.swagger_spec.config
+    finally:
+        await client.spec_reloader.stop()
+
+
+@pytest.mark.asyncio
+async def test_from_url_without_reloading(petstore_dict, tmpdir):
+    spec_file = tmpdir.join('swagger.json')
+    spec_file.write(json.dumps(petstore_dict))
+
+    client = await SwaggerClient.from_url('file://' + str(spec_file), http_client=Mock())
+
+    assert client.spec_reloader is None
+
+
+class SpecServer(object):
+    """Serves documents by url, answering conditional requests with 304."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.http_client = FakeHttpClient(self.handle)
+
+    async def handle(self, request_params):
+        etag = hash_spec_dict(self.documents[request_params['url']])
+        if request_params['headers'].get('If-None-Match') == etag:
+            return FakeResponse(304, raw_body=b'')
+        return FakeResponse(body=self.documents[request_params['url']], headers={'ETag': etag})
+
+
+@pytest.fixture
+def remote_ref_server(petstore_dict):
+    models = {'Pet': {'type': 'object', 'properties': {'id': {'type': 'integer'}, 'name': {'type': 'string'}}}}
+    petstore_dict['definitions']['Pet'] = {'$ref': 'models.json#/Pet'}
+    return SpecServer({SPEC_URL: petstore_dict, 'http://localhost/models.json': models})
+
+
+@pytest.mark.asyncio
+async def test_reload_with_remote_refs(remote_ref_server, new_petstore_dict):
+    server = remote_ref_server
+    client = await SwaggerClient.from_url(
+        SPEC_URL, http_client=server.http_client, request_headers={'X-Token': 't'},
+        config={'spec_reload_interval': 3600},
+    )
+    try:
+        with patch('aiobravado.spec_reload.hash_spec_dict') as mock_hash_spec_dict:
+            assert not await client.spec_reloader.reload()
+        # nothing is hashed when the spec and its remote refs are not modified
+        assert not mock_hash_spec_dict.called
+        # spec requests are conditional and keep their headers
+        request_headers = server.http_client.requests[-1]['headers']
+        assert request_headers['X-Token'] == 't'
+        assert 'If-None-Match' in request_headers
+
+        new_petstore_dict['definitions']['Pet'] = {'$ref': 'models.json#/Pet'}
+        server.documents[SPEC_URL] = new_petstore_dict
+        assert await client.spec_reloader.reload()
+        assert client.pet.getPetByIdV2
+
+        # remote documents are downloaded again too
+        server.documents['http://localhost/models.json']['Pet']['properties']['nickname'] = {'type': 'string'}
+        assert await client.spec_reloader.reload()
+        assert 'nickname' in client.get_model('Pet')._properties
+    finally:
+        await client.spec_reloader.stop()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+from mock import Mock
+
+from aiobravado.compat import json
+from aiobravado.exception import HTTPError
+from aiobravado.spec_cache import SpecResponseCache
+from aiobravado.swagger_model import Loader
+
+SPEC_URL = 'http://localhost/swagger.json'
+
+
+class FakeFuture(object):
+
+    def __init__(self, status_code, headers, document):
+        self.status_code = status_code
+        self.headers = headers
+        self.document = document
+
+    async def result(self):
+        response = Mock(status_code=self.status_code, headers=self.headers)
+        if self.status_code == 304:
+            raise HTTPError(response)
+
+        async def json():
+            return self.document
+
+        response.json = json
+        return response
+
+
+class FakeHttpClient(object):
+
+    def __init__(self, *futures):
+        self.futures = list(futures)
+        self.requests = []
+
+    def request(self, request_params):
+        self.requests.append(request_params)
+        return self.futures.pop(0)
+
+
+def ok(document, **headers):
+    headers.setdefault('content-type', 'application/json')
+    return FakeFuture(200, headers, document)
+
+
+def not_modified():
+    return FakeFuture(304, {}, None)
+
+
+@pytest.mark.asyncio
+async def test_revalidates_with_etag_and_last_modified(petstore_dict):
+    http_client = FakeHttpClient(
+        ok(petstore_dict, etag='"v1"', **{'last-modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}),
+        not_modified(),
+    )
+    loader = Loader(http_client, request_headers={'X-Foo': 'bar'}, response_cache=SpecResponseCache())
+
+    first = await loader.load_spec(SPEC_URL)
+    second = await loader.load_spec(SPEC_URL)
+
+    assert first == second == petstore_dict
+    assert second is not first
+    assert http_client.requests[0]['headers'] == {'X-Foo': 'bar'}
+    assert http_client.requests[1]['headers'] == {
+        'X-Foo': 'bar',
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT',
+    }
+    # the configured headers are left untouched
+    assert loader.request_headers == {'X-Foo': 'bar'}
+
+
+@pytest.mark.asyncio
+async def test_changed_spec_replaces_cached_one(petstore_dict):
+    new_spec = dict(petstore_dict, info={'title': 'new', 'version': '2'})
+    http_client = FakeHttpClient(
+        ok(petstore_dict, etag='"v1"'),
+        ok(new_spec, etag='"v2"'),
+        not_modified(),
+    )
+    loader = Loader(http_client, response_cache=SpecResponseCache())
+
+    await loader.load_spec(SPEC_URL)
+    assert await loader.load_spec(SPEC_URL) == new_spec
+    assert await loader.load_spec(SPEC_URL) == new_spec
+    assert http_client.requests[2]['headers'] == {'If-None-Match': '"v2"'}
+
+
+@pytest.mark.asyncio
+async def test_no_validators_no_caching(petstore_dict):
+    response_cache = SpecResponseCache()
+    http_client = FakeHttpClient(ok(petstore_dict), ok(petstore_dict))
+    loader = Loader(http_client, response_cache=response_cache)
+
+    await loader.load_spec(SPEC_URL)
+    await loader.load_spec(SPEC_URL)
+
+    assert response_cache.get(SPEC_URL) is None
+    assert http_client.requests[1]['headers'] == {}
+
+
+@pytest.mark.asyncio
+async def test_304_without_cached_spec_raises():
+    loader = Loader(FakeHttpClient(not_modified()), response_cache=SpecResponseCache())
+    with pytest.raises(HTTPError):
+        await loader.load_spec(SPEC_URL)
+
+
+@pytest.mark.asyncio
+async def test_persisted_across_caches(petstore_dict, tmpdir):
+    cache_dir = str(tmpdir.join('spec_cache'))
+    loader = Loader(FakeHttpClient(ok(petstore_dict, etag='"v1"')), response_cache=SpecResponseCache(cache_dir))
+    await loader.load_spec(SPEC_URL)
+    cache_file, = os.listdir(cache_dir)
+    with open(os.path.join(cache_dir, cache_file)) as fp:
+        assert json.load(fp) == {'etag': '"v1"', 'last_modified': None, 'spec_dict': petstore_dict}
+
+    http_client = FakeHttpClient(not_modified())
+    loader = Loader(http_client, response_cache=SpecResponseCache(cache_dir))
+
+    assert await loader.load_spec(SPEC_URL) == petstore_dict
+    assert http_client.requests[0]['headers'] == {'If-None-Match': '"v1"'}
+
+
+def test_unreadable_cache_file_is_ignored(tmpdir):
+    cache_dir = str(tmpdir.join('spec_cache'))
+    SpecResponseCache(cache_dir).set(SPEC_URL, '"v1"', None, {})
+    cache_file, = os.listdir(cache_dir)
+    with open(os.path.join(cache_dir, cache_file), 'wb') as fp:
+        fp.write(b'garbage')
+
+    assert SpecResponseCache(cache_dir).get(SPEC_URL) is None
+
+
+def test_cache_file_with_unexpected_content_is_ignored(tmpdir):
+    cache_dir = str(tmpdir.join('spec_cache'))
+    SpecResponseCache(cache_dir).set(SPEC_URL, '"v1"', None, {})
+    cache_file, = os.listdir(cache_dir)
+    with open(os.path.join(cache_dir, cache_file), 'w') as fp:
+        json.dump(['"v1"', None, {}], fp)
+
+    assert SpecResponseCache(cache_dir).get(SPEC_URL) is None
@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
+import os
+
 import pytest
+from mock import patch
 
+from aiobravado import swagger_model
+from aiobravado.swagger_model import clear_parsed_files
 from aiobravado.swagger_model import load_file
+from aiobravado.swagger_model import Loader
 
 
 @pytest.mark.asyncio
@@ -36,3 +42,48 @@ async def test_non_existent_file():
     with pytest.raises(IOError) as excinfo:
         await load_file('test-data/2.0/i_dont_exist.json')
     assert 'No such file or directory' in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_parsed_file_is_cached(tmpdir):
+    spec_file = tmpdir.join('swagger.yaml')
+    spec_file.write("swagger: '2.0'\npaths: {}\n")
+
+    first = await load_file(str(spec_file))
+    with patch.object(Loader, 'load_yaml') as mock_load_yaml:
+        second = await load_file(str(spec_file))
+
+    assert not mock_load_yaml.called
+    assert second == first == {'swagger': '2.0', 'paths': {}}
+    # callers get their own copy, which they are free to modify
+    assert second is not first
+    second['paths']['/foo'] = {}
+    assert await load_file(str(spec_file)) == {'swagger': '2.0', 'paths': {}}
+
+
+@pytest.mark.asyncio
+async def test_modified_file_is_parsed_again(tmpdir):
+    spec_file = tmpdir.join('swagger.json')
+    spec_file.write('{"swagger": "2.0"}')
+    assert await load_file(str(spec_file)) == {'swagger': '2.0'}
+
+    spec_file.write('{"swagger": "2.0", "paths": {}}')
+    stat = os.stat(str(spec_file))
+    os.utime(str(spec_file), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    assert await load_file(str(spec_file)) == {'swagger': '2.0', 'paths': {}}
+
+
+@pytest.mark.asyncio
+async def test_parsed_files_are_bounded(tmpdir):
+    clear_parsed_files()
+    for index in range(swagger_model.MAX_PARSED_FILES + 2):
+        spec_file = tmpdir.join('swagger{0}.json'.format(index))
+        spec_file.write('{"swagger": "2.0"}')
+        await load_file(str(spec_file))
+
+    assert len(swagger_model._parsed_files) == swagger_model.MAX_PARSED_FILES
+    assert str(tmpdir.join('swagger0.json')) not in swagger_model._parsed_files
+
+    clear_parsed_files()
+    assert not swagger_model._parsed_files
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from aiobravado.swagger_model import iter_remote_ref_urls
+from aiobravado.swagger_model import Loader
+
+
+@pytest.fixture
+def documents():
+    return {
+        'http://localhost/swagger.json': {
+            'paths': {
+                '/pet': {'$ref': 'paths.json#/pet'},
+                '/store': {'$ref': 'http://other/store.yaml'},
+            },
+            'definitions': {'Local': {'$ref': '#/definitions/Other'}},
+        },
+        'http://localhost/paths.json': {
+            'pet': {'$ref': 'models/pet.json#/Pet'},
+            'user': {'$ref': 'swagger.json#/definitions/Local'},
+        },
+        'http://other/store.yaml': {'type': 'object'},
+        'http://localhost/models/pet.json': {
+            'Pet': {'$ref': '../paths.json#/pet'},
+        },
+    }
+
+
+class FakeLoader(Loader):
+
+    def __init__(self, documents):
+        super(FakeLoader, self).__init__(None)
+        self.documents = documents
+        self.requested_urls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def load_spec(self, spec_url, base_url=None):
+        self.requested_urls.append(spec_url)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.documents[spec_url]
+
+
+def test_iter_remote_ref_urls(documents):
+    assert set(iter_remote_ref_urls(documents['http://localhost/swagger.json'], 'http://localhost/swagger.json')) == {
+        'http://localhost/paths.json',
+        'http://other/store.yaml',
+    }
+
+
+def test_iter_remote_ref_urls_ignores_files():
+    document = {'$ref': 'definitions.json'}
+    assert list(iter_remote_ref_urls(document, 'file:///tmp/swagger.json')) == []
+
+
+@pytest.mark.asyncio
+async def test_load_remote_refs(documents):
+    loader = FakeLoader(documents)
+    spec_url = 'http://localhost/swagger.json'
+
+    result = await loader.load_remote_refs(documents[spec_url], spec_url)
+
+    assert result == {url: document for url, document in documents.items() if url != spec_url}
+    # every document is only downloaded once
+    assert sorted(loader.requested_urls) == sorted(result)
+    assert loader.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_load_remote_refs_max_concurrency(documents):
+    loader = FakeLoader(documents)
+    spec_url = 'http://localhost/swagger.json'
+
+    await loader.load_remote_refs(documents[spec_url], spec_url, max_concurrency=1)
+
+    assert loader.max_in_flight == 1
+    assert len(loader.requested_urls) == 3
+
+
+@pytest.mark.asyncio
+async def test_load_remote_refs_none(petstore_dict):
+    loader = FakeLoader({})
+    assert await loader.load_remote_refs(petstore_dict, 'http://localhost/swagger.json') == {}
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 import pytest
+import yaml
+from mock import patch
 
+from aiobravado.swagger_model import CSafeLoader
 from aiobravado.swagger_model import Loader
 
 
@@ -42,3 +45,21 @@ def test_load_yaml(yaml_spec):
             },
         },
     }
+
+
+@pytest.mark.skipif(CSafeLoader is None, reason='PyYAML built without libyaml')
+def test_load_yaml_uses_libyaml_when_available(yaml_spec):
+    loader = Loader(None)
+    assert loader.yaml_loader is CSafeLoader
+    assert loader.load_yaml(yaml_spec) == Loader(None, use_libyaml=False).load_yaml(yaml_spec)
+
+
+def test_load_yaml_pure_python():
+    assert Loader(None, use_libyaml=False).yaml_loader is yaml.SafeLoader
+
+
+def test_use_libyaml_requires_libyaml():
+    with patch('aiobravado.swagger_model.CSafeLoader', None):
+        with pytest.raises(ImportError):
+            Loader(None, use_libyaml=True)
+        assert Loader(None).yaml_loader is yaml.SafeLoader